@@ -3,20 +3,34 @@ FastAPI Web Application for Steganography Framework
 Provides REST API endpoints for image and audio steganography operations.
 """
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional
+from starlette.background import BackgroundTask
+from typing import Optional, Tuple
+from contextlib import asynccontextmanager
 import os
+import base64
+import json
+import time
+import asyncio
 import tempfile
 import uuid
+import anyio
 from pathlib import Path
 
-from modules.image_steg import ImageSteganography
+from modules.image_steg import ImageSteganography, ImageOutput
 from modules.audio_steg import AudioSteganography
+from modules.cost import estimate_cost, kdf_cost
 from utils.helpers import EncryptionHelper
+from utils import timing, progress
+from utils.metrics import Registry, SIZE_BUCKETS
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.jobs import Job, JobRegistry, FINISHED
+from utils.uploads import Upload, UploadRejected, receive_upload
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -34,6 +48,114 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request stage timings go out as a Server-Timing header; set
+# STEG_TIMINGS_LOG to also append them to a JSON-lines file
+TIMINGS_LOG = os.environ.get("STEG_TIMINGS_LOG")
+
+
+def _env_bytes(name: str, default_mb: float) -> int:
+    """A size setting given in megabytes by environment variable."""
+    return int(float(os.environ.get(name, default_mb)) * 2 ** 20)
+
+
+# Admission control: uploads above STEG_MAX_UPLOAD_MB are refused from their
+# Content-Length; encode/decode jobs are priced from the carrier header in
+# the first UPLOAD_HEAD_BYTES of the upload, before the rest is read, and
+# refused (413) above the per-request limits, run at once below
+# STEG_SMALL_JOB_MB, and otherwise queued against the global memory budget
+# (429 once STEG_MAX_QUEUED jobs wait or one waits STEG_QUEUE_TIMEOUT seconds)
+MAX_UPLOAD_BYTES = _env_bytes("STEG_MAX_UPLOAD_MB", 512)
+# Multipart bodies are parsed as they stream in and the carrier written to
+# TEMP_DIR in chunks of this size, so an upload's memory cost is one chunk
+UPLOAD_CHUNK_BYTES = 1 << 20
+UPLOAD_HEAD_BYTES = 1 << 16
+admission = AdmissionController(
+    memory_budget=_env_bytes("STEG_MEMORY_BUDGET_MB", 4096),
+    request_memory_limit=_env_bytes("STEG_REQUEST_MEMORY_MB", 2048),
+    request_cpu_limit=float(os.environ.get("STEG_REQUEST_CPU_SECONDS", 120)),
+    small_job_bytes=_env_bytes("STEG_SMALL_JOB_MB", 64),
+    max_queued=int(os.environ.get("STEG_MAX_QUEUED", 32)),
+    queue_timeout=float(os.environ.get("STEG_QUEUE_TIMEOUT", 30))
+)
+
+
+# Prometheus metrics, served as text from /metrics
+metrics = Registry()
+REQUESTS = metrics.counter("steg_requests_total", "HTTP requests handled",
+                           ("endpoint", "carrier", "status"))
+ERRORS = metrics.counter("steg_request_errors_total", "HTTP requests answered with a 4xx/5xx status",
+                         ("endpoint", "carrier"))
+LATENCY = metrics.histogram("steg_request_duration_seconds", "HTTP request latency until response headers",
+                            ("endpoint", "carrier"))
+IN_FLIGHT = metrics.gauge("steg_requests_in_flight", "HTTP requests being handled", ("endpoint", "carrier"))
+PAYLOAD_BYTES = metrics.histogram("steg_payload_bytes", "Size of hidden or recovered messages",
+                                  ("carrier", "operation"), SIZE_BUCKETS)
+CARRIER_BYTES = metrics.histogram("steg_carrier_bytes", "Size of uploaded carrier files",
+                                  ("carrier",), SIZE_BUCKETS)
+WORKER_THREADS = metrics.gauge("steg_worker_threads", "Worker thread pool tokens by state", ("state",))
+WORKER_QUEUE = metrics.gauge("steg_worker_queue_depth", "Tasks waiting for a worker thread")
+TEMP_BYTES = metrics.gauge("steg_temp_dir_bytes", "Bytes of files in the upload temp directory")
+TEMP_FILES = metrics.gauge("steg_temp_dir_files", "Files in the upload temp directory")
+REJECTED = metrics.counter("steg_admission_rejections_total", "Requests refused by admission control",
+                           ("carrier", "status"))
+ADMISSION_QUEUE = metrics.gauge("steg_admission_queue_depth", "Jobs waiting for the memory budget")
+ADMISSION_RESERVED = metrics.gauge("steg_admission_reserved_bytes", "Memory budget held by running jobs")
+
+
+def _endpoint_label(path: str) -> str:
+    """The route a request path belongs to, keeping label values bounded."""
+    if path.startswith("/static/"):
+        return "/static"
+    if path.startswith("/api/jobs/"):
+        return "/api/jobs"
+    return path if path in {route.path for route in app.routes} else "other"
+
+
+def _carrier_label(path: str) -> str:
+
+    return path.split("/")[2] if path.startswith(("/api/image/", "/api/audio/")) else "none"
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > MAX_UPLOAD_BYTES:
+        carrier = _carrier_label(request.url.path)
+        REJECTED.inc(carrier=carrier, status="413")
+        return JSONResponse(status_code=413, content={
+            "detail": f"Upload too large: limit is {MAX_UPLOAD_BYTES // 2 ** 20} MB"})
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    path = request.url.path
+    endpoint = _endpoint_label(path)
+    carrier = _carrier_label(path)
+    IN_FLIGHT.inc(endpoint=endpoint, carrier=carrier)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        IN_FLIGHT.dec(endpoint=endpoint, carrier=carrier)
+        LATENCY.observe(time.perf_counter() - start, endpoint=endpoint, carrier=carrier)
+        REQUESTS.inc(endpoint=endpoint, carrier=carrier, status=str(status))
+        if status >= 400:
+            ERRORS.inc(endpoint=endpoint, carrier=carrier)
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    with timing.collect(f"{request.method} {request.url.path}", TIMINGS_LOG) as timings:
+        with timings.span('total'):
+            response = await call_next(request)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return response
+
+
 # Mount static files
 static_dir = Path(__file__).parent / "static"
 static_dir.mkdir(exist_ok=True)
@@ -48,6 +170,192 @@ encryption_helper = EncryptionHelper()
 TEMP_DIR = Path(tempfile.gettempdir()) / "steg_uploads"
 TEMP_DIR.mkdir(exist_ok=True)
 
+# Encode/decode requests sent with background=true run as jobs: the
+# request answers 202 with a job id at once, progress streams from
+# /api/jobs/{id}/events and the usual response is collected from
+# /api/jobs/{id}/result. Uncollected results are dropped after
+# STEG_JOB_TTL seconds. Every job, background or not, stops at its next
+# chunk once STEG_JOB_TIMEOUT seconds have passed (0 for no deadline),
+# and a request's job stops as soon as its client disconnects.
+def _discard_job(job):
+    if isinstance(job.result, FileResponse) and os.path.exists(job.result.path):
+        os.remove(job.result.path)
+
+
+jobs = JobRegistry(ttl=float(os.environ.get("STEG_JOB_TTL", 600)), on_discard=_discard_job)
+# Tasks waiting to release finished jobs' uploads, referenced until done
+RELEASES = set()
+JOB_TIMEOUT = float(os.environ.get("STEG_JOB_TIMEOUT", 300))
+# Overall progress weights of each engine's stages
+JOB_STAGES = {
+    ("image", "encode"): ImageSteganography.ENCODE_STAGES,
+    ("image", "decode"): ImageSteganography.DECODE_STAGES,
+    ("audio", "encode"): AudioSteganography.ENCODE_STAGES,
+    ("audio", "decode"): AudioSteganography.DECODE_STAGES,
+}
+
+# Stego-image output format -> (file extension, media type)
+IMAGE_OUTPUT_TYPES = {
+    "png": (".png", "image/png"),
+    "bmp": (".bmp", "image/bmp"),
+    "tiff": (".tiff", "image/tiff"),
+    "raw": (".npy", "application/octet-stream"),
+}
+
+
+async def receive_carrier(request: Request, carrier: str, operation: Optional[str] = None,
+                          extensions: Optional[Tuple[str, ...]] = None) -> Upload:
+    """Stream a request's multipart body into TEMP_DIR as it arrives, the
+    carrier file hashed and written UPLOAD_CHUNK_BYTES at a time. A body
+    that grows past MAX_UPLOAD_BYTES is refused (413) as soon as it does,
+    with or without a Content-Length, and the partial file removed.
+    
+    With an operation, the carrier is priced from its header once its
+    first UPLOAD_HEAD_BYTES have arrived and admitted (or refused, or held
+    in the queue) before the rest of the body is read; headers that do not
+    fit in that much are priced once the whole file is in. A password
+    among the fields sent ahead of the file adds its key derivation to the
+    price; one sent after it is reserved on its own once the body is in.
+    The admissions are held by the upload until it is discarded.
+    """
+    async def reserve(upload: Upload, memory_bytes: int, cpu_seconds: float):
+        try:
+            await upload.resources.enter_async_context(admission.admit(memory_bytes, cpu_seconds))
+        except AdmissionRejected as e:
+            REJECTED.inc(carrier=carrier, status=str(e.status))
+            raise HTTPException(status_code=e.status, detail=str(e))
+    
+    async def admit(upload: Upload, complete: bool) -> bool:
+        nonlocal kdf_priced
+        if extensions and not upload.filename.lower().endswith(extensions):
+            raise HTTPException(status_code=400, detail=f"Only {'/'.join(extensions)} files are supported")
+        kdf_priced = bool(upload.fields.get("password"))
+        try:
+            cost = estimate_cost(upload.path, carrier, operation, kdf=kdf_priced)
+        except ValueError as e:
+            if not complete:
+                return False
+            raise HTTPException(status_code=400, detail=str(e))
+        await reserve(upload, cost.memory_bytes, cost.cpu_seconds)
+        return True
+    
+    admitted = kdf_priced = False
+    
+    async def on_head(upload: Upload):
+        nonlocal admitted
+        admitted = await admit(upload, complete=False)
+    
+    try:
+        with timing.span('upload') as stage:
+            upload = await receive_upload(request.stream(), request.headers.get("content-type", ""),
+                                          str(TEMP_DIR), MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES,
+                                          UPLOAD_HEAD_BYTES, on_head if operation else None)
+            stage.add_bytes(upload.size)
+    except UploadRejected as e:
+        if e.status == 413:
+            REJECTED.inc(carrier=carrier, status="413")
+        raise HTTPException(status_code=e.status, detail=str(e))
+    if operation:
+        async with discard_on_error(upload):
+            if not admitted:
+                await admit(upload, complete=True)
+            elif upload.fields.get("password") and not kdf_priced:
+                await reserve(upload, *kdf_cost(operation))
+    CARRIER_BYTES.observe(upload.size, carrier=carrier)
+    return upload
+
+
+@asynccontextmanager
+async def discard_on_error(upload: Upload):
+    """Remove the uploaded carrier and release its admission if the block
+    raises, such as on a bad form field, before it gets as far as a job."""
+    try:
+        yield
+    except BaseException:
+        await upload.discard()
+        raise
+
+
+def form_value(upload: Upload, name: str, default=None, kind=str):
+    """A form field converted to kind (str, int or bool) the way FastAPI's
+    Form() would; empty fields count as missing, and a missing field with
+    a default of ... is an error (422)."""
+    value = upload.fields.get(name) or None
+    if value is None:
+        if default is ...:
+            raise HTTPException(status_code=422, detail=f"Missing form field: {name}")
+        return default
+    if kind is bool:
+        if value.lower() in ("1", "true", "on", "yes"):
+            return True
+        if value.lower() in ("0", "false", "off", "no"):
+            return False
+    else:
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    raise HTTPException(status_code=422, detail=f"Invalid form field {name}: {value!r}")
+
+
+async def run_job(fn, *args, **kwargs):
+    """Run an engine call in the worker pool. The job counts as running
+    from here on, so cancelling it stops the engine at its next chunk
+    instead of abandoning a worker thread that still uses the upload."""
+    progress.report('started', 1, 1)
+    return await run_in_threadpool(fn, *args, **kwargs)
+
+
+def job_response(job: Job):
+    """The response of a finished job, raising the HTTPException it ended with."""
+    if job.status == "timed_out":
+        raise HTTPException(status_code=504, detail=f"Job exceeded its {JOB_TIMEOUT:.0f} s deadline")
+    if job.status == "cancelled":
+        raise HTTPException(status_code=410, detail="Job was cancelled")
+    if isinstance(job.error, HTTPException):
+        raise job.error
+    if job.error is not None:
+        raise HTTPException(status_code=500, detail=f"Error in {job.carrier} {job.operation}: {job.error}")
+    return job.result
+
+
+async def cancel_on_disconnect(request: Request, job: Job):
+    """Cancel job once the client waiting for it disconnects; the request
+    body has been read, so the next message can only be the disconnect."""
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+    job.cancel()
+
+
+async def release_upload(job: Job, upload: Upload):
+    """Remove a job's uploaded carrier and release its admission once the
+    job has finished, however it ended (even cancelled before it began)."""
+    await job.wait()
+    await upload.discard()
+
+
+async def respond(request: Request, background: bool, carrier: str, operation: str, finish,
+                  upload: Upload):
+    """The response of finish(), run as a job that stops early if the
+    client goes away; with background set, a 202 naming the job instead.
+    The job takes over upload, discarding it when it finishes."""
+    job = Job(carrier, operation, JOB_STAGES[carrier, operation], JOB_TIMEOUT).start(finish)
+    release = asyncio.create_task(release_upload(job, upload))
+    RELEASES.add(release)
+    release.add_done_callback(RELEASES.discard)
+    if background:
+        jobs.add(job)
+        return JSONResponse(status_code=202, content=job.snapshot(),
+                            headers={"Location": f"/api/jobs/{job.id}"})
+    watcher = asyncio.create_task(cancel_on_disconnect(request, job))
+    try:
+        await job.wait()
+    finally:
+        watcher.cancel()
+    if job.status == "cancelled":
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    return job_response(job)
+
 
 class CapacityResponse(BaseModel):
     """Response model for capacity calculation"""
@@ -57,10 +365,20 @@ class CapacityResponse(BaseModel):
 
 
 class MessageResponse(BaseModel):
-    """Response model for decode operations"""
+    """Response model for decode operations; binary payloads come back
+    base64-encoded, with encoding "base64" instead of "utf-8"."""
     success: bool
     message: str
     decrypted: bool = False
+    encoding: str = "utf-8"
+    
+    @classmethod
+    def of(cls, message, decrypted: bool) -> "MessageResponse":
+        
+        if isinstance(message, bytes):
+            return cls(success=True, message=base64.b64encode(message).decode('ascii'),
+                       decrypted=decrypted, encoding="base64")
+        return cls(success=True, message=message, decrypted=decrypted)
 
 
 @app.get("/")
@@ -75,23 +393,38 @@ async def health_check():
     return {"status": "healthy", "service": "steganography-api"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Service metrics in the Prometheus text format"""
+    pool = anyio.to_thread.current_default_thread_limiter().statistics()
+    WORKER_THREADS.set(pool.borrowed_tokens, state="busy")
+    WORKER_THREADS.set(pool.total_tokens - pool.borrowed_tokens, state="idle")
+    WORKER_QUEUE.set(pool.tasks_waiting)
+    
+    total = count = 0
+    with os.scandir(TEMP_DIR) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    total += entry.stat().st_size
+                    count += 1
+            except FileNotFoundError:
+                pass  # removed by a request finishing meanwhile
+    TEMP_BYTES.set(total)
+    TEMP_FILES.set(count)
+    ADMISSION_QUEUE.set(admission.queued)
+    ADMISSION_RESERVED.set(admission.reserved)
+    
+    return Response(metrics.render(), media_type=Registry.CONTENT_TYPE)
+
+
 @app.post("/api/image/capacity")
-async def calculate_image_capacity(file: UploadFile = File(...)):
-    """Calculate the message capacity of an image file"""
+async def calculate_image_capacity(request: Request):
+    """Calculate the message capacity of an image file (multipart field: file)"""
+    upload = await receive_carrier(request, "image")
     try:
-        # Save uploaded file temporarily
-        file_id = str(uuid.uuid4())
-        temp_path = TEMP_DIR / f"{file_id}_{file.filename}"
-        
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
         # Calculate capacity
-        capacity = image_steg.calculate_capacity(str(temp_path))
-        
-        # Clean up
-        os.remove(temp_path)
+        capacity = image_steg.calculate_capacity(upload.path)
         
         return CapacityResponse(
             capacity_bytes=capacity,
@@ -101,25 +434,18 @@ async def calculate_image_capacity(file: UploadFile = File(...)):
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error calculating capacity: {str(e)}")
+    finally:
+        # Clean up
+        await upload.discard()
 
 
 @app.post("/api/audio/capacity")
-async def calculate_audio_capacity(file: UploadFile = File(...)):
-    """Calculate the message capacity of an audio file"""
+async def calculate_audio_capacity(request: Request):
+    """Calculate the message capacity of an audio file (multipart field: file)"""
+    upload = await receive_carrier(request, "audio")
     try:
-        # Save uploaded file temporarily
-        file_id = str(uuid.uuid4())
-        temp_path = TEMP_DIR / f"{file_id}_{file.filename}"
-        
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
         # Calculate capacity
-        capacity = audio_steg.calculate_capacity(str(temp_path))
-        
-        # Clean up
-        os.remove(temp_path)
+        capacity = audio_steg.calculate_capacity(upload.path)
         
         return CapacityResponse(
             capacity_bytes=capacity,
@@ -129,59 +455,82 @@ async def calculate_audio_capacity(file: UploadFile = File(...)):
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error calculating capacity: {str(e)}")
+    finally:
+        # Clean up
+        await upload.discard()
 
 
 @app.post("/api/image/encode")
-async def encode_image(
-    file: UploadFile = File(...),
-    message: str = Form(...),
-    password: Optional[str] = Form(None),
-    use_encryption: bool = Form(False)
-):
-    """Encode a secret message into an image"""
+async def encode_image(request: Request):
+    """Encode a secret message into an image.
+    
+    Multipart fields: file (PNG or BMP), message; optionally password,
+    use_encryption, steg_key, compression, matrix_k, ecc_symbols,
+    output_format, compress_level, png_strategy, use_alpha, background.
+    """
+    # Only PNG and BMP covers, checked before most of the upload is read
+    upload = await receive_carrier(request, "image", "encode", ('.png', '.bmp'))
     try:
-        # Validate file type
-        if not file.filename.lower().endswith(('.png', '.bmp')):
-            raise HTTPException(status_code=400, detail="Only PNG and BMP images are supported")
-        
-        # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = TEMP_DIR / f"{file_id}_input_{file.filename}"
-        output_path = TEMP_DIR / f"{file_id}_output.png"
-        
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Encrypt message if requested
-        final_message = message
-        if use_encryption:
-            if not password:
+        async with discard_on_error(upload):
+            message = form_value(upload, "message", ...)
+            password = form_value(upload, "password")
+            use_encryption = form_value(upload, "use_encryption", False, bool)
+            steg_key = form_value(upload, "steg_key")
+            compression = form_value(upload, "compression", "auto")
+            matrix_k = form_value(upload, "matrix_k", 0, int)
+            ecc_symbols = form_value(upload, "ecc_symbols", 0, int)
+            output_format = form_value(upload, "output_format", "png")
+            compress_level = form_value(upload, "compress_level")
+            png_strategy = form_value(upload, "png_strategy")
+            use_alpha = form_value(upload, "use_alpha", False, bool)
+            background = form_value(upload, "background", False, bool)
+            
+            try:
+                level = compress_level
+                if level not in (None, "auto"):
+                    level = int(level)
+                output = ImageOutput(output_format, level, png_strategy)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            extension, media_type = IMAGE_OUTPUT_TYPES[output_format]
+            
+            # Encrypt message if requested (AES-GCM over the compressed payload)
+            if use_encryption and not password:
                 raise HTTPException(status_code=400, detail="Password required for encryption")
-            final_message = encryption_helper.encrypt_message(message, password)
-        
-        # Encode message
-        success, result_msg = image_steg.encode_image(
-            str(input_path),
-            final_message,
-            str(output_path)
-        )
         
-        # Clean up input file
-        os.remove(input_path)
-        
-        if not success:
-            if os.path.exists(output_path):
-                os.remove(output_path)
-            raise HTTPException(status_code=400, detail=result_msg)
-        
-        # Return the stego image
-        return FileResponse(
-            output_path,
-            media_type="image/png",
-            filename=f"stego_{file.filename}",
-            background=None  # Keep file until download completes
-        )
+        output_path = TEMP_DIR / f"{uuid.uuid4()}_output{extension}"
+        
+        async def finish():
+            # Encode message
+            PAYLOAD_BYTES.observe(len(message.encode('utf-8')), carrier="image", operation="encode")
+            success, result_msg = await run_job(
+                image_steg.encode_image,
+                upload.path,
+                message,
+                str(output_path),
+                compression=compression,
+                password=password if use_encryption else None,
+                key=steg_key,
+                matrix_k=matrix_k,
+                ecc_symbols=ecc_symbols,
+                output=output,
+                use_alpha=use_alpha
+            )
+            
+            if not success:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise HTTPException(status_code=400, detail=result_msg)
+            
+            # Return the stego image
+            return FileResponse(
+                output_path,
+                media_type=media_type,
+                filename=f"stego_{Path(upload.filename).stem}{extension}",
+                background=BackgroundTask(os.remove, output_path)  # once the download completes
+            )
+        
+        return await respond(request, background, "image", "encode", finish, upload)
     
     except HTTPException:
         raise
@@ -190,46 +539,41 @@ async def encode_image(
 
 
 @app.post("/api/image/decode")
-async def decode_image(
-    file: UploadFile = File(...),
-    password: Optional[str] = Form(None),
-    use_decryption: bool = Form(False)
-):
-    """Decode a secret message from an image"""
+async def decode_image(request: Request):
+    """Decode a secret message from an image.
+    
+    Multipart fields: file; optionally password, use_decryption,
+    steg_key, background.
+    """
+    upload = await receive_carrier(request, "image", "decode")
     try:
-        # Save uploaded file
-        file_id = str(uuid.uuid4())
-        temp_path = TEMP_DIR / f"{file_id}_{file.filename}"
-        
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Decode message
-        success, extracted_msg = image_steg.decode_image(str(temp_path))
-        
-        # Clean up
-        os.remove(temp_path)
-        
-        if not success:
-            raise HTTPException(status_code=400, detail=extracted_msg)
-        
-        # Decrypt if requested
-        decrypted = False
-        if use_decryption:
-            if not password:
+        async with discard_on_error(upload):
+            password = form_value(upload, "password")
+            use_decryption = form_value(upload, "use_decryption", False, bool)
+            steg_key = form_value(upload, "steg_key")
+            background = form_value(upload, "background", False, bool)
+            
+            if use_decryption and not password:
                 raise HTTPException(status_code=400, detail="Password required for decryption")
-            try:
-                extracted_msg = encryption_helper.decrypt_message(extracted_msg, password)
-                decrypted = True
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Decryption failed: {str(e)}")
         
-        return MessageResponse(
-            success=True,
-            message=extracted_msg,
-            decrypted=decrypted
-        )
+        async def finish():
+            # Decode message, verifying and decrypting it if requested
+            success, extracted_msg = await run_job(
+                image_steg.decode_image,
+                upload.path,
+                password=password if use_decryption else None,
+                key=steg_key
+            )
+            
+            if not success:
+                raise HTTPException(status_code=400, detail=extracted_msg)
+            
+            PAYLOAD_BYTES.observe(len(extracted_msg if isinstance(extracted_msg, bytes) else extracted_msg.encode('utf-8')),
+                                  carrier="image", operation="decode")
+            
+            return MessageResponse.of(extracted_msg, decrypted=use_decryption)
+        
+        return await respond(request, background, "image", "decode", finish, upload)
     
     except HTTPException:
         raise
@@ -238,58 +582,61 @@ async def decode_image(
 
 
 @app.post("/api/audio/encode")
-async def encode_audio(
-    file: UploadFile = File(...),
-    message: str = Form(...),
-    password: Optional[str] = Form(None),
-    use_encryption: bool = Form(False),
-    steg_key: Optional[str] = Form(None)
-):
-    """Encode a secret message into an audio file"""
+async def encode_audio(request: Request):
+    """Encode a secret message into an audio file.
+    
+    Multipart fields: file (WAV), message; optionally password,
+    use_encryption, steg_key, compression, matrix_k, ecc_symbols,
+    background.
+    """
+    # Only WAV covers, checked before most of the upload is read
+    upload = await receive_carrier(request, "audio", "encode", ('.wav',))
     try:
-        # Validate file type
-        if not file.filename.lower().endswith('.wav'):
-            raise HTTPException(status_code=400, detail="Only WAV audio files are supported")
-        
-        # Save uploaded file
-        file_id = str(uuid.uuid4())
-        input_path = TEMP_DIR / f"{file_id}_input_{file.filename}"
-        output_path = TEMP_DIR / f"{file_id}_output.wav"
-        
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Encrypt message if requested
-        final_message = message
-        if use_encryption:
-            if not password:
+        async with discard_on_error(upload):
+            message = form_value(upload, "message", ...)
+            password = form_value(upload, "password")
+            use_encryption = form_value(upload, "use_encryption", False, bool)
+            steg_key = form_value(upload, "steg_key")
+            compression = form_value(upload, "compression", "auto")
+            matrix_k = form_value(upload, "matrix_k", 0, int)
+            ecc_symbols = form_value(upload, "ecc_symbols", 0, int)
+            background = form_value(upload, "background", False, bool)
+            
+            # Encrypt message if requested (AES-GCM over the compressed payload)
+            if use_encryption and not password:
                 raise HTTPException(status_code=400, detail="Password required for encryption")
-            final_message = encryption_helper.encrypt_message(message, password)
-        
-        # Encode message
-        success, result_msg = audio_steg.encode_audio(
-            str(input_path),
-            final_message,
-            str(output_path),
-            key=steg_key
-        )
         
-        # Clean up input file
-        os.remove(input_path)
-        
-        if not success:
-            if os.path.exists(output_path):
-                os.remove(output_path)
-            raise HTTPException(status_code=400, detail=result_msg)
-        
-        # Return the stego audio
-        return FileResponse(
-            output_path,
-            media_type="audio/wav",
-            filename=f"stego_{file.filename}",
-            background=None
-        )
+        output_path = TEMP_DIR / f"{uuid.uuid4()}_output.wav"
+        
+        async def finish():
+            # Encode message
+            PAYLOAD_BYTES.observe(len(message.encode('utf-8')), carrier="audio", operation="encode")
+            success, result_msg = await run_job(
+                audio_steg.encode_audio,
+                upload.path,
+                message,
+                str(output_path),
+                key=steg_key,
+                compression=compression,
+                password=password if use_encryption else None,
+                matrix_k=matrix_k,
+                ecc_symbols=ecc_symbols
+            )
+            
+            if not success:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise HTTPException(status_code=400, detail=result_msg)
+            
+            # Return the stego audio
+            return FileResponse(
+                output_path,
+                media_type="audio/wav",
+                filename=f"stego_{Path(upload.filename).name}",
+                background=BackgroundTask(os.remove, output_path)
+            )
+        
+        return await respond(request, background, "audio", "encode", finish, upload)
     
     except HTTPException:
         raise
@@ -298,47 +645,44 @@ async def encode_audio(
 
 
 @app.post("/api/audio/decode")
-async def decode_audio(
-    file: UploadFile = File(...),
-    password: Optional[str] = Form(None),
-    use_decryption: bool = Form(False),
-    steg_key: Optional[str] = Form(None)
-):
-    """Decode a secret message from an audio file"""
+async def decode_audio(request: Request):
+    """Decode a secret message from an audio file.
+    
+    Multipart fields: file; optionally password, use_decryption,
+    steg_key, legacy_keyed (also try the slow pre-MAC keyed format),
+    background.
+    """
+    upload = await receive_carrier(request, "audio", "decode")
     try:
-        # Save uploaded file
-        file_id = str(uuid.uuid4())
-        temp_path = TEMP_DIR / f"{file_id}_{file.filename}"
-        
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Decode message
-        success, extracted_msg = audio_steg.decode_audio(str(temp_path), key=steg_key)
-        
-        # Clean up
-        os.remove(temp_path)
-        
-        if not success:
-            raise HTTPException(status_code=400, detail=extracted_msg)
-        
-        # Decrypt if requested
-        decrypted = False
-        if use_decryption:
-            if not password:
+        async with discard_on_error(upload):
+            password = form_value(upload, "password")
+            use_decryption = form_value(upload, "use_decryption", False, bool)
+            steg_key = form_value(upload, "steg_key")
+            legacy_keyed = form_value(upload, "legacy_keyed", False, bool)
+            background = form_value(upload, "background", False, bool)
+            
+            if use_decryption and not password:
                 raise HTTPException(status_code=400, detail="Password required for decryption")
-            try:
-                extracted_msg = encryption_helper.decrypt_message(extracted_msg, password)
-                decrypted = True
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Decryption failed: {str(e)}")
         
-        return MessageResponse(
-            success=True,
-            message=extracted_msg,
-            decrypted=decrypted
-        )
+        async def finish():
+            # Decode message, verifying and decrypting it if requested
+            success, extracted_msg = await run_job(
+                audio_steg.decode_audio,
+                upload.path,
+                key=steg_key,
+                password=password if use_decryption else None,
+                legacy_keyed=legacy_keyed
+            )
+            
+            if not success:
+                raise HTTPException(status_code=400, detail=extracted_msg)
+            
+            PAYLOAD_BYTES.observe(len(extracted_msg if isinstance(extracted_msg, bytes) else extracted_msg.encode('utf-8')),
+                                  carrier="audio", operation="decode")
+            
+            return MessageResponse.of(extracted_msg, decrypted=use_decryption)
+        
+        return await respond(request, background, "audio", "decode", finish, upload)
     
     except HTTPException:
         raise
@@ -346,6 +690,57 @@ async def decode_audio(
         raise HTTPException(status_code=500, detail=f"Error decoding audio: {str(e)}")
 
 
+def _get_job(job_id: str):
+
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No such job (finished jobs expire once collected)")
+    return job
+
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status and progress of a background job"""
+    return _get_job(job_id).snapshot()
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Progress of a background job as Server-Sent Events, one JSON
+    snapshot per event until the job finishes"""
+    job = _get_job(job_id)
+    
+    async def stream():
+        async for snapshot in job.events():
+            if snapshot is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(snapshot)}\n\n"
+    
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """The response of a finished background job; it can be collected once"""
+    job = _get_job(job_id)
+    if job.status not in FINISHED:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    jobs.pop(job_id)
+    return job_response(job)
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a running background job, freeing its worker at the next
+    chunk, or discard a finished one and its result"""
+    job = _get_job(job_id)
+    if not job.cancel():
+        jobs.discard(job_id)
+    return job.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,355 @@
+"""
+HTTP load test for the FastAPI service.
+
+Starts app:app under uvicorn on a free local port (or targets --url), then
+drives a weighted mix of encode, decode and capacity requests against
+generated PNG and WAV covers from --concurrency client threads. Reports
+throughput and p50/p95/p99 latency per endpoint, and samples server RSS
+and upload temp-directory usage (from /metrics) over the run. --soak runs
+longer and fails if RSS keeps growing or files accumulate in the temp
+directory.
+
+Usage: python benchmarks/load_test.py [--concurrency 8] [--duration 30]
+                                      [--mix encode=2,decode=2,capacity=1]
+                                      [--carriers image,audio] [--soak]
+                                      [--url http://host:port] [--output report.json]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+import numpy as np
+
+from benchmarks.suite import make_png, make_wav
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPERATIONS = ('encode', 'decode', 'capacity')
+CARRIERS = {'image': ('cover.png', 'image/png'), 'audio': ('cover.wav', 'audio/wav')}
+PERCENTILES = (50, 95, 99)
+
+
+def multipart(fields: dict, filename: str, content: bytes, content_type: str):
+    """multipart/form-data body with the form fields plus one 'file' part."""
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class Client:
+    """One keep-alive connection to the service."""
+
+    def __init__(self, url: str, timeout: float = 300):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method: str, path: str, body: bytes = None, content_type: str = None):
+        """(status, response body); reconnects once if the server closed the connection."""
+        headers = {'Content-Type': content_type} if content_type else {}
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body, headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, ConnectionError):
+                self.close()
+                if attempt:
+                    raise
+
+    def post_file(self, path: str, fields: dict, filename: str, content: bytes, content_type: str):
+
+        body, header = multipart(fields, filename, content, content_type)
+        return self.request('POST', path, body, header)
+
+    def close(self):
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def parse_mix(text: str) -> dict:
+    """'encode=2,decode=1' -> {'encode': 2.0, 'decode': 1.0}."""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("The mix needs at least one positive weight")
+    return mix
+
+
+def free_port() -> int:
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """uvicorn serving app:app from the repository root, once /health answers."""
+    server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'app:app', '--host', '127.0.0.1',
+                               '--port', str(port), '--log-level', 'warning'], cwd=REPO_ROOT)
+    client = Client(f'http://127.0.0.1:{port}', timeout=5)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+        try:
+            if client.request('GET', '/health')[0] == 200:
+                return server
+        except OSError:
+            client.close()
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+
+def rss_mb(pid: int):
+    """Resident set size of a process from /proc, or None where unavailable."""
+    try:
+        with open(f'/proc/{pid}/status') as handle:
+            for line in handle:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def scrape(client: Client, names) -> dict:
+    """Unlabelled metric values from /metrics (missing ones are left out)."""
+    status, body = client.request('GET', '/metrics')
+    values = {}
+    if status == 200:
+        for line in body.decode().splitlines():
+            name, _, value = line.partition(' ')
+            if name in names:
+                values[name] = float(value)
+    return values
+
+
+def prepare_jobs(client: Client, carriers, image_megapixels: float, audio_seconds: float,
+                 message_bytes: int, workdir: str) -> dict:
+    """Request templates per (carrier, operation): path, fields, filename,
+    content and content type. Decode jobs use a stego file encoded once here."""
+    message = ('load test ' * (message_bytes // 10 + 1))[:message_bytes]
+    jobs = {}
+    for carrier in carriers:
+        filename, content_type = CARRIERS[carrier]
+        path = os.path.join(workdir, filename)
+        if carrier == 'image':
+            make_png(path, image_megapixels)
+        else:
+            make_wav(path, audio_seconds)
+        with open(path, 'rb') as handle:
+            cover = handle.read()
+
+        jobs[(carrier, 'capacity')] = (f'/api/{carrier}/capacity', {}, filename, cover, content_type)
+        jobs[(carrier, 'encode')] = (f'/api/{carrier}/encode', {'message': message}, filename, cover, content_type)
+        status, stego = client.post_file(*jobs[(carrier, 'encode')])
+        if status != 200:
+            raise RuntimeError(f"Preparing a {carrier} stego file failed with HTTP {status}: {stego[:200]!r}")
+        jobs[(carrier, 'decode')] = (f'/api/{carrier}/decode', {}, filename, stego, content_type)
+    return jobs
+
+
+def drive(url: str, jobs: dict, mix: dict, concurrency: int, duration: float, seed: int = 0) -> list:
+    """Run client threads for duration seconds; (job key, status, latency, finished) per request."""
+    keys = [key for key in jobs if mix.get(key[1])]
+    weights = [mix[key[1]] for key in keys]
+    deadline = time.monotonic() + duration
+    records, lock = [], threading.Lock()
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        client = Client(url)
+        local = []
+        try:
+            while time.monotonic() < deadline:
+                key = rng.choices(keys, weights)[0]
+                start = time.perf_counter()
+                try:
+                    status, _ = client.post_file(*jobs[key])
+                except OSError:
+                    client.close()
+                    status = 0
+                local.append((key, status, time.perf_counter() - start, time.monotonic()))
+        finally:
+            client.close()
+            with lock:
+                records.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return records
+
+
+def summarize(records: list, duration: float) -> list:
+    """Per-endpoint request count, errors, throughput and latency percentiles (ms)."""
+    by_key = {}
+    for key, status, latency, _ in records:
+        by_key.setdefault(key, []).append((status, latency))
+    rows = []
+    for (carrier, operation), samples in sorted(by_key.items()):
+        latencies = np.array([latency for _, latency in samples]) * 1e3
+        row = {
+            'endpoint': f'/api/{carrier}/{operation}',
+            'requests': len(samples),
+            'errors': sum(1 for status, _ in samples if status != 200),
+            'rps': len(samples) / duration,
+        }
+        row.update({f'p{p}_ms': float(np.percentile(latencies, p)) for p in PERCENTILES})
+        rows.append(row)
+    return rows
+
+
+def growth_per_minute(samples: list) -> float:
+    """Least-squares slope of RSS in MB per minute over the samples."""
+    points = [(s['t'], s['rss_mb']) for s in samples if s.get('rss_mb') is not None]
+    if len(points) < 3:
+        return 0.0
+    t, rss = np.array(points).T
+    return float(np.polyfit(t, rss, 1)[0] * 60)
+
+
+def find_leaks(samples: list, before: dict, after: dict, rss_limit: float) -> list:
+    """Problems seen over a soak run: RSS still climbing over its second
+    half (by more than rss_limit MB per minute and rss_limit MB overall,
+    so allocator warm-up on short runs is not flagged), or temp-directory
+    files left once the load has stopped."""
+    leaks = []
+    steady = [s for s in samples[len(samples) // 2:] if s.get('rss_mb') is not None]
+    slope = growth_per_minute(steady)
+    if slope > rss_limit and steady[-1]['rss_mb'] - steady[0]['rss_mb'] > rss_limit:
+        leaks.append(f"server RSS grew {slope:.1f} MB/min over the second half of the run")
+    files = after.get('steg_temp_dir_files', 0) - before.get('steg_temp_dir_files', 0)
+    if files > 0:
+        grown = (after.get('steg_temp_dir_bytes', 0) - before.get('steg_temp_dir_bytes', 0)) / 2 ** 20
+        leaks.append(f"{files:.0f} files ({grown:.1f} MB) left behind in the upload temp directory")
+    return leaks
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help="target a running server instead of starting one")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, help="seconds of load (default 30, or 600 with --soak)")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('encode=2,decode=2,capacity=1'),
+                        help="operation weights (default encode=2,decode=2,capacity=1)")
+    parser.add_argument('--carriers', default='image,audio', help="comma-separated: image, audio")
+    parser.add_argument('--image-megapixels', type=float, default=0.5)
+    parser.add_argument('--audio-seconds', type=float, default=10)
+    parser.add_argument('--message-bytes', type=int, default=256)
+    parser.add_argument('--sample-interval', type=float, default=2.0,
+                        help="seconds between RSS / temp-directory samples")
+    parser.add_argument('--soak', action='store_true', help="long run that fails on leaks")
+    parser.add_argument('--rss-limit', type=float, default=5.0,
+                        help="soak: allowed steady-state RSS growth in MB per minute (default 5)")
+    parser.add_argument('--output', help="write the JSON report here")
+    args = parser.parse_args()
+
+    carriers = [c.strip() for c in args.carriers.split(',') if c.strip()]
+    unknown = set(carriers) - set(CARRIERS)
+    if unknown:
+        parser.error(f"unknown carriers: {', '.join(sorted(unknown))}")
+    duration = args.duration or (600 if args.soak else 30)
+    gauges = ('steg_temp_dir_files', 'steg_temp_dir_bytes')
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = start_server(port)
+        url = f'http://127.0.0.1:{port}'
+    monitor = Client(url)
+    try:
+        with tempfile.TemporaryDirectory(prefix="steg-load-") as workdir:
+            jobs = prepare_jobs(monitor, carriers, args.image_megapixels, args.audio_seconds,
+                                args.message_bytes, workdir)
+
+        before = scrape(monitor, gauges)
+        samples, done = [], threading.Event()
+        started = time.monotonic()
+
+        def sample():
+            while True:
+                entry = {'t': time.monotonic() - started,
+                         'rss_mb': rss_mb(server.pid) if server else None,
+                         **scrape(monitor, gauges)}
+                samples.append(entry)
+                print(f"  t={entry['t']:7.1f}s  rss={entry['rss_mb'] or float('nan'):8.1f} MB  "
+                      f"temp files={entry.get('steg_temp_dir_files', float('nan')):.0f}", flush=True)
+                if done.wait(args.sample_interval):
+                    return
+
+        print(f"Driving {url} for {duration:.0f}s at concurrency {args.concurrency}")
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        records = drive(url, jobs, args.mix, args.concurrency, duration)
+        done.set()
+        sampler.join()
+
+        time.sleep(1)  # let responses still streaming finish their cleanup
+        after = scrape(monitor, gauges)
+        rows = summarize(records, duration)
+    finally:
+        monitor.close()
+        if server is not None:
+            server.terminate()
+            server.wait(10)
+
+    print(f"\n{'endpoint':<24}{'requests':>9}{'errors':>8}{'req/s':>9}"
+          + ''.join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    for row in rows:
+        print(f"{row['endpoint']:<24}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9.1f}"
+              + ''.join(f"{row[f'p{p}_ms']:>10.1f}" for p in PERCENTILES))
+    total = sum(row['requests'] for row in rows)
+    print(f"\nTotal: {total} requests, {total / duration:.1f} req/s; "
+          f"RSS trend {growth_per_minute(samples):+.1f} MB/min")
+
+    leaks = find_leaks(samples, before, after, args.rss_limit) if args.soak else []
+    if args.output:
+        report = {'url': url, 'duration': duration, 'concurrency': args.concurrency, 'mix': args.mix,
+                  'endpoints': rows, 'samples': samples, 'leaks': leaks}
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Report written to {args.output}")
+
+    if leaks:
+        print("\nLeaks detected:")
+        for leak in leaks:
+            print(f"  {leak}")
+        sys.exit(1)
+    if args.soak:
+        print("\nNo leaks detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark Hamming matrix embedding against plain LSB replacement.
+
+Embeds the same random payload into a random 8-bit carrier with plain LSB
+and with (1, 2^k - 1, k) Hamming codes, reporting embed/extract throughput,
+carrier values used, and how many of them changed.
+
+Usage: python benchmarks/matrix_embedding.py [--payload-kb 64] [--repeat 5]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import numpy as np
+
+from modules.payload import (MATRIX_K_MIN, MATRIX_K_MAX, KeyedPermutation, bytes_to_bits,
+                             embed_bits, extract_bits, matrix_embed, matrix_extract,
+                             body_carrier_bits)
+
+
+def best_time(fn, repeat: int, setup=None) -> float:
+    """Best of repeat runs of fn(*setup()), with setup left out of the timing."""
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(payload_kb: int, repeat: int, keyed: bool, seed: int = 0) -> list:
+
+    rng = np.random.default_rng(seed)
+    payload = rng.integers(0, 256, payload_kb * 1024, dtype=np.uint8).tobytes()
+    bits = bytes_to_bits(payload)
+    carrier_size = body_carrier_bits(len(payload), MATRIX_K_MAX)
+    cover = rng.integers(0, 256, carrier_size, dtype=np.uint8)
+    permutation = KeyedPermutation("benchmark", carrier_size) if keyed else None
+
+    results = []
+    for k in [0] + list(range(MATRIX_K_MIN, MATRIX_K_MAX + 1)):
+        used = body_carrier_bits(len(payload), k)
+        positions = permutation.positions(0, used) if keyed else None
+        carrier = cover.copy()
+
+        if k:
+            embed = lambda target: matrix_embed(target, bits, k, positions)
+            extract = lambda: matrix_extract(carrier, len(bits), k, positions)
+        else:
+            embed = lambda target: embed_bits(target, bits, positions)
+            extract = lambda: extract_bits(carrier, len(bits), positions)
+
+        embed(carrier)
+        assert np.array_equal(extract(), bits)
+        changed = int(np.count_nonzero(carrier != cover))
+        embed_time = best_time(embed, repeat, setup=lambda: (cover.copy(),))
+        extract_time = best_time(extract, repeat)
+
+        results.append({
+            'mode': f"hamming k={k}" if k else "plain LSB",
+            'carrier_values': used,
+            'changed_values': changed,
+            'changes_per_bit': changed / len(bits),
+            'bits_per_value': len(bits) / used,
+            'embed_mb_s': len(payload) / embed_time / 1e6,
+            'extract_mb_s': len(payload) / extract_time / 1e6,
+        })
+    return results
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--payload-kb', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keyed', action='store_true', help="embed along a KeyedPermutation")
+    args = parser.parse_args()
+
+    results = run(args.payload_kb, args.repeat, args.keyed)
+
+    print(f"Payload: {args.payload_kb} KiB random bytes{' (keyed positions)' if args.keyed else ''}")
+    print(f"{'mode':<14}{'values used':>13}{'changed':>11}{'chg/bit':>9}{'bits/val':>10}"
+          f"{'embed MB/s':>12}{'extract MB/s':>14}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['carrier_values']:>13}{r['changed_values']:>11}"
+              f"{r['changes_per_bit']:>9.3f}{r['bits_per_value']:>10.3f}"
+              f"{r['embed_mb_s']:>12.1f}{r['extract_mb_s']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
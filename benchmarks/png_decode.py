@@ -0,0 +1,63 @@
+"""
+Benchmark small-payload decoding from PNGs of growing height.
+
+Encodes the same short message into random-noise PNGs of fixed width and
+increasing height and times decode_image (which inflates only the top
+rows) against a full Pillow decode of the same file.
+
+Usage: python benchmarks/png_decode.py [--width 1024] [--repeat 5]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import numpy as np
+from PIL import Image
+
+from modules.image_steg import ImageSteganography
+from benchmarks.matrix_embedding import best_time
+
+HEIGHTS = (256, 1024, 4096, 8192)
+
+
+def run(width: int, repeat: int, message: str = "x" * 50, seed: int = 0) -> list:
+
+    rng = np.random.default_rng(seed)
+    steg = ImageSteganography()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for height in HEIGHTS:
+            cover = os.path.join(workdir, f"cover_{height}.png")
+            stego = os.path.join(workdir, f"stego_{height}.png")
+            Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)).save(cover, compress_level=1)
+            success, msg = steg.encode_image(cover, message, stego)
+            assert success, msg
+            assert steg.decode_image(stego) == (True, message)
+
+            results.append({
+                'height': height,
+                'file_mb': os.path.getsize(stego) / 1e6,
+                'partial_ms': best_time(lambda: steg.decode_image(stego), repeat) * 1e3,
+                'full_ms': best_time(lambda: np.asarray(Image.open(stego).convert('RGB')), repeat) * 1e3,
+            })
+    return results
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Width: {args.width} px, 50-byte unkeyed payload")
+    print(f"{'height':>8}{'file MB':>10}{'decode_image ms':>17}{'full decode ms':>16}")
+    for r in run(args.width, args.repeat):
+        print(f"{r['height']:>8}{r['file_mb']:>10.1f}{r['partial_ms']:>17.2f}{r['full_ms']:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
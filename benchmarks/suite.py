@@ -0,0 +1,267 @@
+"""
+Benchmark suite for image and audio steganography on synthetic covers.
+
+Generates PNG covers (megapixels) and 16-bit WAV covers (duration,
+channels), then times encode, decode, capacity, compare, encrypt and
+Reed-Solomon encode / decode (clean and with corrupted bytes) at several
+payload sizes and measures their peak traced memory. Results are
+written as a JSON report; with --baseline the run is compared against a
+stored report and the script exits non-zero on a regression.
+
+Usage: python benchmarks/suite.py [--profile quick|full] [--output report.json]
+                                  [--baseline baseline.json] [--threshold 0.25]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+import wave
+import numpy as np
+import PIL
+from PIL import Image
+
+from modules.image_steg import ImageSteganography
+from modules.audio_steg import AudioSteganography
+from modules.payload import pack_message
+from utils.helpers import KDFParams
+from utils.ecc import reed_solomon
+
+REPORT_VERSION = 1
+
+# Carriers and payload sizes per profile; WAV covers are (seconds, channels) of
+# 16-bit PCM, the only sample width the audio engines embed in
+PROFILES = {
+    'quick': {
+        'png_megapixels': (1,),
+        'wav_covers': ((10, 1), (10, 2)),
+        'payload_bytes': (1024, 64 * 1024),
+    },
+    'full': {
+        'png_megapixels': (1, 10, 100),
+        'wav_covers': ((10, 1), (600, 1), (600, 2), (3600, 2)),
+        'payload_bytes': (1024, 64 * 1024, 1024 * 1024),
+    },
+}
+
+SAMPLE_RATE = 44100
+# Differences below these are timer / allocator noise, never a regression
+NOISE_FLOOR = {'seconds': 0.005, 'peak_mb': 1.0}
+PASSWORD = "benchmark-password"
+# Reed-Solomon parity per codeword, and the share of encoded bytes corrupted for ecc_noisy
+ECC_SYMBOLS = 32
+ECC_ERROR_RATE = 0.0005
+
+
+def make_png(path: str, megapixels: float, seed: int = 0) -> str:
+    """Write a 4:3 RGB cover: smooth gradients plus low-amplitude noise, so
+    it compresses like a photo rather than like pure noise."""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(megapixels * 1e6 // width)
+    rng = np.random.default_rng(seed)
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    x = np.arange(width) * 255 // max(width - 1, 1)
+    for top in range(0, height, 256):
+        rows = np.arange(top, min(top + 256, height))[:, None]
+        band = pixels[top:top + len(rows)]
+        band[..., 0] = x[None, :]
+        band[..., 1] = rows * 255 // max(height - 1, 1)
+        band[..., 2] = (x[None, :] + rows) % 256
+        band ^= rng.integers(0, 4, band.shape, dtype=np.uint8)
+    Image.fromarray(pixels).save(path, compress_level=1)
+    return path
+
+
+def make_wav(path: str, seconds: float, channels: int = 1, seed: int = 0) -> str:
+    """Write a 16-bit WAV cover of tones plus noise, a few seconds at a time."""
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * SAMPLE_RATE)
+    block = SAMPLE_RATE * 10
+    with wave.open(path, 'wb') as audio:
+        audio.setnchannels(channels)
+        audio.setsampwidth(2)
+        audio.setframerate(SAMPLE_RATE)
+        for start in range(0, frames, block):
+            t = np.arange(start, min(start + block, frames)) / SAMPLE_RATE
+            tones = [np.sin(2 * np.pi * (440 + 110 * c) * t) * 0.6 for c in range(channels)]
+            signal = np.stack(tones, axis=1) + rng.normal(0, 0.01, (len(t), channels))
+            audio.writeframesraw((np.clip(signal, -1, 1) * 32767).astype('<i2').tobytes())
+    return path
+
+
+def measure(fn, repeat: int) -> dict:
+    """Best wall time of repeat untraced runs, plus peak memory traced by
+    tracemalloc over one more run (Python and numpy allocations; memory
+    allocated inside Pillow's C code is not traced)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(timings), 'peak_mb': peak / 2 ** 20, 'result': result}
+
+
+def _record(results: list, carrier: str, operation: str, payload: int, fn, repeat: int,
+            check=None) -> dict:
+
+    stats = measure(fn, repeat)
+    if check is not None and not check(stats.pop('result')):
+        raise AssertionError(f"{carrier} {operation} ({payload} bytes) returned a wrong result")
+    stats.pop('result', None)
+    entry = {'carrier': carrier, 'operation': operation, 'payload_bytes': payload, **stats}
+    if payload and stats['seconds']:
+        entry['mb_per_s'] = payload / stats['seconds'] / 1e6
+    results.append(entry)
+    print(f"{carrier:<22}{operation:<10}{payload:>10}{stats['seconds'] * 1e3:>12.2f}{stats['peak_mb']:>11.1f}",
+          flush=True)
+    return entry
+
+
+def _bench_carrier(results: list, carrier: str, steg, cover: str, workdir: str,
+                   payload_sizes, repeat: int, rng: np.random.Generator):
+
+    if isinstance(steg, ImageSteganography):
+        extension, encode, decode, compare = ('.png', steg.encode_image, steg.decode_image,
+                                              steg.compare_images)
+    else:
+        extension, encode, decode, compare = ('.wav', steg.encode_audio, steg.decode_audio,
+                                              steg.compare_audio)
+    stego = os.path.join(workdir, f"stego_{carrier}{extension}")
+
+    capacity = steg.calculate_capacity(cover)
+    _record(results, carrier, 'capacity', 0, lambda: steg.calculate_capacity(cover), repeat)
+    for size in payload_sizes:
+        if size > capacity:
+            print(f"{carrier:<22}{'skipped':<10}{size:>10}  (capacity {capacity} bytes)")
+            continue
+        payload = rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+        _record(results, carrier, 'encode', size, lambda: encode(cover, payload, stego), repeat,
+                check=lambda result: result[0])
+        _record(results, carrier, 'decode', size, lambda: decode(stego), repeat,
+                check=lambda result: result == (True, payload))
+        _record(results, carrier, 'compare', size, lambda: compare(cover, stego), repeat,
+                check=lambda result: 'error' not in result)
+
+
+def run_suite(profile: str, repeat: int, workdir: str, seed: int = 0) -> list:
+
+    settings = PROFILES[profile]
+    rng = np.random.default_rng(seed)
+    results = []
+    print(f"{'carrier':<22}{'operation':<10}{'payload':>10}{'best ms':>12}{'peak MB':>11}")
+
+    kdf_params = KDFParams()
+    for size in settings['payload_bytes']:
+        payload = rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+        # Fixed KDF parameters keep the derived key cached, so this times AES-GCM
+        _record(results, 'none', 'encrypt', size,
+                lambda: pack_message(payload, password=PASSWORD, kdf_params=kdf_params), repeat)
+
+        # Decoding clean input only re-encodes; damaged codewords go through error correction
+        codec = reed_solomon(ECC_SYMBOLS)
+        encoded = codec.encode(payload)
+        noisy = np.frombuffer(encoded, dtype=np.uint8).copy()
+        damaged = rng.choice(len(noisy), max(1, int(len(noisy) * ECC_ERROR_RATE)), replace=False)
+        noisy[damaged] ^= rng.integers(1, 256, len(damaged), dtype=np.uint8)
+        noisy = noisy.tobytes()
+        _record(results, 'none', 'ecc_encode', size, lambda: codec.encode(payload), repeat)
+        _record(results, 'none', 'ecc_decode', size, lambda: codec.decode(encoded), repeat,
+                check=lambda result: result[0] == payload)
+        _record(results, 'none', 'ecc_noisy', size, lambda: codec.decode(noisy), repeat,
+                check=lambda result: result[0] == payload)
+
+    image_steg = ImageSteganography()
+    for megapixels in settings['png_megapixels']:
+        carrier = f"png-{megapixels}mp"
+        cover = make_png(os.path.join(workdir, f"{carrier}.png"), megapixels, seed)
+        _bench_carrier(results, carrier, image_steg, cover, workdir, settings['payload_bytes'], repeat, rng)
+        os.remove(cover)
+
+    audio_steg = AudioSteganography()
+    for seconds, channels in settings['wav_covers']:
+        carrier = f"wav-{seconds}s-16bit-{channels}ch"
+        cover = make_wav(os.path.join(workdir, f"{carrier}.wav"), seconds, channels, seed)
+        _bench_carrier(results, carrier, audio_steg, cover, workdir, settings['payload_bytes'], repeat, rng)
+        os.remove(cover)
+
+    return results
+
+
+def compare_reports(results: list, baseline: dict, threshold: float) -> list:
+    """Entries slower or hungrier than the baseline by more than threshold
+    (a fraction) and by more than NOISE_FLOOR. Entries missing from either
+    report are ignored."""
+    reference = {(r['carrier'], r['operation'], r['payload_bytes']): r for r in baseline['results']}
+    regressions = []
+    for entry in results:
+        base = reference.get((entry['carrier'], entry['operation'], entry['payload_bytes']))
+        if base is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            if (entry[metric] > base[metric] * (1 + threshold)
+                    and entry[metric] - base[metric] > NOISE_FLOOR[metric]):
+                regressions.append({'carrier': entry['carrier'], 'operation': entry['operation'],
+                                    'payload_bytes': entry['payload_bytes'], 'metric': metric,
+                                    'baseline': base[metric], 'current': entry[metric],
+                                    'ratio': entry[metric] / base[metric] if base[metric] else float('inf')})
+    return regressions
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write the JSON report here")
+    parser.add_argument('--baseline', help="JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown / memory growth as a fraction (default 0.25)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="steg-bench-") as workdir:
+        results = run_suite(args.profile, args.repeat, workdir)
+
+    report = {
+        'version': REPORT_VERSION,
+        'profile': args.profile,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pillow': PIL.__version__,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare_reports(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for r in regressions:
+                print(f"  {r['carrier']} {r['operation']} ({r['payload_bytes']} bytes) {r['metric']}: "
+                      f"{r['baseline']:.4g} -> {r['current']:.4g} (x{r['ratio']:.2f})")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,21 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 from PIL import Image, ImageTk
 import os
 import sys
-import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from modules.image_steg import ImageSteganography
 from modules.audio_steg import AudioSteganography
+from modules.batch import load_message_map, plan_encode, plan_decode, run_batch, summarize, write_csv
 from utils.helpers import FileHelper, EncryptionHelper
+from utils import progress
 
 class SteganographyGUI:
     
+    # Engine calls run one at a time on this many background threads
+    WORKERS = 1
     
     def __init__(self, root):
         self.root = root
@@ -27,12 +32,23 @@ class SteganographyGUI:
         self.cover_file = None
         self.stego_file = None
         self.use_encryption = tk.BooleanVar(value=False)
+        self.audio_legacy_keyed = tk.BooleanVar(value=False)
+        self.tracker = None
+        self.action_buttons = []
+        self.batch_mode = tk.StringVar(value="encode")
+        self.batch_dirs = {"input": None, "output": None}
+        self.batch_map_file = None
+        self.batch_items = []
+        self.batch_started = self.batch_finished = None
+        self.executor = ThreadPoolExecutor(self.WORKERS, thread_name_prefix="steg-gui")
         
         self.create_menu()
         self.create_notebook()
         
         self.status_var = tk.StringVar(value="Ready")
+        self.progress_var = tk.DoubleVar(value=0.0)
         self.create_status_bar()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
     
     def create_menu(self):
         """Create menu bar."""
@@ -41,7 +57,7 @@ class SteganographyGUI:
         
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.close)
         
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
@@ -55,12 +71,15 @@ class SteganographyGUI:
         
         self.image_tab = ttk.Frame(self.notebook)
         self.audio_tab = ttk.Frame(self.notebook)
+        self.batch_tab = ttk.Frame(self.notebook)
         
         self.notebook.add(self.image_tab, text="Image Steganography")
         self.notebook.add(self.audio_tab, text="Audio Steganography")
+        self.notebook.add(self.batch_tab, text="Batch")
         
         self.build_image_tab()
         self.build_audio_tab()
+        self.build_batch_tab()
     
     def create_status_bar(self):
         """Create status bar at bottom."""
@@ -70,6 +89,85 @@ class SteganographyGUI:
         ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN).pack(
             side=tk.LEFT, fill=tk.X, expand=True
         )
+        ttk.Progressbar(status_frame, variable=self.progress_var, maximum=1.0, length=200).pack(
+            side=tk.LEFT, padx=2
+        )
+        self.cancel_button = ttk.Button(status_frame, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=2)
+    
+    def busy(self) -> bool:
+        """True while an operation runs; its buttons are disabled meanwhile."""
+        return self.tracker is not None
+    
+    def run_task(self, status, fn, args=(), kwargs=None, weights=None, on_done=None, on_cancel=None):
+        """Run fn(*args, **kwargs) on the background executor, driving the
+        progress bar from the engine's progress reports. on_done(result) is
+        called on the Tk thread, through root.after like every other update
+        from the worker, or on_cancel() instead if the task was cancelled.
+        Ignored while another operation runs, so repeated clicks cannot
+        queue duplicate jobs."""
+        if self.busy():
+            return
+        tracker = self.tracker = progress.Tracker(self._report_progress, weights)
+        for button in self.action_buttons:
+            button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_var.set(0.0)
+        self.update_status(status)
+        
+        def run():
+            with progress.track(tracker):
+                return fn(*args, **(kwargs or {}))
+        
+        def done(future):
+            self._call_in_ui(self._finish_task, tracker, future, on_done, on_cancel)
+        
+        self.executor.submit(run).add_done_callback(done)
+    
+    def _call_in_ui(self, fn, *args):
+        """Schedule fn(*args) on the Tk thread from a worker thread."""
+        try:
+            self.root.after(0, fn, *args)
+        except (RuntimeError, tk.TclError):
+            pass  # window closed meanwhile
+    
+    def _report_progress(self, stage, fraction, overall):
+        # Tracker callback, on the worker thread
+        self._call_in_ui(self.progress_var.set, overall)
+    
+    def _finish_task(self, tracker, future, on_done, on_cancel):
+        
+        self.tracker = None
+        for button in self.action_buttons:
+            button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        if tracker.cancelled:
+            self.progress_var.set(0.0)
+            self.update_status("Cancelled")
+            if on_cancel is not None:
+                on_cancel()
+            return
+        self.update_status("Ready")
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.progress_var.set(1.0)
+        if on_done is not None:
+            on_done(result)
+    
+    def cancel_task(self):
+        """Cancel button handler; the engine stops at its next chunk."""
+        if self.tracker is not None:
+            self.tracker.cancel()
+            self.update_status("Cancelling...")
+    
+    def close(self):
+        """Stop any running operation and close the window."""
+        self.cancel_task()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
     
     def build_image_tab(self):
         """Build image steganography tab."""
@@ -95,16 +193,20 @@ class SteganographyGUI:
         self.image_password_entry = ttk.Entry(msg_frame, show="*", width=30)
         self.image_password_entry.pack(anchor=tk.W, pady=2)
         
+        ttk.Label(msg_frame, text="Embedding Key (optional - for position randomization):").pack(anchor=tk.W, pady=5)
+        self.image_key_entry = ttk.Entry(msg_frame, width=30)
+        self.image_key_entry.pack(anchor=tk.W, pady=2)
+        
         self.image_capacity_label = ttk.Label(msg_frame, text="Capacity: Select an image first")
         self.image_capacity_label.pack(anchor=tk.W, pady=5)
         
         btn_frame = ttk.Frame(self.image_tab)
         btn_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        ttk.Button(btn_frame, text="Encode Message", 
-                  command=self.encode_image).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Decode Message", 
-                  command=self.decode_image).pack(side=tk.LEFT, padx=5)
+        for text, command in (("Encode Message", self.encode_image), ("Decode Message", self.decode_image)):
+            button = ttk.Button(btn_frame, text=text, command=command)
+            button.pack(side=tk.LEFT, padx=5)
+            self.action_buttons.append(button)
         ttk.Button(btn_frame, text="Clear", 
                   command=self.clear_image_tab).pack(side=tk.LEFT, padx=5)
         
@@ -134,6 +236,8 @@ class SteganographyGUI:
         ttk.Label(msg_frame, text="Embedding Key (optional - for position randomization):").pack(anchor=tk.W, pady=5)
         self.audio_key_entry = ttk.Entry(msg_frame, width=30)
         self.audio_key_entry.pack(anchor=tk.W, pady=2)
+        ttk.Checkbutton(msg_frame, text="Also try the old keyed format when decoding (slow)",
+                       variable=self.audio_legacy_keyed).pack(anchor=tk.W, pady=2)
         
         self.audio_capacity_label = ttk.Label(msg_frame, text="Capacity: Select an audio file first")
         self.audio_capacity_label.pack(anchor=tk.W, pady=5)
@@ -141,10 +245,10 @@ class SteganographyGUI:
         btn_frame = ttk.Frame(self.audio_tab)
         btn_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        ttk.Button(btn_frame, text="Encode Message", 
-                  command=self.encode_audio).pack(side=tk.LEFT, padx=5)
-        ttk.Button(btn_frame, text="Decode Message", 
-                  command=self.decode_audio).pack(side=tk.LEFT, padx=5)
+        for text, command in (("Encode Message", self.encode_audio), ("Decode Message", self.decode_audio)):
+            button = ttk.Button(btn_frame, text=text, command=command)
+            button.pack(side=tk.LEFT, padx=5)
+            self.action_buttons.append(button)
         ttk.Button(btn_frame, text="Clear", 
                   command=self.clear_audio_tab).pack(side=tk.LEFT, padx=5)
         
@@ -154,6 +258,77 @@ class SteganographyGUI:
         self.audio_output_text = scrolledtext.ScrolledText(output_frame, height=6)
         self.audio_output_text.pack(fill=tk.BOTH, expand=True)
     
+    def build_batch_tab(self):
+        """Build batch processing tab."""
+        
+        folder_frame = ttk.LabelFrame(self.batch_tab, text="Folders", padding=10)
+        folder_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        mode_frame = ttk.Frame(folder_frame)
+        mode_frame.pack(fill=tk.X)
+        ttk.Radiobutton(mode_frame, text="Encode a folder of covers", variable=self.batch_mode,
+                        value="encode").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(mode_frame, text="Decode a folder of stego files", variable=self.batch_mode,
+                        value="decode").pack(side=tk.LEFT, padx=5)
+        
+        self.batch_dir_labels = {}
+        for which, text in (("input", "Select Input Folder"), ("output", "Select Output Folder (encode)")):
+            row = ttk.Frame(folder_frame)
+            row.pack(fill=tk.X, pady=2)
+            ttk.Button(row, text=text, width=28,
+                       command=lambda which=which: self.select_batch_folder(which)).pack(side=tk.LEFT, padx=5)
+            self.batch_dir_labels[which] = ttk.Label(row, text="No folder selected")
+            self.batch_dir_labels[which].pack(side=tk.LEFT, padx=5)
+        
+        msg_frame = ttk.LabelFrame(self.batch_tab, text="Messages and Keys", padding=10)
+        msg_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(msg_frame, text="Message (for covers not in the message map):").grid(row=0, column=0, sticky=tk.W)
+        self.batch_message_entry = ttk.Entry(msg_frame, width=50)
+        self.batch_message_entry.grid(row=0, column=1, sticky=tk.W, pady=2)
+        
+        ttk.Button(msg_frame, text="Message Map (CSV)...",
+                   command=self.select_batch_map).grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.batch_map_label = ttk.Label(msg_frame, text="None (columns: file, message or message_file)")
+        self.batch_map_label.grid(row=1, column=1, sticky=tk.W)
+        
+        ttk.Label(msg_frame, text="Password (optional):").grid(row=2, column=0, sticky=tk.W)
+        self.batch_password_entry = ttk.Entry(msg_frame, show="*", width=30)
+        self.batch_password_entry.grid(row=2, column=1, sticky=tk.W, pady=2)
+        
+        ttk.Label(msg_frame, text="Embedding Key (optional):").grid(row=3, column=0, sticky=tk.W)
+        self.batch_key_entry = ttk.Entry(msg_frame, width=30)
+        self.batch_key_entry.grid(row=3, column=1, sticky=tk.W, pady=2)
+        
+        ttk.Label(msg_frame, text="Worker processes:").grid(row=4, column=0, sticky=tk.W)
+        self.batch_workers = tk.IntVar(value=os.cpu_count() or 1)
+        ttk.Spinbox(msg_frame, from_=1, to=os.cpu_count() or 1, textvariable=self.batch_workers,
+                    width=5).grid(row=4, column=1, sticky=tk.W, pady=2)
+        
+        btn_frame = ttk.Frame(self.batch_tab)
+        btn_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        button = ttk.Button(btn_frame, text="Start Batch", command=self.start_batch)
+        button.pack(side=tk.LEFT, padx=5)
+        self.action_buttons.append(button)
+        ttk.Button(btn_frame, text="Export CSV", 
+                  command=self.export_batch_csv).pack(side=tk.LEFT, padx=5)
+        self.batch_summary_label = ttk.Label(btn_frame, text="")
+        self.batch_summary_label.pack(side=tk.LEFT, padx=10)
+        
+        results_frame = ttk.LabelFrame(self.batch_tab, text="Results", padding=10)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        columns = ("file", "status", "seconds", "detail")
+        self.batch_tree = ttk.Treeview(results_frame, columns=columns, show="headings", height=8)
+        for column, width in zip(columns, (180, 80, 70, 400)):
+            self.batch_tree.heading(column, text=column.capitalize())
+            self.batch_tree.column(column, width=width, stretch=column == "detail")
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.batch_tree.yview)
+        self.batch_tree.configure(yscrollcommand=scrollbar.set)
+        self.batch_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    
     def select_file(self, file_type, mode):
         """Select file dialog."""
         filetypes = {
@@ -180,6 +355,8 @@ class SteganographyGUI:
     
     def encode_image(self):
         """Encode message in image."""
+        if self.busy():
+            return
         if not self.cover_file:
             messagebox.showerror("Error", "Please select a cover image first")
             return
@@ -189,47 +366,44 @@ class SteganographyGUI:
             messagebox.showerror("Error", "Please enter a message to hide")
             return
         
+        password = None
         if self.use_encryption.get():
             password = self.image_password_entry.get()
             if not password:
                 messagebox.showerror("Error", "Please enter a password for encryption")
                 return
-            try:
-                message = self.encryption.encrypt_message(message, password)
-                self.image_output_text.insert(tk.END, "[INFO] Message encrypted before embedding\n")
-            except Exception as e:
-                messagebox.showerror("Error", f"Encryption failed: {str(e)}")
-                return
         
         output_file = filedialog.asksaveasfilename(
             defaultextension=".png",
-            filetypes=[("PNG files", "*.png"), ("All files", "*.*")]
+            filetypes=[("PNG files", "*.png"), ("BMP files", "*.bmp"), ("TIFF files", "*.tif *.tiff"),
+                       ("All files", "*.*")]
         )
         
         if not output_file:
             return
         
-        self.update_status("Encoding image...")
         self.image_output_text.delete("1.0", tk.END)
+        if password:
+            self.image_output_text.insert(tk.END, "[INFO] Message encrypted (AES-GCM) before embedding\n")
         
-        threading.Thread(target=self._encode_image_thread, args=(message, output_file), daemon=True).start()
-    
-    def _encode_image_thread(self, message, output_file):
-        """Thread function for encoding image."""
-        success, result = self.image_steg.encode_image(self.cover_file, message, output_file)
+        key = self.image_key_entry.get() or None
         
-        def update_ui():
+        def show_result(outcome):
+            success, result = outcome
             self.image_output_text.insert(tk.END, result + "\n")
             if success:
                 messagebox.showinfo("Success", "Image encoded successfully!")
             else:
                 messagebox.showerror("Error", result)
-            self.update_status("Ready")
         
-        self.root.after(0, update_ui)
+        self.run_task("Encoding image...", self.image_steg.encode_image,
+                      (self.cover_file, message, output_file), dict(password=password, key=key),
+                      self.image_steg.ENCODE_STAGES, show_result)
     
     def decode_image(self):
         """Decode message from image."""
+        if self.busy():
+            return
         filename = filedialog.askopenfilename(
             title="Select stego-image",
             filetypes=[("PNG files", "*.png"), ("All files", "*.*")]
@@ -238,33 +412,35 @@ class SteganographyGUI:
         if not filename:
             return
         
-        self.update_status("Decoding image...")
         self.image_output_text.delete("1.0", tk.END)
         
-        success, message = self.image_steg.decode_image(filename)
+        password = None
+        if self.use_encryption.get():
+            password = self.image_password_entry.get() or None
         
-        if success:
-            
-            if self.use_encryption.get():
-                password = self.image_password_entry.get()
+        key = self.image_key_entry.get() or None
+        
+        def show_result(outcome):
+            success, message = outcome
+            if success:
+                
                 if password:
-                    try:
-                        message = self.encryption.decrypt_message(message, password)
-                        self.image_output_text.insert(tk.END, "[INFO] Message decrypted\n\n")
-                    except Exception as e:
-                        self.image_output_text.insert(tk.END, f"[WARNING] Decryption failed: {str(e)}\n")
-                        self.image_output_text.insert(tk.END, "Showing encrypted message:\n\n")
-            
-            self.image_output_text.insert(tk.END, f"Decoded Message:\n{message}\n")
-            messagebox.showinfo("Success", "Message decoded successfully!")
-        else:
-            self.image_output_text.insert(tk.END, f"Error: {message}\n")
-            messagebox.showerror("Error", message)
+                    self.image_output_text.insert(tk.END, "[INFO] Message decrypted\n\n")
+                
+                self.image_output_text.insert(tk.END, f"Decoded Message:\n{message}\n")
+                messagebox.showinfo("Success", "Message decoded successfully!")
+            else:
+                self.image_output_text.insert(tk.END, f"Error: {message}\n")
+                messagebox.showerror("Error", message)
         
-        self.update_status("Ready")
+        self.run_task("Decoding image...", self.image_steg.decode_image,
+                      (filename,), dict(password=password, key=key),
+                      self.image_steg.DECODE_STAGES, show_result)
     
     def encode_audio(self):
         """Encode message in audio."""
+        if self.busy():
+            return
         if not self.cover_file:
             messagebox.showerror("Error", "Please select a cover audio file first")
             return
@@ -284,27 +460,24 @@ class SteganographyGUI:
         if not output_file:
             return
         
-        self.update_status("Encoding audio...")
         self.audio_output_text.delete("1.0", tk.END)
         
-        threading.Thread(target=self._encode_audio_thread, args=(message, output_file, key), daemon=True).start()
-    
-    def _encode_audio_thread(self, message, output_file, key):
-        """Thread function for encoding audio."""
-        success, result = self.audio_steg.encode_audio(self.cover_file, message, output_file, key)
-        
-        def update_ui():
+        def show_result(outcome):
+            success, result = outcome
             self.audio_output_text.insert(tk.END, result + "\n")
             if success:
                 messagebox.showinfo("Success", "Audio encoded successfully!")
             else:
                 messagebox.showerror("Error", result)
-            self.update_status("Ready")
         
-        self.root.after(0, update_ui)
+        self.run_task("Encoding audio...", self.audio_steg.encode_audio,
+                      (self.cover_file, message, output_file, key),
+                      weights=self.audio_steg.ENCODE_STAGES, on_done=show_result)
     
     def decode_audio(self):
         """Decode message from audio."""
+        if self.busy():
+            return
         filename = filedialog.askopenfilename(
             title="Select stego-audio",
             filetypes=[("WAV files", "*.wav"), ("All files", "*.*")]
@@ -315,25 +488,122 @@ class SteganographyGUI:
         
         key = self.audio_key_entry.get() or None
         
-        self.update_status("Decoding audio...")
         self.audio_output_text.delete("1.0", tk.END)
         
-        success, message = self.audio_steg.decode_audio(filename, key)
+        def show_result(outcome):
+            success, message = outcome
+            if success:
+                self.audio_output_text.insert(tk.END, f"Decoded Message:\n{message}\n")
+                messagebox.showinfo("Success", "Message decoded successfully!")
+            else:
+                self.audio_output_text.insert(tk.END, f"Error: {message}\n")
+                messagebox.showerror("Error", message)
         
-        if success:
-            self.audio_output_text.insert(tk.END, f"Decoded Message:\n{message}\n")
-            messagebox.showinfo("Success", "Message decoded successfully!")
-        else:
-            self.audio_output_text.insert(tk.END, f"Error: {message}\n")
-            messagebox.showerror("Error", message)
+        self.run_task("Decoding audio...", self.audio_steg.decode_audio,
+                      (filename, key, None, self.audio_legacy_keyed.get()),
+                      weights=self.audio_steg.DECODE_STAGES, on_done=show_result)
+    
+    def select_batch_folder(self, which):
+        """Pick the batch input or output folder."""
+        directory = filedialog.askdirectory(title=f"Select {which} folder")
+        if directory:
+            self.batch_dirs[which] = directory
+            self.batch_dir_labels[which].config(text=directory)
+    
+    def select_batch_map(self):
+        """Pick the CSV mapping cover file names to messages."""
+        filename = filedialog.askopenfilename(
+            title="Select message map",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if filename:
+            self.batch_map_file = filename
+            self.batch_map_label.config(text=os.path.basename(filename))
+    
+    def start_batch(self):
+        """Process every file of the input folder in a pool of worker processes."""
+        if self.busy():
+            return
+        input_dir, output_dir = self.batch_dirs["input"], self.batch_dirs["output"]
+        if not input_dir:
+            messagebox.showerror("Error", "Please select an input folder first")
+            return
         
-        self.update_status("Ready")
+        try:
+            if self.batch_mode.get() == "encode":
+                if not output_dir:
+                    messagebox.showerror("Error", "Please select an output folder for the stego files")
+                    return
+                messages = load_message_map(self.batch_map_file) if self.batch_map_file else None
+                items = plan_encode(input_dir, output_dir, self.batch_message_entry.get() or None, messages)
+            else:
+                items = plan_decode(input_dir)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if not items:
+            messagebox.showerror("Error", "No PNG, BMP or WAV files to process in the input folder")
+            return
+        
+        password = self.batch_password_entry.get() or None
+        key = self.batch_key_entry.get() or None
+        workers = max(1, self.batch_workers.get())
+        
+        self.batch_tree.delete(*self.batch_tree.get_children())
+        rows = {}
+        for item in items:
+            rows[id(item)] = self.batch_tree.insert("", tk.END, values=(os.path.basename(item.path), item.status, "", ""))
+        self.batch_items = items
+        self.batch_started, self.batch_finished = time.perf_counter(), None
+        self.show_batch_summary()
+        
+        def process():
+            for item in run_batch(items, password, key, workers):
+                self._call_in_ui(self.show_batch_item, rows[id(item)], item)
+            return items
+        
+        def finished(_=None):
+            self.batch_finished = time.perf_counter()
+            self.show_batch_summary()
+        
+        self.run_task(f"Processing {len(items)} files...", process, weights={"batch": 1},
+                      on_done=finished, on_cancel=finished)
+    
+    def show_batch_item(self, row, item):
+        """Show one finished batch file in the results table."""
+        self.batch_tree.item(row, values=(os.path.basename(item.path), item.status, f"{item.seconds:.2f}",
+                                          item.detail.replace("\n", " ")))
+        self.show_batch_summary()
+    
+    def show_batch_summary(self):
+        """Status counts and throughput of the current batch."""
+        elapsed = (self.batch_finished or time.perf_counter()) - self.batch_started
+        summary = summarize(self.batch_items, elapsed)
+        self.batch_summary_label.config(
+            text=f"{summary['ok']} ok, {summary['failed']} failed, {summary['cancelled']} cancelled, "
+                 f"{summary['queued']} queued | {summary['files_per_second']:.1f} files/s, "
+                 f"{summary['mb_per_second']:.1f} MB/s"
+        )
+    
+    def export_batch_csv(self):
+        """Save the batch results as CSV."""
+        if not self.batch_items:
+            messagebox.showerror("Error", "Run a batch first")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if filename:
+            write_csv(self.batch_items, filename)
+            self.update_status(f"Results saved to {filename}")
     
     def clear_image_tab(self):
         """Clear image tab fields."""
         self.image_message_text.delete("1.0", tk.END)
         self.image_output_text.delete("1.0", tk.END)
         self.image_password_entry.delete(0, tk.END)
+        self.image_key_entry.delete(0, tk.END)
         self.cover_file = None
         self.image_cover_label.config(text="No file selected")
         self.image_capacity_label.config(text="Capacity: Select an image first")
@@ -343,6 +613,7 @@ class SteganographyGUI:
         self.audio_message_text.delete("1.0", tk.END)
         self.audio_output_text.delete("1.0", tk.END)
         self.audio_key_entry.delete(0, tk.END)
+        self.audio_legacy_keyed.set(False)
         self.cover_file = None
         self.audio_cover_label.config(text="No file selected")
         self.audio_capacity_label.config(text="Capacity: Select an audio file first")
@@ -382,6 +653,13 @@ AUDIO STEGANOGRAPHY:
 4. Click 'Encode Message' and save the stego-audio
 5. To decode: Use the same key if one was used during encoding
 
+BATCH:
+1. Choose encode or decode and select the input folder
+2. For encode, select an output folder and enter a message, or pick a
+   CSV message map (columns: file, message or message_file)
+3. Click 'Start Batch'; files are processed in parallel worker processes
+4. Click 'Export CSV' to save the per-file results
+
 TIPS:
 • PNG is recommended for images (lossless)
 • Larger files have more capacity
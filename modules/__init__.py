@@ -1,9 +1,23 @@
 
 
-from .image_steg import ImageSteganography, encode_image, decode_image, get_image_capacity
-from .audio_steg import AudioSteganography, encode_audio, decode_audio, get_audio_capacity
+from .image_steg import (ImageSteganography, ImageOutput, encode_image, decode_image, update_image_payload,
+                         get_image_capacity, encode_image_slot, decode_image_slot)
+from .audio_steg import (AudioSteganography, encode_audio, decode_audio, update_audio_payload, get_audio_capacity,
+                         encode_audio_slot, decode_audio_slot)
+from .video_steg import VideoSteganography, encode_video, decode_video, get_video_capacity
+from .cross_modal import CrossModalEncoder, encode_cross_modal, decode_cross_modal
+from .cover_index import CoverIndex
+from .slots import SlotTable
+from .cost import CarrierCost, estimate_cost
+from .batch import BatchItem, plan_encode, plan_decode, run_batch
 
 __all__ = [
-    'ImageSteganography', 'encode_image', 'decode_image', 'get_image_capacity',
-    'AudioSteganography', 'encode_audio', 'decode_audio', 'get_audio_capacity'
+    'ImageSteganography', 'ImageOutput', 'encode_image', 'decode_image', 'update_image_payload', 'get_image_capacity',
+    'encode_image_slot', 'decode_image_slot',
+    'AudioSteganography', 'encode_audio', 'decode_audio', 'update_audio_payload', 'get_audio_capacity',
+    'encode_audio_slot', 'decode_audio_slot',
+    'VideoSteganography', 'encode_video', 'decode_video', 'get_video_capacity',
+    'CrossModalEncoder', 'encode_cross_modal', 'decode_cross_modal',
+    'CoverIndex', 'SlotTable', 'CarrierCost', 'estimate_cost',
+    'BatchItem', 'plan_encode', 'plan_decode', 'run_batch'
 ]
@@ -1,12 +1,57 @@
 
 
+import os
+import struct
 import wave
 import numpy as np
 from typing import Tuple, Optional
 import hashlib
 
+from .payload import (PayloadHeader, KeyedPermutation, pack_message, unpack_message, decrypt_text,
+                      bits_to_bytes, extract_bits, decode_legacy, payload_carrier_bits, embed_payload,
+                      patch_payload, extract_header, extract_body)
+from utils.timing import span
+from utils import progress
+from .slots import SlotTable, DEFAULT_SLOTS
+
+
+def _wav_data_chunk(handle) -> Tuple[int, int]:
+    """Return (offset, size in bytes) of the sample data in a RIFF/WAVE file."""
+    riff, _, wave_id = struct.unpack('<4sI4s', handle.read(12))
+    if riff != b'RIFF' or wave_id != b'WAVE':
+        raise ValueError("Not a RIFF/WAVE file")
+
+    file_size = os.fstat(handle.fileno()).st_size
+    while True:
+        chunk = handle.read(8)
+        if len(chunk) < 8:
+            raise ValueError("WAV file has no data chunk")
+        chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+        if chunk_id == b'data':
+            offset = handle.tell()
+            # Streamed writers may leave a placeholder size behind
+            return offset, min(chunk_size, file_size - offset)
+        handle.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+def _open_samples(path: str, mode: str = 'r') -> np.ndarray:
+    """Memory-map the 16-bit samples of a WAV file without reading them
+    (mode 'r+' writes changes straight back to the file)."""
+    with open(path, 'rb') as handle:
+        offset, size = _wav_data_chunk(handle)
+    count = size // 2
+    if count == 0:
+        return np.zeros(0, dtype=np.int16)
+    return np.memmap(path, dtype='<i2', mode=mode, offset=offset, shape=(count,))
+
+# Frames read or written per call; progress is reported once per chunk
+AUDIO_CHUNK_FRAMES = 1 << 16
+
+
 class AudioSteganography:
-   
+    
+    # Share of each stage in the overall progress of encode_audio / decode_audio
+    ENCODE_STAGES = {'load': 0.4, 'pack': 0.05, 'embed': 0.1, 'save': 0.45}
+    DECODE_STAGES = {'extract': 0.9, 'unpack': 0.1}
     
     def __init__(self):
         self.delimiter = "<<<END>>>"
@@ -41,99 +86,256 @@ class AudioSteganography:
         return text
     
     def _generate_positions(self, key: str, total_samples: int, message_length: int) -> list:
-        
+        """Keyed positions used by stego-audio written before KeyedPermutation."""
         
         seed = int(hashlib.sha256(key.encode()).hexdigest(), 16) % (2**32)
         np.random.seed(seed)
         
         positions = np.random.choice(total_samples, size=message_length, replace=False)
-        return positions.tolist()
+        return positions
     
-    def encode_audio(self, cover_audio_path: str, secret_message: str,
-                     output_path: str, key: Optional[str] = None) -> Tuple[bool, str]:
+    def _capacity_error(self, payload: bytes, matrix_k: int, samples: int,
+                        max_capacity: int) -> Optional[str]:
         
+        if matrix_k:
+            needed = payload_carrier_bits(payload, matrix_k)
+            if needed > samples:
+                return f"Message too long for matrix embedding (k={matrix_k})! Needs {needed} samples, audio has {samples}"
+        elif len(payload) - PayloadHeader.SIZE > max_capacity:
+            return f"Message too long! Max capacity: {max_capacity} bytes, Message: {len(payload) - PayloadHeader.SIZE} bytes"
+        return None
+    
+    def encode_audio(self, cover_audio_path: str, secret_message: str,
+                     output_path: str, key: Optional[str] = None,
+                     compression: Optional[str] = None,
+                     password: Optional[str] = None,
+                     matrix_k: int = 0, ecc_symbols: int = 0) -> Tuple[bool, str]:
+        """Embed a message; a matrix_k of 2-8 Hamming-codes the body so at
+        most one LSB changes per 2**k - 1 samples, at the cost of capacity.
+        ecc_symbols adds Reed-Solomon parity so a channel that flips the
+        odd LSB does not destroy the message."""
         try:
             
-            with wave.open(cover_audio_path, 'rb') as audio:
+            with span('load') as stage, wave.open(cover_audio_path, 'rb') as audio:
                 params = audio.getparams()
                 n_frames = params.nframes
-                n_channels = params.nchannels
-                sampwidth = params.sampwidth
-                framerate = params.framerate
+                frame_bytes = params.nchannels * params.sampwidth
                 
-                frames = audio.readframes(n_frames)
+                # Read into one writable buffer, chunk by chunk, and embed in place
+                frames = bytearray(n_frames * frame_bytes)
+                filled = 0
+                while filled < len(frames):
+                    chunk = audio.readframes(AUDIO_CHUNK_FRAMES)
+                    if not chunk:
+                        break
+                    frames[filled:filled + len(chunk)] = chunk
+                    filled += len(chunk)
+                    progress.report('load', filled, len(frames))
+                del frames[filled:]
+                stage.add_bytes(len(frames))
             
             audio_data = np.frombuffer(frames, dtype=np.int16)
             
             max_capacity = self.calculate_capacity(cover_audio_path)
-            message_with_delimiter = secret_message + self.delimiter
+            with span('pack'):
+                payload = pack_message(secret_message, compression, password, steg_key=key, matrix_k=matrix_k,
+                                       ecc_symbols=ecc_symbols)
+            progress.report('pack', 1, 1)
             
-            if len(message_with_delimiter) > max_capacity:
-                return False, f"Message too long! Max capacity: {max_capacity} bytes, Message: {len(message_with_delimiter)} bytes"
+            error = self._capacity_error(payload, matrix_k, len(audio_data), max_capacity)
+            if error:
+                return False, error
             
-            binary_message = self._text_to_binary(message_with_delimiter)
-            message_length = len(binary_message)
+            permutation = KeyedPermutation(key, len(audio_data)) if key else None
             
-            if key:
-                positions = self._generate_positions(key, len(audio_data), message_length)
-            else:
-                positions = list(range(message_length))  
+            with span('embed', len(payload)):
+                embed_payload(audio_data, payload, matrix_k, permutation)
+            progress.report('embed', 1, 1)
             
-            modified_audio = audio_data.copy()
-            for i, pos in enumerate(positions):
-                if i >= message_length:
-                    break
-                
-                sample = int(modified_audio[pos])
-                
-                modified_audio[pos] = (sample & ~1) | int(binary_message[i])
-            
-            with wave.open(output_path, 'wb') as stego_audio:
-                stego_audio.setparams(params)
-                stego_audio.writeframes(modified_audio.tobytes())
+            # Written to output_path.part, so a save stopped part-way
+            # leaves no truncated file behind
+            partial = f"{output_path}.part"
+            try:
+                with span('save', len(frames)), wave.open(partial, 'wb') as stego_audio:
+                    stego_audio.setparams(params)
+                    view = memoryview(frames)
+                    step = AUDIO_CHUNK_FRAMES * frame_bytes
+                    for offset in range(0, len(frames), step):
+                        stego_audio.writeframesraw(view[offset:offset + step])
+                        progress.report('save', min(offset + step, len(frames)), len(frames))
+                    view.release()
+                os.replace(partial, output_path)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
             
             return True, f"Message encoded successfully! Stego-audio saved to {output_path}"
         
+        except progress.Cancelled as e:
+            return False, f"Encoding stopped: {e}"
         except Exception as e:
             return False, f"Error encoding audio: {str(e)}"
     
-    def decode_audio(self, stego_audio_path: str, key: Optional[str] = None) -> Tuple[bool, str]:
-      
+    def decode_audio(self, stego_audio_path: str, key: Optional[str] = None,
+                     password: Optional[str] = None,
+                     legacy_keyed: bool = False) -> Tuple[bool, str]:
+        """Decode a hidden message.
+        
+        Samples are memory-mapped and only the embedded bits are read, so
+        with a key the MAC-protected header is checked after at most a few
+        hundred samples and a wrong key is rejected from the header alone.
+        Keyed stego-audio from before the header MAC has no such header;
+        pass legacy_keyed=True to fall back to that format when a key finds
+        none, at the cost of a full-file permutation.
+        """
         try:
             
-            with wave.open(stego_audio_path, 'rb') as audio:
-                params = audio.getparams()
-                n_frames = params.nframes
-                frames = audio.readframes(n_frames)
-            
-            audio_data = np.frombuffer(frames, dtype=np.int16)
+            audio_data = _open_samples(stego_audio_path)
             
             max_bits = len(audio_data)
+            permutation = KeyedPermutation(key, max_bits) if key and max_bits else None
             
-            initial_extract_size = min(max_bits, 10000 * 8)  
+            with span('extract') as stage:
+                header = extract_header(audio_data, key, permutation)
+                if header is not None and header.carrier_bits <= max_bits:
+                    body = extract_body(audio_data, header, permutation)
+                    stage.add_bytes(len(body))
+            progress.report('extract', 1, 1)
+            
+            if header is not None:
+                if header.carrier_bits > max_bits:
+                    return False, "Corrupt payload header: length exceeds audio capacity"
+                with span('unpack'):
+                    message = unpack_message(header, body, password)
+                progress.report('unpack', 1, 1)
+                return True, message
             
+            if key and not legacy_keyed:
+                return False, "No hidden message found (wrong key?)"
+            
+            # Stego-audio written before the binary header was introduced
+            initial_extract_size = min(max_bits, 10000 * 8) // 8 * 8
             if key:
-                
-                positions = self._generate_positions(key, len(audio_data), initial_extract_size)
+                positions = self._generate_positions(key, max_bits, initial_extract_size)
+                bits = extract_bits(audio_data, initial_extract_size, positions)
             else:
-                
-                positions = list(range(initial_extract_size))
+                bits = extract_bits(audio_data, initial_extract_size)
             
-            binary_data = ""
-            for pos in positions:
-                binary_data += str(int(audio_data[pos]) & 1)
+            message = decode_legacy(bits_to_bytes(bits), self.delimiter)
             
-            extracted_text = self._binary_to_text(binary_data)
-            
-            if self.delimiter in extracted_text:
-                message = extracted_text.split(self.delimiter)[0]
-                return True, message
+            if message is not None:
+                return True, decrypt_text(message, password)
+            elif key:
+                return False, "No hidden message found (wrong key?)"
             else:
                 return False, "No hidden message found or delimiter missing (key might be incorrect)"
         
+        except progress.Cancelled as e:
+            return False, f"Decoding stopped: {e}"
         except Exception as e:
             return False, f"Error decoding audio: {str(e)}"
     
+    def update_payload(self, stego_audio_path: str, new_message: str,
+                       key: Optional[str] = None, compression: Optional[str] = None,
+                       password: Optional[str] = None, matrix_k: Optional[int] = None,
+                       ecc_symbols: Optional[int] = None) -> Tuple[bool, str]:
+        """Replace the hidden message of a stego-WAV in place.
+        
+        The current header is read (and checked against the key) first, and
+        matrix_k / ecc_symbols default to its settings. Only samples whose
+        LSB differs are written, through a writable memory map, so the file
+        is patched rather than rewritten. Encrypted payloads get a fresh salt
+        and nonce, so their body bits change almost entirely.
+        """
+        try:
+            
+            samples = _open_samples(stego_audio_path, mode='r+')
+            permutation = KeyedPermutation(key, len(samples)) if key and len(samples) else None
+            
+            header = extract_header(samples, key, permutation)
+            if header is None:
+                return False, "No updatable payload found (wrong key or legacy stego-audio?)"
+            
+            matrix_k = header.matrix_k if matrix_k is None else matrix_k
+            ecc_symbols = header.ecc_symbols if ecc_symbols is None else ecc_symbols
+            with span('pack'):
+                payload = pack_message(new_message, compression, password, steg_key=key, matrix_k=matrix_k,
+                                       ecc_symbols=ecc_symbols)
+            
+            error = self._capacity_error(payload, matrix_k, len(samples), self.calculate_capacity(stego_audio_path))
+            if error:
+                return False, error
+            
+            with span('embed', len(payload)):
+                changed = patch_payload(samples, payload, matrix_k, permutation, header.carrier_bits)
+            with span('save', changed * samples.itemsize):
+                samples.flush()
+            return True, f"Payload updated in place: {changed} samples changed"
+        
+        except Exception as e:
+            return False, f"Error updating audio payload: {str(e)}"
+    
+    def encode_slot(self, cover_audio_path: str, secret_message: str, output_path: str,
+                    key: str, slots: int = DEFAULT_SLOTS, compression: Optional[str] = None,
+                    password: Optional[str] = None, matrix_k: int = 0,
+                    ecc_symbols: int = 0) -> Tuple[bool, str]:
+        """Embed a message into one keyed slot of a multi-recipient WAV.
+        
+        A cover that already has a slot table keeps it (and its other
+        payloads); otherwise a table with the given number of slots is
+        started. Encoding again with the same key replaces that key's slot.
+        """
+        try:
+            
+            with wave.open(cover_audio_path, 'rb') as audio:
+                params = audio.getparams()
+                frames = audio.readframes(params.nframes)
+            
+            modified_audio = np.frombuffer(frames, dtype=np.int16).copy()
+            
+            table = SlotTable.read(modified_audio) or SlotTable(len(modified_audio), slots)
+            region = table.allocate(modified_audio, key)
+            payload = pack_message(secret_message, compression, password, steg_key=key, matrix_k=matrix_k,
+                                   ecc_symbols=ecc_symbols)
+            
+            needed = payload_carrier_bits(payload, matrix_k)
+            if needed > region.size:
+                return False, f"Message too long for one slot! Needs {needed} samples, slot has {region.size}"
+            
+            embed_payload(modified_audio, payload, matrix_k, region)
+            table.write(modified_audio)
+            
+            with wave.open(output_path, 'wb') as stego_audio:
+                stego_audio.setparams(params)
+                stego_audio.writeframes(modified_audio.tobytes())
+            
+            return True, f"Message encoded into slot {region.index} of {table.slots}! Stego-audio saved to {output_path}"
+        
+        except Exception as e:
+            return False, f"Error encoding audio slot: {str(e)}"
+    
+    def decode_slot(self, stego_audio_path: str, key: str,
+                    password: Optional[str] = None) -> Tuple[bool, str]:
+        """Decode the slot written with key; samples are memory-mapped, so
+        only the probed headers and that slot are read."""
+        try:
+            
+            audio_data = _open_samples(stego_audio_path)
+            table = SlotTable.read(audio_data)
+            if table is None:
+                return False, "No slot table found in audio"
+            
+            found = table.find(audio_data, key)
+            if found is None:
+                return False, "No slot found for this key (wrong key?)"
+            region, header = found
+            if header.carrier_bits > region.size:
+                return False, "Corrupt payload header: length exceeds slot capacity"
+            return True, unpack_message(header, extract_body(audio_data, header, region), password)
+        
+        except Exception as e:
+            return False, f"Error decoding audio slot: {str(e)}"
+    
     def compare_audio(self, original_path: str, stego_path: str) -> dict:
         
         try:
@@ -180,15 +382,44 @@ class AudioSteganography:
             return {'error': str(e)}
 
 def encode_audio(cover_audio_path: str, secret_message: str,
-                 output_path: str, key: Optional[str] = None) -> Tuple[bool, str]:
+                 output_path: str, key: Optional[str] = None,
+                 compression: Optional[str] = None,
+                 password: Optional[str] = None, matrix_k: int = 0,
+                 ecc_symbols: int = 0) -> Tuple[bool, str]:
     
     steg = AudioSteganography()
-    return steg.encode_audio(cover_audio_path, secret_message, output_path, key)
+    return steg.encode_audio(cover_audio_path, secret_message, output_path, key, compression, password,
+                             matrix_k, ecc_symbols)
 
-def decode_audio(stego_audio_path: str, key: Optional[str] = None) -> Tuple[bool, str]:
+def decode_audio(stego_audio_path: str, key: Optional[str] = None,
+                 password: Optional[str] = None, legacy_keyed: bool = False) -> Tuple[bool, str]:
    
     steg = AudioSteganography()
-    return steg.decode_audio(stego_audio_path, key)
+    return steg.decode_audio(stego_audio_path, key, password, legacy_keyed)
+
+def update_audio_payload(stego_audio_path: str, new_message: str,
+                         key: Optional[str] = None, compression: Optional[str] = None,
+                         password: Optional[str] = None, matrix_k: Optional[int] = None,
+                         ecc_symbols: Optional[int] = None) -> Tuple[bool, str]:
+    
+    steg = AudioSteganography()
+    return steg.update_payload(stego_audio_path, new_message, key, compression, password,
+                               matrix_k, ecc_symbols)
+
+def encode_audio_slot(cover_audio_path: str, secret_message: str, output_path: str,
+                      key: str, slots: int = DEFAULT_SLOTS, compression: Optional[str] = None,
+                      password: Optional[str] = None, matrix_k: int = 0,
+                      ecc_symbols: int = 0) -> Tuple[bool, str]:
+    
+    steg = AudioSteganography()
+    return steg.encode_slot(cover_audio_path, secret_message, output_path, key, slots, compression,
+                            password, matrix_k, ecc_symbols)
+
+def decode_audio_slot(stego_audio_path: str, key: str,
+                      password: Optional[str] = None) -> Tuple[bool, str]:
+    
+    steg = AudioSteganography()
+    return steg.decode_slot(stego_audio_path, key, password)
 
 def get_audio_capacity(audio_path: str) -> int:
     
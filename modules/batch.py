@@ -0,0 +1,144 @@
+
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+from utils import progress
+from .cover_index import IMAGE_EXTENSIONS, AUDIO_EXTENSIONS
+from .image_steg import encode_image, decode_image
+from .audio_steg import encode_audio, decode_audio
+
+CSV_FIELDS = ('file', 'operation', 'carrier', 'status', 'detail', 'output', 'bytes', 'seconds')
+
+
+class BatchItem:
+    """One file of a batch; status goes queued -> ok, failed or cancelled."""
+
+    def __init__(self, path: str, operation: str, message: Optional[str] = None,
+                 output: Optional[str] = None):
+        self.path = path
+        self.operation = operation
+        self.carrier = 'image' if path.lower().endswith(IMAGE_EXTENSIONS) else 'audio'
+        self.message = message
+        self.output = output
+        self.bytes = os.path.getsize(path)
+        self.status = 'queued'
+        self.detail = ''
+        self.seconds = 0.0
+
+    def row(self) -> dict:
+
+        return {'file': os.path.basename(self.path), 'operation': self.operation, 'carrier': self.carrier,
+                'status': self.status, 'detail': self.detail, 'output': self.output or '',
+                'bytes': self.bytes, 'seconds': round(self.seconds, 4)}
+
+
+def _carrier_files(directory: str) -> List[str]:
+
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(IMAGE_EXTENSIONS + AUDIO_EXTENSIONS)
+                  and os.path.isfile(os.path.join(directory, name)))
+
+
+def load_message_map(csv_path: str) -> Dict[str, str]:
+    """Cover file name -> message, from a CSV with a 'file' column and
+    either a 'message' column or a 'message_file' column naming a text
+    file (relative to the CSV)."""
+    base = os.path.dirname(os.path.abspath(csv_path))
+    messages = {}
+    with open(csv_path, newline='', encoding='utf-8') as handle:
+        reader = csv.DictReader(handle)
+        if 'file' not in (reader.fieldnames or ()):
+            raise ValueError("Message map needs a 'file' column")
+        for row in reader:
+            if row.get('message'):
+                messages[row['file']] = row['message']
+            elif row.get('message_file'):
+                with open(os.path.join(base, row['message_file']), encoding='utf-8') as text:
+                    messages[row['file']] = text.read()
+    return messages
+
+
+def plan_encode(cover_dir: str, output_dir: str, message: Optional[str] = None,
+                messages: Optional[Dict[str, str]] = None) -> List[BatchItem]:
+    """An encode of every cover in cover_dir into output_dir/stego_<name>,
+    with its message from messages, else message; covers with neither
+    are left out."""
+    if message is None and not messages:
+        raise ValueError("A message or a message map is required")
+    items = []
+    for path in _carrier_files(cover_dir):
+        name = os.path.basename(path)
+        text = (messages or {}).get(name, message)
+        if text is not None:
+            items.append(BatchItem(path, 'encode', text, os.path.join(output_dir, f"stego_{name}")))
+    return items
+
+
+def plan_decode(stego_dir: str) -> List[BatchItem]:
+    """A decode of every stego file in stego_dir."""
+    return [BatchItem(path, 'decode') for path in _carrier_files(stego_dir)]
+
+
+def _process(operation: str, carrier: str, path: str, message: Optional[str], output: Optional[str],
+             password: Optional[str], key: Optional[str]):
+    # Runs in a worker process
+    start = time.perf_counter()
+    if operation == 'encode':
+        encode = encode_image if carrier == 'image' else encode_audio
+        success, detail = encode(path, message, output, password=password, key=key)
+    else:
+        decode = decode_image if carrier == 'image' else decode_audio
+        success, detail = decode(path, password=password, key=key)
+    return success, detail, time.perf_counter() - start
+
+
+def run_batch(items: List[BatchItem], password: Optional[str] = None, key: Optional[str] = None,
+              workers: Optional[int] = None) -> Iterator[BatchItem]:
+    """Process items in a pool of worker processes, yielding each as it
+    finishes. Progress is reported per file; once the active tracker is
+    cancelled, files not yet started are marked cancelled."""
+    # Fresh interpreters rather than forks of a possibly threaded caller
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        futures = {pool.submit(_process, item.operation, item.carrier, item.path, item.message,
+                               item.output, password, key): item for item in items}
+        for done, future in enumerate(as_completed(futures), 1):
+            item = futures[future]
+            if future.cancelled():
+                item.status = 'cancelled'
+            else:
+                try:
+                    success, item.detail, item.seconds = future.result()
+                    item.status = 'ok' if success else 'failed'
+                except Exception as e:
+                    item.status, item.detail = 'failed', str(e)
+            try:
+                progress.report('batch', done, len(futures))
+            except progress.Cancelled:
+                for pending in futures:
+                    pending.cancel()
+            yield item
+
+
+def summarize(items: List[BatchItem], elapsed: float) -> dict:
+    """Counts per status and throughput over the files processed so far."""
+    finished = [item for item in items if item.status in ('ok', 'failed')]
+    total_bytes = sum(item.bytes for item in finished)
+    summary = {status: sum(item.status == status for item in items)
+               for status in ('queued', 'ok', 'failed', 'cancelled')}
+    summary.update(files=len(items), bytes=total_bytes, seconds=elapsed,
+                   files_per_second=len(finished) / elapsed if elapsed else 0.0,
+                   mb_per_second=total_bytes / 2 ** 20 / elapsed if elapsed else 0.0)
+    return summary
+
+
+def write_csv(items: List[BatchItem], csv_path: str):
+    """One row per item, with the columns in CSV_FIELDS."""
+    with open(csv_path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.DictWriter(handle, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(item.row() for item in items)
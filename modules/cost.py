@@ -0,0 +1,117 @@
+
+import wave
+import numpy as np
+from PIL import Image
+
+from utils.helpers import KDFParams
+from .image_steg import _is_raw, _array_mode
+
+OPERATIONS = ('encode', 'decode', 'capacity')
+
+# Bytes per pixel of the array an image is loaded into; other modes are
+# converted to RGB, with Pillow's decoded source image alive alongside
+IMAGE_PIXEL_BYTES = {'RGB': 3, 'RGBA': 4, 'L': 1, 'I;16': 2}
+CONVERTED_PIXEL_BYTES = 3 + 4
+
+# Peak memory as a multiple of the decoded carrier: image encode holds the
+# pixels, a band of Pillow's image and the encoder's buffers; audio encode
+# embeds in place in the frames it read, plus a chunk in flight. Audio
+# decode reads a memmap, so its pages are file-backed and reclaimable.
+MEMORY_FACTORS = {
+    ('image', 'encode'): 2.5,
+    ('image', 'decode'): 2.0,
+    ('audio', 'encode'): 1.2,
+    ('audio', 'decode'): 1.0,
+}
+# Carrier values (pixel channels or samples) processed per second, measured
+# on one core with benchmarks/suite.py; PNG compression dominates encode
+THROUGHPUT = {
+    ('image', 'encode'): 3e6,
+    ('image', 'decode'): 5e7,
+    ('audio', 'encode'): 1e8,
+    ('audio', 'decode'): 1e9,
+}
+
+# PBKDF2 iterations or scrypt N per second, measured on one core
+KDF_THROUGHPUT = {
+    KDFParams.PBKDF2_SHA256: 7e6,
+    KDFParams.SCRYPT: 4e5,
+}
+
+
+class CarrierCost:
+    """Estimated peak memory and CPU time of one operation on a carrier."""
+
+    def __init__(self, carrier: str, operation: str, values: int, memory_bytes: int, cpu_seconds: float):
+        self.carrier = carrier
+        self.operation = operation
+        self.values = values
+        self.memory_bytes = memory_bytes
+        self.cpu_seconds = cpu_seconds
+
+    def __repr__(self) -> str:
+        return (f"CarrierCost({self.carrier} {self.operation}: {self.values} values, "
+                f"{self.memory_bytes / 2 ** 20:.1f} MB, {self.cpu_seconds:.2f} s)")
+
+
+def carrier_dimensions(path: str, carrier: str):
+    """(carrier values, decoded bytes) from the file header alone."""
+    if carrier == 'image':
+        if _is_raw(path):
+            # The .npy header alone, so a file still being uploaded can be priced
+            with open(path, 'rb') as handle:
+                version = np.lib.format.read_magic(handle)
+                read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                               else np.lib.format.read_array_header_2_0)
+                shape, _, dtype = read_header(handle)
+            pixels = np.broadcast_to(np.zeros((), dtype), shape)
+            _array_mode(pixels)
+            return pixels.size, pixels.nbytes
+        try:
+            with Image.open(path) as img:
+                pixel_bytes = IMAGE_PIXEL_BYTES.get(img.mode, CONVERTED_PIXEL_BYTES)
+                channels = 1 if img.mode in ('L', 'I;16') else 3
+                return img.width * img.height * channels, img.width * img.height * pixel_bytes
+        except Image.DecompressionBombError:
+            # Pillow refuses to open it at all; price it at the smallest size it refuses
+            pixels = 2 * Image.MAX_IMAGE_PIXELS
+            return pixels * 3, pixels * CONVERTED_PIXEL_BYTES
+    if carrier == 'audio':
+        with wave.open(path, 'rb') as audio:
+            samples = audio.getnframes() * audio.getnchannels()
+            return samples, samples * audio.getsampwidth()
+    raise ValueError(f"Unknown carrier type: {carrier}")
+
+
+def kdf_cost(operation: str):
+    """(memory bytes, CPU seconds) of deriving a password key. Encode uses
+    the default KDF; decode takes its KDF from the carrier's header, so it
+    is priced at the dearest one the header may ask for."""
+    if operation == 'encode':
+        candidates = [KDFParams()]
+    else:
+        candidates = [KDFParams(kdf, cost) for kdf, cost in KDFParams.MAX_COST.items()]
+    return (max(params.memory_bytes for params in candidates),
+            max(2 ** params.cost / KDF_THROUGHPUT[params.kdf] for params in candidates))
+
+
+def estimate_cost(path: str, carrier: str, operation: str, kdf: bool = False) -> CarrierCost:
+    """Cost of an operation on a PNG/BMP/TIFF/raw image or WAV file, read
+    from its header without decoding it, plus a password key derivation
+    when kdf is set. Raises ValueError on files whose header cannot be
+    parsed."""
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+    try:
+        values, decoded_bytes = carrier_dimensions(path, carrier)
+    except (OSError, EOFError, wave.Error) as e:
+        raise ValueError(f"Unreadable {carrier} header: {e}")
+    if operation == 'capacity':
+        return CarrierCost(carrier, operation, values, 0, 0.0)
+    memory_bytes = int(decoded_bytes * MEMORY_FACTORS[carrier, operation])
+    cpu_seconds = values / THROUGHPUT[carrier, operation]
+    if kdf:
+        kdf_memory, kdf_seconds = kdf_cost(operation)
+        memory_bytes += kdf_memory
+        cpu_seconds += kdf_seconds
+    return CarrierCost(carrier, operation, values, memory_bytes, cpu_seconds)
@@ -0,0 +1,221 @@
+
+import os
+import sqlite3
+import hashlib
+import wave
+from PIL import Image
+from typing import Optional, List, Dict
+
+from .image_steg import ImageSteganography, _carrier_values
+
+IMAGE_EXTENSIONS = ('.png', '.bmp')
+AUDIO_EXTENSIONS = ('.wav',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS covers (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    channels INTEGER,
+    n_samples INTEGER,
+    sample_width INTEGER,
+    slots INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS capacities (
+    path TEXT NOT NULL REFERENCES covers(path) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    capacity_bytes INTEGER NOT NULL,
+    PRIMARY KEY (path, depth)
+);
+CREATE INDEX IF NOT EXISTS idx_capacity ON capacities(depth, capacity_bytes);
+CREATE INDEX IF NOT EXISTS idx_kind_capacity ON capacities(depth, kind, capacity_bytes);
+"""
+
+
+class CoverIndex:
+    """Persistent SQLite catalogue of cover files and their embedding capacity.
+
+    Rescans only re-read files whose size or mtime changed, and a changed
+    mtime with an unchanged content hash keeps the stored metadata.
+    """
+
+    def __init__(self, db_path: str = "covers.db", max_depth: int = 4):
+        self.db_path = db_path
+        self.max_depth = max_depth
+        self.overhead = len(ImageSteganography().delimiter) + 10
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _probe(path: str) -> dict:
+        """Read dimensions/sample counts from the container header only."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext in IMAGE_EXTENSIONS:
+            with Image.open(path) as img:
+                width, height = img.size
+                slots = _carrier_values(img.mode, width, height)
+            return {'kind': 'image', 'width': width, 'height': height, 'channels': slots // (width * height),
+                    'n_samples': None, 'sample_width': None, 'slots': slots}
+
+        with wave.open(path, 'rb') as audio:
+            n_frames = audio.getnframes()
+            n_channels = audio.getnchannels()
+            return {'kind': 'audio', 'width': None, 'height': None, 'channels': n_channels,
+                    'n_samples': n_frames * n_channels, 'sample_width': audio.getsampwidth(),
+                    'slots': n_frames * n_channels}
+
+    def _capacity(self, slots: int, depth: int) -> int:
+
+        return max(slots * depth // 8 - self.overhead, 0)
+
+    def _store(self, path: str, stat: os.stat_result, sha256: str, info: dict):
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO covers (path, kind, size, mtime_ns, sha256, width, height, "
+            "channels, n_samples, sample_width, slots) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, info['kind'], stat.st_size, stat.st_mtime_ns, sha256, info['width'], info['height'],
+             info['channels'], info['n_samples'], info['sample_width'], info['slots'])
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO capacities (path, kind, depth, capacity_bytes) VALUES (?, ?, ?, ?)",
+            [(path, info['kind'], depth, self._capacity(info['slots'], depth))
+             for depth in range(1, self.max_depth + 1)]
+        )
+
+    def scan(self, directory: str, recursive: bool = True) -> Dict[str, int]:
+        """Index every supported cover under directory, incrementally."""
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+        root = os.path.abspath(directory)
+
+        known = {
+            row['path']: row for row in self.conn.execute(
+                "SELECT path, size, mtime_ns, sha256 FROM covers WHERE path LIKE ? ESCAPE '\\'",
+                (root.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + os.sep + '%',)
+            )
+        }
+        seen = set()
+
+        with self.conn:
+            for dirpath, dirnames, filenames in os.walk(root):
+                if not recursive:
+                    dirnames.clear()
+                for filename in filenames:
+                    if not filename.lower().endswith(IMAGE_EXTENSIONS + AUDIO_EXTENSIONS):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    seen.add(path)
+
+                    try:
+                        stat = os.stat(path)
+                        row = known.get(path)
+                        if row is not None and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns:
+                            stats['unchanged'] += 1
+                            continue
+
+                        sha256 = self._hash_file(path)
+                        if row is not None and row['sha256'] == sha256:
+                            self.conn.execute("UPDATE covers SET mtime_ns = ? WHERE path = ?",
+                                              (stat.st_mtime_ns, path))
+                            stats['unchanged'] += 1
+                            continue
+
+                        self._store(path, stat, sha256, self._probe(path))
+                        stats['updated' if row is not None else 'added'] += 1
+                    except Exception:
+                        stats['failed'] += 1
+
+            gone = [(path,) for path in known if path not in seen
+                    and (recursive or os.path.dirname(path) == root)]
+            self.conn.executemany("DELETE FROM covers WHERE path = ?", gone)
+            stats['removed'] = len(gone)
+
+        return stats
+
+    def get(self, path: str) -> Optional[dict]:
+
+        row = self.conn.execute("SELECT * FROM covers WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        return dict(row) if row else None
+
+    def find_covers(self, n_bytes: int, depth: int = 1, kind: Optional[str] = None,
+                    limit: int = 1) -> List[dict]:
+        """Return the smallest covers whose capacity at depth fits n_bytes."""
+        query = ("SELECT c.path, c.kind, c.sha256, k.capacity_bytes FROM capacities k "
+                 "JOIN covers c ON c.path = k.path WHERE k.depth = ? AND k.capacity_bytes >= ?")
+        params = [depth, n_bytes]
+        if kind:
+            query += " AND k.kind = ?"
+            params.append(kind)
+        query += " ORDER BY k.capacity_bytes, c.path LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def select_covers(self, n_bytes: int, depth: int = 1, kind: Optional[str] = None) -> List[dict]:
+        """Pick a small set of covers whose combined capacity fits n_bytes.
+
+        A single cover is preferred; otherwise the largest covers are taken
+        until the remainder fits in one more, which is then the smallest
+        cover that still fits it. Returns an empty list if the whole
+        library is too small.
+        """
+        single = self.find_covers(n_bytes, depth, kind)
+        if single:
+            return single
+
+        query = ("SELECT c.path, c.kind, c.sha256, k.capacity_bytes FROM capacities k "
+                 "JOIN covers c ON c.path = k.path WHERE k.depth = ? AND k.capacity_bytes > 0")
+        params = [depth]
+        if kind:
+            query += " AND k.kind = ?"
+            params.append(kind)
+        query += " ORDER BY k.capacity_bytes DESC, c.path"
+
+        chosen = []
+        remaining = n_bytes
+        cursor = self.conn.execute(query, params)
+        for row in cursor:
+            chosen.append(dict(row))
+            remaining -= row['capacity_bytes']
+            if remaining <= 0:
+                break
+            fit = self.find_covers(remaining, depth, kind, limit=len(chosen) + 1)
+            fit = [cover for cover in fit if cover['path'] not in {c['path'] for c in chosen}]
+            if fit:
+                chosen.append(fit[0])
+                return chosen
+
+        return chosen if remaining <= 0 else []
+
+    def stats(self) -> dict:
+
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS covers, COALESCE(SUM(kind = 'image'), 0) AS images, "
+            "COALESCE(SUM(kind = 'audio'), 0) AS audio FROM covers"
+        ).fetchone()
+        return dict(row)
@@ -0,0 +1,194 @@
+
+import os
+import hashlib
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Optional, List, Union
+
+from .image_steg import encode_image, decode_image, get_image_capacity
+from .audio_steg import encode_audio, decode_audio, get_audio_capacity
+from .payload import PayloadHeader, FLAG_MAC
+
+IMAGE_EXTENSIONS = ('.png', '.bmp')
+AUDIO_EXTENSIONS = ('.wav',)
+
+
+class CrossModalEncoder:
+    """Split one payload across a mix of image and WAV carriers.
+
+    Every shard carries a small manifest line (payload id, shard index,
+    shard count, payload digest) so the stego files can be decoded in any
+    order without a side-channel.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.manifest_tag = "XM1"
+        self.max_workers = max_workers
+        self.digest_chars = 16
+
+    @staticmethod
+    def carrier_type(path: str) -> str:
+
+        ext = os.path.splitext(path)[1].lower()
+        if ext in IMAGE_EXTENSIONS:
+            return 'image'
+        if ext in AUDIO_EXTENSIONS:
+            return 'audio'
+        raise ValueError(f"Unsupported carrier: {path}")
+
+    def _manifest(self, payload_id: str, index: int, count: int, digest: str) -> bytes:
+
+        return f"{self.manifest_tag}:{payload_id}:{index}:{count}:{digest}:".encode('ascii')
+
+    def _manifest_size(self, count: int) -> int:
+
+        return len(self._manifest('x' * 8, count, count, 'x' * self.digest_chars))
+
+    def carrier_capacity(self, path: str) -> int:
+
+        if self.carrier_type(path) == 'image':
+            return get_image_capacity(path)
+        return get_audio_capacity(path)
+
+    def plan_shards(self, capacities: List[int], payload_size: int,
+                    key: Optional[str] = None) -> List[int]:
+        """Split payload_size bytes proportionally to each carrier's free
+        capacity, after the manifest and the header extensions every shard
+        carries (the MAC when embedded with a key)."""
+        overhead = self._manifest_size(len(capacities))
+        overhead += PayloadHeader.extension_size(FLAG_MAC if key else 0)
+        usable = [max(capacity - overhead, 0) for capacity in capacities]
+        total_usable = sum(usable)
+
+        if payload_size > total_usable:
+            raise ValueError(f"Payload too large! Combined capacity: {total_usable} bytes, Payload: {payload_size} bytes")
+
+        sizes = [payload_size * free // total_usable if total_usable else 0 for free in usable]
+
+        # Hand the rounding remainder to whichever carriers still have room.
+        remainder = payload_size - sum(sizes)
+        for i in sorted(range(len(sizes)), key=lambda i: usable[i] - sizes[i], reverse=True):
+            if remainder == 0:
+                break
+            extra = min(remainder, usable[i] - sizes[i])
+            sizes[i] += extra
+            remainder -= extra
+
+        return sizes
+
+    def encode(self, carrier_paths: List[str], secret_message: str, output_paths: List[str],
+               key: Optional[str] = None) -> Tuple[bool, Union[dict, str]]:
+        """Encode secret_message across carriers; returns (True, manifest) on success."""
+        try:
+            if len(carrier_paths) != len(output_paths):
+                return False, "Each carrier needs exactly one output path"
+            if not carrier_paths:
+                return False, "At least one carrier is required"
+
+            kinds = [self.carrier_type(path) for path in carrier_paths]
+
+            # Shards are cut on UTF-8 bytes and embedded as binary payloads.
+            payload = secret_message.encode('utf-8')
+            payload_id = uuid.uuid4().hex[:8]
+            digest = hashlib.sha256(payload).hexdigest()[:self.digest_chars]
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                capacities = list(pool.map(self.carrier_capacity, carrier_paths))
+                sizes = self.plan_shards(capacities, len(payload), key)
+
+                futures = []
+                offset = 0
+                for index, (cover, output, kind, size) in enumerate(zip(carrier_paths, output_paths, kinds, sizes)):
+                    shard = self._manifest(payload_id, index, len(sizes), digest) + payload[offset:offset + size]
+                    offset += size
+                    if kind == 'image':
+                        futures.append(pool.submit(encode_image, cover, shard, output, None, None, key))
+                    else:
+                        futures.append(pool.submit(encode_audio, cover, shard, output, key))
+
+                results = [future.result() for future in futures]
+
+            failures = [msg for success, msg in results if not success]
+            if failures:
+                return False, "; ".join(failures)
+
+            return True, {
+                'payload_id': payload_id,
+                'payload_bytes': len(payload),
+                'digest': digest,
+                'shards': [
+                    {'index': index, 'carrier': cover, 'output': output, 'type': kind,
+                     'capacity_bytes': capacity, 'shard_bytes': size}
+                    for index, (cover, output, kind, capacity, size)
+                    in enumerate(zip(carrier_paths, output_paths, kinds, capacities, sizes))
+                ]
+            }
+
+        except Exception as e:
+            return False, f"Error encoding cross-modal payload: {str(e)}"
+
+    def _parse_shard(self, shard: bytes) -> Tuple[str, int, int, str, bytes]:
+
+        if not isinstance(shard, bytes):
+            raise ValueError("missing cross-modal manifest")
+        tag, payload_id, index, count, digest, data = shard.split(b':', 5)
+        if tag.decode('ascii') != self.manifest_tag:
+            raise ValueError("missing cross-modal manifest")
+        return payload_id.decode('ascii'), int(index), int(count), digest.decode('ascii'), data
+
+    def decode(self, stego_paths: List[str], key: Optional[str] = None) -> Tuple[bool, str]:
+        """Reassemble a payload from its stego files, given in any order."""
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = []
+                for path in stego_paths:
+                    if self.carrier_type(path) == 'image':
+                        futures.append(pool.submit(decode_image, path, None, key))
+                    else:
+                        futures.append(pool.submit(decode_audio, path, key))
+                results = [future.result() for future in futures]
+
+            shards = {}
+            expected = None
+            for path, (success, shard) in zip(stego_paths, results):
+                if not success:
+                    return False, f"{os.path.basename(path)}: {shard}"
+                try:
+                    payload_id, index, count, digest, data = self._parse_shard(shard)
+                except ValueError:
+                    return False, f"{os.path.basename(path)}: not a cross-modal shard"
+
+                if expected is None:
+                    expected = (payload_id, count, digest)
+                elif expected != (payload_id, count, digest):
+                    return False, "Stego files belong to different payloads"
+                shards[index] = data
+
+            if expected is None:
+                return False, "No stego files given"
+
+            payload_id, count, digest = expected
+            missing = sorted(set(range(count)) - set(shards))
+            if missing:
+                return False, f"Missing shard(s): {missing}"
+
+            payload = b''.join(shards[i] for i in range(count))
+            if hashlib.sha256(payload).hexdigest()[:self.digest_chars] != digest:
+                return False, "Payload digest mismatch (corrupted shard?)"
+
+            return True, payload.decode('utf-8')
+
+        except Exception as e:
+            return False, f"Error decoding cross-modal payload: {str(e)}"
+
+
+def encode_cross_modal(carrier_paths: List[str], secret_message: str, output_paths: List[str],
+                       key: Optional[str] = None) -> Tuple[bool, Union[dict, str]]:
+
+    encoder = CrossModalEncoder()
+    return encoder.encode(carrier_paths, secret_message, output_paths, key)
+
+def decode_cross_modal(stego_paths: List[str], key: Optional[str] = None) -> Tuple[bool, str]:
+
+    encoder = CrossModalEncoder()
+    return encoder.decode(stego_paths, key)
@@ -1,22 +1,235 @@
 
 
+
+import os
+import zlib
 from PIL import Image
 import numpy as np
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
+
+from .payload import (PayloadHeader, KeyedPermutation, pack_message, unpack_message, decrypt_text,
+                      bits_to_bytes, extract_bits, decode_legacy, payload_carrier_bits, embed_payload,
+                      patch_payload, extract_header, extract_body, read_header)
+from .png_rows import PNGRowReader
+from utils.timing import span
+from utils import progress
+from .slots import SlotTable, DEFAULT_SLOTS
+
+NPY_MAGIC = b'\x93NUMPY'
+# Modes embedded as stored, with the channels per pixel that carry payload
+# bits (RGBA alpha only on request); other modes are converted to RGB
+NATIVE_MODES = {'RGB': 3, 'RGBA': 3, 'L': 1, 'I;16': 1}
+# Pixels are copied out of Pillow in bands of about this many bytes
+BAND_BYTES = 1 << 20
+# Above this many pixels compress_level='auto' trades a few percent of PNG
+# size for a several times faster save
+AUTO_FAST_PIXELS = 1_000_000
+
+
+class ImageOutput:
+    """How a stego-image is written.
+    
+    format is 'png', 'bmp', 'tiff' (uncompressed) or 'raw' (the pixel array
+    as .npy, for pipelines that re-encode downstream); None picks it from
+    the output file extension. compress_level is the PNG zlib level 0-9,
+    or 'auto' for a fast level on large images. png_strategy selects the
+    zlib strategy; 'rle' and 'huffman' suit LSB-noisy pixel data and are
+    much faster than the default. Pillow chooses the row filters itself.
+    """
+    
+    FORMATS = {'png': 'PNG', 'bmp': 'BMP', 'tiff': 'TIFF', 'raw': None}
+    # Formats that write RGBA pixels back with their alpha channel
+    ALPHA_FORMATS = ('png', 'tiff', 'raw')
+    EXTENSIONS = {'.png': 'png', '.bmp': 'bmp', '.tif': 'tiff', '.tiff': 'tiff', '.npy': 'raw'}
+    STRATEGIES = {'default': zlib.Z_DEFAULT_STRATEGY, 'filtered': zlib.Z_FILTERED,
+                  'huffman': zlib.Z_HUFFMAN_ONLY, 'rle': zlib.Z_RLE, 'fixed': zlib.Z_FIXED}
+    
+    def __init__(self, format: Optional[str] = None, compress_level: Union[int, str, None] = None,
+                 png_strategy: Optional[str] = None):
+        if format is not None and format not in self.FORMATS:
+            raise ValueError(f"Unknown output format: {format}")
+        if compress_level not in (None, 'auto') and not (isinstance(compress_level, int) and 0 <= compress_level <= 9):
+            raise ValueError("PNG compress_level must be 0-9 or 'auto'")
+        if png_strategy is not None and png_strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown PNG strategy: {png_strategy}")
+        self.format = format
+        self.compress_level = compress_level
+        self.png_strategy = png_strategy
+    
+    def format_for(self, path: str) -> str:
+        
+        if self.format is not None:
+            return self.format
+        return self.EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'png')
+    
+    def png_options(self, pixels: int) -> dict:
+        
+        options = {}
+        level, strategy = self.compress_level, self.png_strategy
+        if level == 'auto':
+            level = None
+            if pixels >= AUTO_FAST_PIXELS:
+                level, strategy = 1, strategy or 'rle'
+        if level is not None:
+            options['compress_level'] = level
+        if strategy is not None:
+            options['compress_type'] = self.STRATEGIES[strategy]
+        return options
+    
+    def save(self, img_array: np.ndarray, path: str, size_hint: int = 0) -> str:
+        """Write img_array to path and return the format used. size_hint,
+        the expected file size, scales 'save' progress reports."""
+        output_format = self.format_for(path)
+        if output_format == 'raw':
+            # A handle keeps np.save from appending .npy to the name
+            partial = f"{path}.part"
+            try:
+                with open(partial, 'wb') as handle:
+                    np.save(handle, img_array, allow_pickle=False)
+                os.replace(partial, path)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+        elif output_format == 'png':
+            pixels = img_array.shape[0] * img_array.shape[1]
+            _write_image(Image.fromarray(img_array), path, 'PNG', size_hint, **self.png_options(pixels))
+        else:
+            _write_image(Image.fromarray(img_array), path, self.FORMATS[output_format], size_hint)
+        return output_format
+
+
+class _ProgressWriter:
+    """File wrapper reporting 'save' progress as Pillow writes each encoder
+    chunk. Having no fileno() keeps Pillow on its chunked write loop rather
+    than encoding straight to the file descriptor in one call."""
+
+    def __init__(self, handle, expected: int):
+        self._handle = handle
+        self._expected = expected
+        self.written = 0
+
+    def write(self, data) -> int:
+
+        self.written += len(data)
+        progress.report('save', min(self.written, self._expected * 0.99), self._expected)
+        return self._handle.write(data)
+
+    def __getattr__(self, name: str):
+        if name == 'fileno':
+            raise AttributeError(name)
+        return getattr(self._handle, name)
+
+
+def _write_image(img: Image.Image, path: str, image_format: str, size_hint: int = 0, **options):
+    """img.save(path) through path.part, so a save that fails or is
+    cancelled part-way leaves any existing file at path intact. While a
+    tracker is active, progress is reported per chunk; size_hint (default:
+    the uncompressed size) is the expected file size."""
+    partial = f"{path}.part"
+    try:
+        with open(partial, 'wb') as handle:
+            if progress.active():
+                expected = size_hint or img.width * img.height * len(img.getbands())
+                img.save(_ProgressWriter(handle, expected), image_format, **options)
+            else:
+                img.save(handle, image_format, **options)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    if progress.active():
+        progress.report('save', 1, 1)
+
+
+def _is_raw(path: str) -> bool:
+    
+    with open(path, 'rb') as handle:
+        return handle.read(len(NPY_MAGIC)) == NPY_MAGIC
+
+def _array_mode(pixels: np.ndarray) -> str:
+    """Pillow mode of a pixel array, as Image.fromarray picks it."""
+    if pixels.dtype == np.uint8 and pixels.ndim == 3 and pixels.shape[2] in (3, 4):
+        return 'RGB' if pixels.shape[2] == 3 else 'RGBA'
+    if pixels.ndim == 2 and pixels.dtype in (np.uint8, np.dtype('<u2')):
+        return 'L' if pixels.dtype == np.uint8 else 'I;16'
+    raise ValueError("Raw image array must be uint8 (height, width[, 3 or 4]) or uint16 (height, width)")
+
+def _pixels(img: Image.Image) -> np.ndarray:
+    """Copy the pixels of img into a new writable array a band of rows at a
+    time, so the array is the only full-size copy (np.array(img) first
+    builds a full tobytes() string, and convert() another image)."""
+    band = np.asarray(img.crop((0, 0, img.width, 1)))
+    pixels = np.empty((img.height,) + band.shape[1:], dtype=band.dtype)
+    rows = max(1, BAND_BYTES // max(band.nbytes, 1))
+    for top in range(0, img.height, rows):
+        bottom = min(top + rows, img.height)
+        pixels[top:bottom] = np.asarray(img.crop((0, top, img.width, bottom)))
+        progress.report('load', bottom, img.height)
+    return pixels
+
+def _load_pixels(path: str) -> Tuple[np.ndarray, Optional[str]]:
+    """Return (pixel array, Pillow format name) for an image, or (array,
+    None) for a raw .npy array written by ImageOutput. Images in
+    NATIVE_MODES keep their mode; anything else is converted to RGB."""
+    if _is_raw(path):
+        pixels = np.load(path, allow_pickle=False)
+        _array_mode(pixels)
+        return pixels, None
+    with Image.open(path) as img:
+        image_format = img.format or 'PNG'
+        if img.mode not in NATIVE_MODES:
+            img = img.convert('RGB')
+        return _pixels(img), image_format
+
+def _carrier_values(mode: str, width: int, height: int, use_alpha: bool = False) -> int:
+
+    channels = 4 if mode == 'RGBA' and use_alpha else NATIVE_MODES.get(mode, 3)
+    return width * height * channels
+
+def _carrier(pixels: np.ndarray, use_alpha: bool = False) -> np.ndarray:
+    """Flat LSB carrier over pixels. This is a view, except for RGBA pixels
+    with alpha left alone, where it is a copy of the colour channels that
+    _store writes back."""
+    if pixels.ndim == 3 and pixels.shape[2] == 4 and not use_alpha:
+        return np.ascontiguousarray(pixels[..., :3]).reshape(-1)
+    return pixels.reshape(-1)
+
+def _carriers(pixels: np.ndarray):
+    """Carriers a decoder tries: RGBA images hold payloads in their colour
+    channels by default, or in all four with use_alpha."""
+    yield _carrier(pixels)
+    if pixels.ndim == 3 and pixels.shape[2] == 4:
+        yield _carrier(pixels, use_alpha=True)
+
+def _store(pixels: np.ndarray, carrier: np.ndarray):
+    """Write a copied carrier back into pixels; views need nothing."""
+    if not np.shares_memory(pixels, carrier):
+        pixels[..., :3] = carrier.reshape(pixels.shape[:2] + (3,))
+
 
 class ImageSteganography:
-   
+    
+    # Share of each stage in the overall progress of encode_image / decode_image
+    ENCODE_STAGES = {'load': 0.15, 'pack': 0.02, 'embed': 0.03, 'save': 0.8}
+    DECODE_STAGES = {'load': 0.7, 'extract': 0.25, 'unpack': 0.05}
     
     def __init__(self):
         self.delimiter = "<<<END>>>"  
     
-    def calculate_capacity(self, image_path: str) -> int:
+    def calculate_capacity(self, image_path: str, use_alpha: bool = False) -> int:
        
     
-        img = Image.open(image_path)
-        width, height = img.size
+        if _is_raw(image_path):
+            pixels = np.load(image_path, mmap_mode='r', allow_pickle=False)
+            values = _carrier_values(_array_mode(pixels), pixels.shape[1], pixels.shape[0], use_alpha)
+        else:
+            with Image.open(image_path) as img:
+                values = _carrier_values(img.mode, img.width, img.height, use_alpha)
+        return self._max_capacity(values)
+    
+    def _max_capacity(self, values: int) -> int:
         
-        capacity = (width * height * 3) // 8
+        capacity = values // 8
         delimiter_bytes = len(self.delimiter)
         return capacity - delimiter_bytes - 10  
     
@@ -34,93 +247,286 @@ class ImageSteganography:
                 text += chr(int(byte, 2))
         return text
     
+    def _capacity_error(self, payload: bytes, matrix_k: int, values: int,
+                        max_capacity: int) -> Optional[str]:
+        
+        if matrix_k:
+            needed = payload_carrier_bits(payload, matrix_k)
+            if needed > values:
+                return f"Message too long for matrix embedding (k={matrix_k})! Needs {needed} channel values, image has {values}"
+        elif len(payload) - PayloadHeader.SIZE > max_capacity:
+            return f"Message too long! Max capacity: {max_capacity} bytes, Message: {len(payload) - PayloadHeader.SIZE} bytes"
+        return None
+    
     def encode_image(self, cover_image_path: str, secret_message: str, 
-                     output_path: str) -> Tuple[bool, str]:
-       
+                     output_path: str, compression: Optional[str] = None,
+                     password: Optional[str] = None, key: Optional[str] = None,
+                     matrix_k: int = 0, ecc_symbols: int = 0,
+                     output: Optional[ImageOutput] = None, use_alpha: bool = False) -> Tuple[bool, str]:
+        """Embed a message; with a key its bits are scattered over keyed
+        pseudorandom channel positions instead of filling rows from the top.
+        A matrix_k of 2-8 Hamming-codes the body, flipping at most one LSB
+        per 2**k - 1 channel values at the cost of capacity. ecc_symbols adds
+        Reed-Solomon parity so flipped LSBs in the body can be corrected.
+        output sets the file format and PNG compression (see ImageOutput).
+        RGB, RGBA, L and 16-bit I;16 covers keep their mode (and alpha);
+        use_alpha also embeds in the alpha channel of RGBA covers, so it
+        needs an output format that keeps alpha."""
         try:
+            output = output or ImageOutput()
+            output_format = output.format_for(output_path)
+            if use_alpha and output_format not in ImageOutput.ALPHA_FORMATS:
+                return False, f"use_alpha needs an output format that keeps alpha, not {output_format}"
             
-            img = Image.open(cover_image_path)
-            img = img.convert('RGB')  
-            width, height = img.size
-            img_array = np.array(img)
-            
-            max_capacity = self.calculate_capacity(cover_image_path)
-            message_with_delimiter = secret_message + self.delimiter
-            
-            if len(message_with_delimiter) > max_capacity:
-                return False, f"Message too long! Max capacity: {max_capacity} bytes, Message: {len(message_with_delimiter)} bytes"
-            
-            binary_message = self._text_to_binary(message_with_delimiter)
-            message_length = len(binary_message)
-            
-            data_index = 0
-            for i in range(height):
-                for j in range(width):
-                    if data_index >= message_length:
-                        break
-                    
-                    pixel = img_array[i, j]
-                    
-                    for k in range(3):  
-                        if data_index < message_length:
-                            
-                            pixel[k] = (pixel[k] & 0xFE) | int(binary_message[data_index])
-                            data_index += 1
-                    
-                    img_array[i, j] = pixel
-                
-                if data_index >= message_length:
-                    break
+            with span('load') as stage:
+                pixels, _ = _load_pixels(cover_image_path)
+                flat = _carrier(pixels, use_alpha)
+                stage.add_bytes(pixels.nbytes)
+            progress.report('load', 1, 1)
             
-            stego_img = Image.fromarray(img_array)
-            stego_img.save(output_path, 'PNG')
+            with span('pack'):
+                payload = pack_message(secret_message, compression, password, steg_key=key, matrix_k=matrix_k,
+                                       ecc_symbols=ecc_symbols)
+            progress.report('pack', 1, 1)
+            
+            error = self._capacity_error(payload, matrix_k, flat.size, self._max_capacity(flat.size))
+            if error:
+                return False, error
+            
+            with span('embed', len(payload)):
+                permutation = KeyedPermutation(key, flat.size) if key else None
+                embed_payload(flat, payload, matrix_k, permutation)
+                _store(pixels, flat)
+            progress.report('embed', 1, 1)
+            with span('save') as stage:
+                output.save(pixels, output_path, size_hint=os.path.getsize(cover_image_path))
+                stage.add_bytes(os.path.getsize(output_path))
             
             return True, f"Message encoded successfully! Stego-image saved to {output_path}"
         
+        except progress.Cancelled as e:
+            return False, f"Encoding stopped: {e}"
         except Exception as e:
             return False, f"Error encoding image: {str(e)}"
     
-    def decode_image(self, stego_image_path: str) -> Tuple[bool, str]:
-       
+    def _decode_top_rows(self, stego_image_path: str,
+                         password: Optional[str]) -> Optional[Tuple[bool, str]]:
+        """Decode an unkeyed payload from a PNG, inflating only the rows the
+        header and body occupy. Returns None when a full decode is needed
+        (not a non-interlaced PNG, no payload header, or a Pillow whose
+        decoder internals PNGRowReader cannot drive)."""
+        try:
+            reader = PNGRowReader(stego_image_path)
+        except Exception:
+            return None
+        
+        with reader:
+            mode = reader.image.mode
+            for use_alpha in ((False, True) if mode == 'RGBA' else (False,)):
+                row_values = _carrier_values(mode, reader.width, 1, use_alpha)
+                
+                def prefix(values: int) -> np.ndarray:
+                    rows = reader.rows(-(-values // row_values))
+                    if rows.mode not in NATIVE_MODES:
+                        rows = rows.convert('RGB')
+                    return _carrier(np.asarray(rows), use_alpha)
+                
+                def read(n: int) -> bytes:
+                    carrier = prefix(n * 8)
+                    return bits_to_bytes(extract_bits(carrier, min(n * 8, carrier.size)))
+                
+                with span('extract') as stage:
+                    try:
+                        header = read_header(read)
+                        if header is None:
+                            continue
+                        if header.carrier_bits > row_values * reader.height:
+                            return False, "Corrupt payload header: length exceeds image capacity"
+                        body = extract_body(prefix(header.carrier_bits), header)
+                    except progress.Cancelled:
+                        raise
+                    except Exception:
+                        return None
+                    stage.add_bytes(len(body))
+                progress.report('extract', 1, 1)
+                with span('unpack'):
+                    message = unpack_message(header, body, password)
+                progress.report('unpack', 1, 1)
+                return True, message
+            return None
+    
+    def decode_image(self, stego_image_path: str, password: Optional[str] = None,
+                     key: Optional[str] = None) -> Tuple[bool, str]:
+        """Decode a hidden message. Unkeyed payloads sit in the top rows, so
+        for PNGs only those rows are decompressed and decode time does not
+        grow with image height; keyed payloads are scattered and need the
+        whole image."""
         try:
             
-            img = Image.open(stego_image_path)
-            img = img.convert('RGB')
-            width, height = img.size
-            img_array = np.array(img)
-            
-            binary_data = ""
+            if not key:
+                result = self._decode_top_rows(stego_image_path, password)
+                if result is not None:
+                    return result
             
-            for i in range(height):
-                for j in range(width):
-                    pixel = img_array[i, j]
-                    
-                    for k in range(3):  
-                        binary_data += str(pixel[k] & 1)
+            with span('load') as stage:
+                pixels, _ = _load_pixels(stego_image_path)
+                stage.add_bytes(pixels.nbytes)
+            progress.report('load', 1, 1)
+            for flat in _carriers(pixels):
+                permutation = KeyedPermutation(key, flat.size) if key else None
+                with span('extract') as stage:
+                    header = extract_header(flat, key, permutation)
+                    if header is not None and header.carrier_bits <= len(flat):
+                        body = extract_body(flat, header, permutation)
+                        stage.add_bytes(len(body))
+                progress.report('extract', 1, 1)
+                
+                if header is not None:
+                    if header.carrier_bits > len(flat):
+                        return False, "Corrupt payload header: length exceeds image capacity"
+                    with span('unpack'):
+                        message = unpack_message(header, body, password)
+                    progress.report('unpack', 1, 1)
+                    return True, message
             
-            extracted_text = self._binary_to_text(binary_data)
+            if key:
+                return False, "No hidden message found (wrong key?)"
             
-            if self.delimiter in extracted_text:
-                message = extracted_text.split(self.delimiter)[0]
-                return True, message
+            # Stego-images written before the binary header was introduced
+            flat = _carrier(pixels)
+            message = decode_legacy(bits_to_bytes(extract_bits(flat, len(flat) // 8 * 8)), self.delimiter)
+            if message is not None:
+                return True, decrypt_text(message, password)
             else:
                 return False, "No hidden message found or delimiter missing"
         
+        except progress.Cancelled as e:
+            return False, f"Decoding stopped: {e}"
         except Exception as e:
             return False, f"Error decoding image: {str(e)}"
     
+    def update_payload(self, stego_image_path: str, new_message: str,
+                       compression: Optional[str] = None, password: Optional[str] = None,
+                       key: Optional[str] = None, matrix_k: Optional[int] = None,
+                       ecc_symbols: Optional[int] = None) -> Tuple[bool, str]:
+        """Replace the hidden message of a stego-image in place.
+        
+        The current header is read (and checked against the key) first, and
+        matrix_k / ecc_symbols default to its settings. Only channel values
+        whose LSB differs are flipped, and the file is re-encoded only if
+        anything changed, to a temporary file that then replaces it. Encrypted payloads get a fresh salt and nonce, so
+        their body bits change almost entirely.
+        """
+        try:
+            
+            with span('load') as stage:
+                pixels, image_format = _load_pixels(stego_image_path)
+                stage.add_bytes(pixels.nbytes)
+            for flat in _carriers(pixels):
+                permutation = KeyedPermutation(key, flat.size) if key else None
+                header = extract_header(flat, key, permutation)
+                if header is not None:
+                    break
+            else:
+                return False, "No updatable payload found (wrong key or legacy stego-image?)"
+            
+            matrix_k = header.matrix_k if matrix_k is None else matrix_k
+            ecc_symbols = header.ecc_symbols if ecc_symbols is None else ecc_symbols
+            with span('pack'):
+                payload = pack_message(new_message, compression, password, steg_key=key, matrix_k=matrix_k,
+                                       ecc_symbols=ecc_symbols)
+            
+            error = self._capacity_error(payload, matrix_k, flat.size, self._max_capacity(flat.size))
+            if error:
+                return False, error
+            
+            with span('embed', len(payload)):
+                changed = patch_payload(flat, payload, matrix_k, permutation, header.carrier_bits)
+            if not changed:
+                return True, "Payload unchanged; stego-image left as is"
+            
+            with span('save') as stage:
+                _store(pixels, flat)
+                if image_format is None:
+                    ImageOutput('raw').save(pixels, stego_image_path)
+                else:
+                    _write_image(Image.fromarray(pixels), stego_image_path, image_format,
+                                 os.path.getsize(stego_image_path))
+                stage.add_bytes(os.path.getsize(stego_image_path))
+            return True, f"Payload updated: {changed} channel values changed"
+        
+        except progress.Cancelled as e:
+            return False, f"Update stopped: {e}"
+        except Exception as e:
+            return False, f"Error updating image payload: {str(e)}"
+    
+    def encode_slot(self, cover_image_path: str, secret_message: str, output_path: str,
+                    key: str, slots: int = DEFAULT_SLOTS, compression: Optional[str] = None,
+                    password: Optional[str] = None, matrix_k: int = 0, ecc_symbols: int = 0,
+                    output: Optional[ImageOutput] = None) -> Tuple[bool, str]:
+        """Embed a message into one keyed slot of a multi-recipient image.
+        
+        A cover that already has a slot table keeps it (and its other
+        payloads); otherwise a table with the given number of slots is
+        started. Encoding again with the same key replaces that key's slot.
+        """
+        try:
+            
+            pixels, _ = _load_pixels(cover_image_path)
+            flat = _carrier(pixels)
+            
+            table = SlotTable.read(flat) or SlotTable(flat.size, slots)
+            region = table.allocate(flat, key)
+            payload = pack_message(secret_message, compression, password, steg_key=key, matrix_k=matrix_k,
+                                   ecc_symbols=ecc_symbols)
+            
+            needed = payload_carrier_bits(payload, matrix_k)
+            if needed > region.size:
+                return False, f"Message too long for one slot! Needs {needed} channel values, slot has {region.size}"
+            
+            embed_payload(flat, payload, matrix_k, region)
+            table.write(flat)
+            _store(pixels, flat)
+            (output or ImageOutput()).save(pixels, output_path)
+            
+            return True, f"Message encoded into slot {region.index} of {table.slots}! Stego-image saved to {output_path}"
+        
+        except Exception as e:
+            return False, f"Error encoding image slot: {str(e)}"
+    
+    def decode_slot(self, stego_image_path: str, key: str,
+                    password: Optional[str] = None) -> Tuple[bool, str]:
+        
+        try:
+            
+            flat = _carrier(_load_pixels(stego_image_path)[0])
+            table = SlotTable.read(flat)
+            if table is None:
+                return False, "No slot table found in image"
+            
+            found = table.find(flat, key)
+            if found is None:
+                return False, "No slot found for this key (wrong key?)"
+            region, header = found
+            if header.carrier_bits > region.size:
+                return False, "Corrupt payload header: length exceeds slot capacity"
+            return True, unpack_message(header, extract_body(flat, header, region), password)
+        
+        except Exception as e:
+            return False, f"Error decoding image slot: {str(e)}"
+    
     def compare_images(self, original_path: str, stego_path: str) -> dict:
        
         try:
-            img1 = np.array(Image.open(original_path).convert('RGB'))
-            img2 = np.array(Image.open(stego_path).convert('RGB'))
+            img1, _ = _load_pixels(original_path)
+            img2, _ = _load_pixels(stego_path)
             
             diff = np.abs(img1.astype(int) - img2.astype(int))
             max_diff = np.max(diff)
             mean_diff = np.mean(diff)
             
             modified_pixels = np.count_nonzero(diff)
-            total_pixels = img1.shape[0] * img1.shape[1] * 3
+            total_pixels = img1.size
             
             return {
                 'max_difference': int(max_diff),
@@ -134,15 +540,44 @@ class ImageSteganography:
             return {'error': str(e)}
 
 def encode_image(cover_image_path: str, secret_message: str, 
-                 output_path: str) -> Tuple[bool, str]:
+                 output_path: str, compression: Optional[str] = None,
+                 password: Optional[str] = None, key: Optional[str] = None,
+                 matrix_k: int = 0, ecc_symbols: int = 0,
+                 output: Optional[ImageOutput] = None, use_alpha: bool = False) -> Tuple[bool, str]:
     
     steg = ImageSteganography()
-    return steg.encode_image(cover_image_path, secret_message, output_path)
+    return steg.encode_image(cover_image_path, secret_message, output_path, compression, password, key,
+                             matrix_k, ecc_symbols, output, use_alpha)
 
-def decode_image(stego_image_path: str) -> Tuple[bool, str]:
+def decode_image(stego_image_path: str, password: Optional[str] = None,
+                 key: Optional[str] = None) -> Tuple[bool, str]:
   
     steg = ImageSteganography()
-    return steg.decode_image(stego_image_path)
+    return steg.decode_image(stego_image_path, password, key)
+
+def update_image_payload(stego_image_path: str, new_message: str,
+                         compression: Optional[str] = None, password: Optional[str] = None,
+                         key: Optional[str] = None, matrix_k: Optional[int] = None,
+                         ecc_symbols: Optional[int] = None) -> Tuple[bool, str]:
+    
+    steg = ImageSteganography()
+    return steg.update_payload(stego_image_path, new_message, compression, password, key,
+                               matrix_k, ecc_symbols)
+
+def encode_image_slot(cover_image_path: str, secret_message: str, output_path: str,
+                      key: str, slots: int = DEFAULT_SLOTS, compression: Optional[str] = None,
+                      password: Optional[str] = None, matrix_k: int = 0, ecc_symbols: int = 0,
+                      output: Optional[ImageOutput] = None) -> Tuple[bool, str]:
+    
+    steg = ImageSteganography()
+    return steg.encode_slot(cover_image_path, secret_message, output_path, key, slots, compression,
+                            password, matrix_k, ecc_symbols, output)
+
+def decode_image_slot(stego_image_path: str, key: str,
+                      password: Optional[str] = None) -> Tuple[bool, str]:
+    
+    steg = ImageSteganography()
+    return steg.decode_slot(stego_image_path, key, password)
 
 def get_image_capacity(image_path: str) -> int:
     
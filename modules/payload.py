@@ -0,0 +1,509 @@
+
+import hashlib
+import hmac
+import os
+import struct
+import numpy as np
+from typing import Optional, Union, Callable, Tuple
+
+from utils.helpers import CompressionHelper, EncryptionHelper, KDFParams, encryption_helper
+from utils.ecc import reed_solomon
+from utils.timing import span
+
+MAGIC = b'SG'
+VERSION = 1
+
+# Header flags
+FLAG_BINARY = 0x01
+FLAG_ENCRYPTED = 0x02
+FLAG_KDF = 0x04
+FLAG_MAC = 0x08
+FLAG_MATRIX = 0x10
+FLAG_ECC = 0x20
+
+# Hamming matrix embedding: k message bits per block of 2**k - 1 carrier LSBs
+MATRIX_K_MIN = 2
+MATRIX_K_MAX = 8
+
+# Reed-Solomon parity symbols per 255-byte codeword (corrects half as many bytes)
+ECC_SYMBOLS_MIN = 2
+ECC_SYMBOLS_MAX = 128
+# With ECC each header byte is embedded this many times in a row and read back by majority vote
+HEADER_COPIES = 3
+
+
+class PayloadHeader:
+    """Binary header embedded ahead of every payload.
+
+    Layout (big-endian): magic (2 bytes), version (1), flags (1),
+    compression codec id (1), body length in bytes (4), followed by the
+    KDF parameters (kdf id, cost, 16-byte salt) when FLAG_KDF is set, the
+    matrix embedding parameter k (1 byte) when FLAG_MATRIX is set, the
+    Reed-Solomon parity symbols per 255-byte codeword (1 byte) when
+    FLAG_ECC is set, and a
+    truncated HMAC-SHA256 of the preceding header bytes under the
+    embedding key when FLAG_MAC is set.
+
+    The header itself is always embedded with plain LSB replacement. With
+    FLAG_ECC every byte of it is embedded HEADER_COPIES times in a row, so
+    a flipped LSB in the header is outvoted like one in the RS-coded body;
+    such a header starts b'SSS' and never parses as an unprotected one.
+    """
+
+    FORMAT = struct.Struct('>2sBBBI')
+    SIZE = FORMAT.size
+    MAC_SIZE = 4
+
+    def __init__(self, length: int, codec: int = 0, flags: int = 0, version: int = VERSION,
+                 kdf_params: Optional[KDFParams] = None, steg_key: Optional[str] = None,
+                 matrix_k: int = 0, ecc_symbols: int = 0):
+        self.length = length
+        self.codec = codec
+        self.flags = (flags | (FLAG_KDF if kdf_params is not None else 0) | (FLAG_MAC if steg_key else 0)
+                      | (FLAG_MATRIX if matrix_k else 0) | (FLAG_ECC if ecc_symbols else 0))
+        self.version = version
+        self.kdf_params = kdf_params
+        self.steg_key = steg_key
+        self.matrix_k = matrix_k
+        self.ecc_symbols = ecc_symbols
+
+    @classmethod
+    def extension_size(cls, flags: int) -> int:
+
+        size = KDFParams.SIZE if flags & FLAG_KDF else 0
+        size += 1 if flags & FLAG_MATRIX else 0
+        size += 1 if flags & FLAG_ECC else 0
+        return size + (cls.MAC_SIZE if flags & FLAG_MAC else 0)
+
+    @classmethod
+    def _mac(cls, steg_key: str, data: bytes) -> bytes:
+
+        return hmac.new(steg_key.encode('utf-8'), b'SG-header' + data,
+                        hashlib.sha256).digest()[:cls.MAC_SIZE]
+
+    @property
+    def size(self) -> int:
+
+        return self.SIZE + self.extension_size(self.flags)
+
+    @property
+    def embedded_size(self) -> int:
+        """Bytes the header occupies in the payload, copies included."""
+        return self.size * (HEADER_COPIES if self.ecc_symbols else 1)
+
+    @property
+    def carrier_bits(self) -> int:
+        """Number of carrier LSBs the header and body occupy."""
+        return self.embedded_size * 8 + body_carrier_bits(self.length, self.matrix_k)
+
+    def pack(self) -> bytes:
+
+        header = self.FORMAT.pack(MAGIC, self.version, self.flags, self.codec, self.length)
+        if self.kdf_params is not None:
+            header += self.kdf_params.pack()
+        if self.matrix_k:
+            header += bytes([self.matrix_k])
+        if self.ecc_symbols:
+            header += bytes([self.ecc_symbols])
+        if self.flags & FLAG_MAC:
+            header += self._mac(self.steg_key, header)
+        return header
+
+    def embed(self) -> bytes:
+        """The header as embedded ahead of the body (see the class docstring)."""
+        header = self.pack()
+        if not self.ecc_symbols:
+            return header
+        return np.repeat(np.frombuffer(header, dtype=np.uint8), HEADER_COPIES).tobytes()
+
+    @staticmethod
+    def _vote(data: bytes, copies: int) -> bytes:
+        """Bitwise majority over each run of copies bytes."""
+        if copies == 1:
+            return data
+        runs = np.frombuffer(data, dtype=np.uint8).reshape(-1, copies)
+        a, b, c = runs[:, 0], runs[:, 1], runs[:, 2]
+        return ((a & b) | (a & c) | (b & c)).tobytes()
+
+    @classmethod
+    def _copies(cls, data: bytes) -> Optional[int]:
+        """Copies per header byte of a header at the start of data, or None."""
+        for copies in (1, HEADER_COPIES):
+            if len(data) < cls.SIZE * copies:
+                return None
+            magic, version, flags, codec, length = cls.FORMAT.unpack_from(cls._vote(data[:cls.SIZE * copies], copies))
+            if (magic == MAGIC and version == VERSION and codec in CompressionHelper.CODEC_NAMES
+                    and bool(flags & FLAG_ECC) == (copies > 1)):
+                return copies
+        return None
+
+    @classmethod
+    def header_size(cls, data: bytes) -> Optional[int]:
+        """Embedded header size given its first SIZE * HEADER_COPIES bytes
+        (SIZE for a header without ECC), or None if there is no header."""
+        copies = cls._copies(data)
+        if copies is None:
+            return None
+        flags = cls._vote(data[:cls.SIZE * copies], copies)[3]
+        return (cls.SIZE + cls.extension_size(flags)) * copies
+
+    @classmethod
+    def unpack(cls, data: bytes, steg_key: Optional[str] = None) -> Optional['PayloadHeader']:
+        """Parse an embedded header, or return None if data does not start with one.
+
+        A header written under an embedding key only parses when the same
+        key is given and its MAC verifies.
+        """
+        size = cls.header_size(data)
+        if size is None or len(data) < size:
+            return None
+        copies = cls._copies(data)
+        data = cls._vote(data[:size], copies)
+        size //= copies
+        magic, version, flags, codec, length = cls.FORMAT.unpack_from(data)
+        if flags & FLAG_MAC:
+            mac_offset = size - cls.MAC_SIZE
+            if not steg_key or not hmac.compare_digest(cls._mac(steg_key, data[:mac_offset]),
+                                                       data[mac_offset:size]):
+                return None
+        kdf_end = cls.SIZE + (KDFParams.SIZE if flags & FLAG_KDF else 0)
+        kdf_params = KDFParams.unpack(data[cls.SIZE:kdf_end]) if flags & FLAG_KDF else None
+        matrix_k = data[kdf_end] if flags & FLAG_MATRIX else 0
+        if matrix_k and not MATRIX_K_MIN <= matrix_k <= MATRIX_K_MAX:
+            return None
+        ecc_end = kdf_end + (1 if flags & FLAG_MATRIX else 0)
+        ecc_symbols = data[ecc_end] if flags & FLAG_ECC else 0
+        if ecc_symbols and not ECC_SYMBOLS_MIN <= ecc_symbols <= ECC_SYMBOLS_MAX:
+            return None
+        return cls(length, codec, flags & ~(FLAG_MAC | FLAG_MATRIX | FLAG_ECC), version, kdf_params,
+                   steg_key if flags & FLAG_MAC else None, matrix_k, ecc_symbols)
+
+
+class KeyedPermutation:
+    """Keyed pseudorandom permutation of range(size), evaluated pointwise.
+
+    A balanced Feistel network over the smallest even-bit power of two
+    covering size, cycle-walked back into range. Positions for embedded
+    bits [start, stop) cost O(stop - start) regardless of carrier size,
+    so a decoder can check a keyed header without touching the rest of
+    the carrier.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, key: str, size: int):
+        if size < 1:
+            raise ValueError("Permutation domain must not be empty")
+        self.size = size
+        self.half_bits = (max(2, (size - 1).bit_length()) + 1) // 2
+        self.mask = np.uint64((1 << self.half_bits) - 1)
+        seed = hashlib.sha256(b'SG-permutation' + size.to_bytes(8, 'big') + key.encode('utf-8')).digest()
+        self.round_keys = np.frombuffer(seed, dtype='<u8')[:self.ROUNDS]
+
+    def _round(self, right: np.ndarray, round_key: np.uint64) -> np.ndarray:
+
+        x = (right ^ round_key) * np.uint64(0x9E3779B97F4A7C15)
+        x ^= x >> np.uint64(29)
+        x *= np.uint64(0xBF58476D1CE4E5B9)
+        x ^= x >> np.uint64(32)
+        return x & self.mask
+
+    def _encrypt(self, x: np.ndarray) -> np.ndarray:
+
+        shift = np.uint64(self.half_bits)
+        left, right = x >> shift, x & self.mask
+        for round_key in self.round_keys:
+            left, right = right, left ^ self._round(right, round_key)
+        return (left << shift) | right
+
+    def permute(self, indices: np.ndarray) -> np.ndarray:
+        """Images of arbitrary indices in range(size)."""
+        x = self._encrypt(np.asarray(indices, dtype=np.uint64))
+        pending = np.flatnonzero(x >= self.size)
+        while len(pending):
+            x[pending] = self._encrypt(x[pending])
+            pending = pending[x[pending] >= self.size]
+        return x.astype(np.int64)
+
+    def positions(self, start: int, stop: int) -> np.ndarray:
+        """Carrier positions of embedded bits start..stop-1."""
+        if not 0 <= start <= stop <= self.size:
+            raise ValueError("Bit range exceeds the carrier")
+        return self.permute(np.arange(start, stop, dtype=np.uint64))
+
+
+def read_header(read: Callable[[int], bytes], steg_key: Optional[str] = None) -> Optional[PayloadHeader]:
+    """Parse a header through read(n), which returns the first n embedded bytes."""
+    size = PayloadHeader.header_size(read(PayloadHeader.SIZE * HEADER_COPIES))
+    if size is None:
+        return None
+    return PayloadHeader.unpack(read(size), steg_key)
+
+def pack_message(message: Union[str, bytes], compression: Optional[str] = None,
+                 password: Optional[str] = None, kdf_params: Optional[KDFParams] = None,
+                 steg_key: Optional[str] = None, matrix_k: int = 0, ecc_symbols: int = 0) -> bytes:
+    """Encode text as UTF-8 (bytes are kept as-is), optionally compress then
+    AES-GCM encrypt, and prefix the header.
+
+    The encrypted body is raw nonce + ciphertext + tag under a key from a
+    salted KDF, with the header (including the KDF parameters)
+    authenticated as associated data. With steg_key the header also
+    carries a MAC so decoders can reject a wrong key from the header alone.
+    A non-zero matrix_k records that the body is Hamming matrix embedded;
+    non-zero ecc_symbols wraps the finished body in an interleaved
+    Reed-Solomon code with that many parity bytes per 255-byte codeword
+    and embeds the header bytes HEADER_COPIES times over.
+    """
+    check_matrix_k(matrix_k)
+    if ecc_symbols and not ECC_SYMBOLS_MIN <= ecc_symbols <= ECC_SYMBOLS_MAX:
+        raise ValueError(f"ECC symbols must be between {ECC_SYMBOLS_MIN} and {ECC_SYMBOLS_MAX}")
+    ecc = reed_solomon(ecc_symbols) if ecc_symbols else None
+    flags = FLAG_BINARY if isinstance(message, bytes) else 0
+    data = message if flags & FLAG_BINARY else message.encode('utf-8')
+    with span('compress', len(data)):
+        codec_id, body = CompressionHelper.compress(data, compression)
+
+    if password:
+        kdf_params = kdf_params or KDFParams()
+        flags |= FLAG_ENCRYPTED
+        length = len(body) + EncryptionHelper.GCM_OVERHEAD
+    else:
+        length = len(body)
+
+    header = PayloadHeader(ecc.encoded_size(length) if ecc else length, codec_id, flags,
+                           kdf_params=kdf_params if password else None, steg_key=steg_key,
+                           matrix_k=matrix_k, ecc_symbols=ecc_symbols)
+    if password:
+        body = encryption_helper.encrypt_bytes(body, password, header.pack(), kdf_params)
+    if ecc:
+        with span('ecc_encode', len(body)):
+            body = ecc.encode(body)
+
+    return header.embed() + body
+
+def unpack_message(header: PayloadHeader, body: bytes,
+                   password: Optional[str] = None) -> Union[str, bytes]:
+
+    if header.ecc_symbols:
+        with span('ecc_decode', len(body)):
+            body, _ = reed_solomon(header.ecc_symbols).decode(body)
+
+    if header.flags & FLAG_ENCRYPTED:
+        if not password:
+            raise ValueError("Payload is encrypted; a password is required")
+        body = encryption_helper.decrypt_bytes(body, password, header.pack(), header.kdf_params)
+
+    with span('decompress', len(body)):
+        data = CompressionHelper.decompress(header.codec, body)
+    if header.flags & FLAG_BINARY:
+        return data
+
+    message = data.decode('utf-8')
+    if password and not header.flags & FLAG_ENCRYPTED:
+        return decrypt_text(message, password)
+    return message
+
+def decrypt_text(message: str, password: Optional[str]) -> str:
+    """Decrypt base64 text from EncryptionHelper.encrypt_message (older stego files)."""
+    return encryption_helper.decrypt_message(message, password) if password else message
+
+def bytes_to_bits(data: bytes) -> np.ndarray:
+
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+def bits_to_bytes(bits: np.ndarray) -> bytes:
+
+    return np.packbits(bits).tobytes()
+
+def embed_bits(carrier: np.ndarray, bits: np.ndarray, positions: Optional[np.ndarray] = None):
+    """Replace the LSBs of a flat carrier array in place, sequentially or at positions."""
+    clear = ~carrier.dtype.type(1)
+    if positions is None:
+        target = carrier[:len(bits)]
+        target &= clear
+        target |= bits
+    else:
+        carrier[positions] = (carrier[positions] & clear) | bits
+
+def extract_bits(carrier: np.ndarray, count: int, positions: Optional[np.ndarray] = None,
+                 offset: int = 0) -> np.ndarray:
+
+    if positions is None:
+        return (carrier[offset:offset + count] & 1).astype(np.uint8)
+    return (carrier[positions] & 1).astype(np.uint8)
+
+def decode_legacy(lsb_bytes: bytes, delimiter: str) -> Optional[str]:
+    """Recover a message written by the delimiter-terminated format."""
+    text = lsb_bytes.decode('latin-1')
+    if delimiter in text:
+        return text.split(delimiter)[0]
+    return None
+
+def check_matrix_k(matrix_k: int):
+
+    if matrix_k and not MATRIX_K_MIN <= matrix_k <= MATRIX_K_MAX:
+        raise ValueError(f"Matrix embedding k must be between {MATRIX_K_MIN} and {MATRIX_K_MAX}")
+
+def body_carrier_bits(length: int, matrix_k: int = 0) -> int:
+    """Carrier LSBs needed for a body of length bytes, plain or matrix embedded."""
+    if not matrix_k:
+        return length * 8
+    return -(-length * 8 // matrix_k) * ((1 << matrix_k) - 1)
+
+def _matrix_blocks(carrier: np.ndarray, blocks: int, n: int, positions: Optional[np.ndarray],
+                   offset: int) -> np.ndarray:
+
+    if positions is None:
+        return carrier[offset:offset + blocks * n].reshape(blocks, n)
+    return carrier[positions.reshape(blocks, n)]
+
+def _syndromes(lsbs: np.ndarray) -> np.ndarray:
+    """Hamming syndromes of (blocks, 2**k - 1) LSB rows: the XOR of the
+    1-based column indices holding a one, i.e. H @ x over GF(2)."""
+    n = lsbs.shape[1]
+    if n > 15:
+        return np.bitwise_xor.reduce(lsbs * np.arange(1, n + 1, dtype=np.uint8), axis=1)
+
+    # Narrow rows reduce slowly along axis 1; XOR column by column instead
+    syndromes = np.zeros(len(lsbs), dtype=np.uint8)
+    for column in range(n):
+        syndromes ^= lsbs[:, column] * np.uint8(column + 1)
+    return syndromes
+
+def matrix_embed(carrier: np.ndarray, bits: np.ndarray, k: int,
+                 positions: Optional[np.ndarray] = None, offset: int = 0) -> int:
+    """Embed bits with a (1, 2**k - 1, k) Hamming code, in place.
+
+    Each block of 2**k - 1 carrier LSBs carries k bits as its syndrome, so
+    at most one LSB per block is flipped. Blocks are taken sequentially
+    from offset, or from positions when given. Returns the number of
+    carrier values changed.
+    """
+    n = (1 << k) - 1
+    blocks = -(-len(bits) // k)
+    padded = np.zeros((blocks, k), dtype=np.uint8)
+    padded.reshape(-1)[:len(bits)] = bits
+    # k <= MATRIX_K_MAX = 8, so every block target fits one byte
+    targets = np.zeros(blocks, dtype=np.uint8)
+    for bit in range(k):
+        targets |= padded[:, bit] << np.uint8(bit)
+
+    lsbs = (_matrix_blocks(carrier, blocks, n, positions, offset) & 1).astype(np.uint8)
+    flip = _syndromes(lsbs) ^ targets
+    rows = np.flatnonzero(flip)
+    columns = flip[rows].astype(np.int64) - 1
+
+    one = carrier.dtype.type(1)
+    if positions is None:
+        carrier[offset + rows * n + columns] ^= one
+    else:
+        carrier[positions[rows * n + columns]] ^= one
+    return len(rows)
+
+def matrix_extract(carrier: np.ndarray, count: int, k: int,
+                   positions: Optional[np.ndarray] = None, offset: int = 0) -> np.ndarray:
+    """Recover count bits written by matrix_embed."""
+    n = (1 << k) - 1
+    blocks = -(-count // k)
+    lsbs = (_matrix_blocks(carrier, blocks, n, positions, offset) & 1).astype(np.uint8)
+    syndromes = _syndromes(lsbs)
+    bits = np.empty((blocks, k), dtype=np.uint8)
+    for bit in range(k):
+        bits[:, bit] = (syndromes >> np.uint8(bit)) & 1
+    return bits.reshape(-1)[:count]
+
+def payload_carrier_bits(payload: bytes, matrix_k: int = 0) -> int:
+    """Carrier LSBs a packed payload (header + body) occupies."""
+    header_size = PayloadHeader.header_size(payload)
+    return header_size * 8 + body_carrier_bits(len(payload) - header_size, matrix_k)
+
+def _payload_layout(carrier: np.ndarray, payload: bytes, matrix_k: int,
+                    permutation: Optional[KeyedPermutation]) -> Tuple[np.ndarray, int, Optional[np.ndarray]]:
+
+    stop = payload_carrier_bits(payload, matrix_k)
+    available = permutation.size if permutation is not None else carrier.size
+    if stop > available:
+        raise ValueError(f"Payload needs {stop} carrier bits, only {available} available")
+    positions = permutation.positions(0, stop) if permutation is not None else None
+    return bytes_to_bits(payload), PayloadHeader.header_size(payload) * 8, positions
+
+def embed_payload(carrier: np.ndarray, payload: bytes, matrix_k: int = 0,
+                  permutation: Optional[KeyedPermutation] = None) -> int:
+    """Embed a packed payload (header + body) into a flat carrier in place.
+
+    The header goes in with plain LSB replacement and the body with matrix
+    embedding when matrix_k is set, sequentially or along permutation.
+    Returns the number of carrier LSBs used.
+    """
+    bits, header_bits, positions = _payload_layout(carrier, payload, matrix_k, permutation)
+    if not matrix_k:
+        embed_bits(carrier, bits, positions)
+        return len(bits)
+
+    embed_bits(carrier, bits[:header_bits], positions[:header_bits] if positions is not None else None)
+    matrix_embed(carrier, bits[header_bits:], matrix_k,
+                 positions[header_bits:] if positions is not None else None, offset=header_bits)
+    return payload_carrier_bits(payload, matrix_k)
+
+def flip_bits(carrier: np.ndarray, bits: np.ndarray, positions: Optional[np.ndarray] = None,
+              offset: int = 0) -> int:
+    """Like embed_bits, but only writes values whose LSB differs. Returns the count."""
+    if positions is None:
+        positions = np.arange(offset, offset + len(bits))
+    changed = positions[(carrier[positions] & 1) != bits]
+    carrier[changed] ^= carrier.dtype.type(1)
+    return len(changed)
+
+def patch_payload(carrier: np.ndarray, payload: bytes, matrix_k: int = 0,
+                  permutation: Optional[KeyedPermutation] = None, old_bits: int = 0) -> int:
+    """Rewrite the payload in a carrier that already holds one, touching only
+    values whose LSB has to change (matrix embedding flips at most one per
+    block anyway). old_bits is the carrier_bits of the payload replaced;
+    any of it past the end of the new one is overwritten with random LSBs
+    so no tail of the old payload is left behind. Returns the number of
+    carrier values changed.
+    """
+    bits, header_bits, positions = _payload_layout(carrier, payload, matrix_k, permutation)
+    if not matrix_k:
+        changed = flip_bits(carrier, bits, positions)
+    else:
+        changed = flip_bits(carrier, bits[:header_bits], positions[:header_bits] if positions is not None else None)
+        changed += matrix_embed(carrier, bits[header_bits:], matrix_k,
+                                positions[header_bits:] if positions is not None else None,
+                                offset=header_bits)
+
+    stop = payload_carrier_bits(payload, matrix_k)
+    old_bits = min(old_bits, permutation.size if permutation is not None else carrier.size)
+    if old_bits > stop:
+        noise = bytes_to_bits(os.urandom((old_bits - stop + 7) // 8))[:old_bits - stop]
+        tail = permutation.positions(stop, old_bits) if permutation is not None else None
+        changed += flip_bits(carrier, noise, tail, offset=stop)
+    return changed
+
+def extract_header(carrier: np.ndarray, steg_key: Optional[str] = None,
+                   permutation: Optional[KeyedPermutation] = None) -> Optional[PayloadHeader]:
+    """Read a payload header from the start of a flat carrier (or its permutation).
+
+    permutation may be any object with size and positions(start, stop),
+    such as a slot region.
+    """
+    available = permutation.size if permutation is not None else carrier.size
+
+    def read(n: int) -> bytes:
+        stop = min(n * 8, available)
+        positions = permutation.positions(0, stop) if permutation is not None else None
+        return bits_to_bytes(extract_bits(carrier, stop, positions))
+
+    return read_header(read, steg_key) if available >= PayloadHeader.SIZE * 8 else None
+
+def extract_body(carrier: np.ndarray, header: PayloadHeader,
+                 permutation: Optional[KeyedPermutation] = None) -> bytes:
+    """Gather the body behind header; callers check header.carrier_bits first."""
+    start = header.embedded_size * 8
+    stop = header.carrier_bits
+    positions = permutation.positions(start, stop) if permutation is not None else None
+    if header.matrix_k:
+        bits = matrix_extract(carrier, header.length * 8, header.matrix_k, positions, offset=start)
+    else:
+        bits = extract_bits(carrier, stop - start, positions, offset=start)
+    return bits_to_bytes(bits)
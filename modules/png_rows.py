@@ -0,0 +1,108 @@
+
+import struct
+import zlib
+from PIL import Image
+
+from utils import progress
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+IHDR = struct.Struct('>IIBBBBB')
+CHUNK = struct.Struct('>I4s')
+# Samples per pixel by PNG colour type
+COLOR_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class PNGRowReader:
+    """Decode only the top rows of a non-interlaced PNG.
+
+    IDAT data is fed to Pillow's own zip decoder a block at a time, so
+    unfiltering and every colour type Pillow supports still run in C. A
+    shadow zlib stream counts the inflated bytes, and reading stops as soon
+    as the requested rows are complete instead of inflating the whole file.
+    """
+
+    BLOCK_SIZE = 16384
+
+    def __init__(self, path: str):
+        self.handle = open(path, 'rb')
+        try:
+            if self.handle.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+                raise ValueError("Not a PNG file")
+            length, chunk_type = CHUNK.unpack(self.handle.read(CHUNK.size))
+            if chunk_type != b'IHDR' or length != IHDR.size:
+                raise ValueError("PNG has no IHDR chunk")
+            (self.width, self.height, bit_depth, color_type,
+             _, _, interlace) = IHDR.unpack(self.handle.read(IHDR.size))
+            if interlace or color_type not in COLOR_CHANNELS:
+                raise ValueError("Interlaced or unknown PNG layout")
+            self.stride = 1 + -(-self.width * bit_depth * COLOR_CHANNELS[color_type] // 8)
+
+            self.image = Image.open(path)
+            self.image.load_prepare()
+            if len(self.image.tile) != 1 or self.image.tile[0][0] != 'zip':
+                raise ValueError("Unsupported PNG tile layout")
+            _, extents, _, args = self.image.tile[0]
+            self.image.tile = []
+            self._decoder = Image._getdecoder(self.image.mode, 'zip', args, self.image.decoderconfig)
+            self._decoder.setimage(self.image.im, extents)
+        except Exception:
+            self.close()
+            raise
+
+        self._shadow = zlib.decompressobj()
+        self._inflated = 0
+        self._blocks = self._idat_blocks()
+        self.rows_decoded = 0
+
+    def _idat_blocks(self):
+        """IDAT payload in blocks of at most BLOCK_SIZE bytes."""
+        self.handle.seek(len(PNG_SIGNATURE))
+        while True:
+            header = self.handle.read(CHUNK.size)
+            if len(header) < CHUNK.size:
+                return
+            length, chunk_type = CHUNK.unpack(header)
+            if chunk_type == b'IEND':
+                return
+            if chunk_type != b'IDAT':
+                self.handle.seek(length + 4, 1)
+                continue
+            remaining = length
+            while remaining:
+                block = self.handle.read(min(remaining, self.BLOCK_SIZE))
+                if not block:
+                    raise ValueError("Truncated PNG IDAT chunk")
+                remaining -= len(block)
+                yield block
+            self.handle.seek(4, 1)  # CRC
+
+    def rows(self, count: int) -> Image.Image:
+        """The top count rows (fewer if the image is shorter), decoding only
+        as much of the stream as they need."""
+        count = min(count, self.height)
+        while self.rows_decoded < count:
+            progress.check()
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._inflated += len(self._shadow.decompress(block))
+            consumed, error = self._decoder.decode(block)
+            if error < 0 and consumed < 0:
+                raise ValueError("Corrupt PNG image data")
+            self.rows_decoded = min(self._inflated // self.stride, self.height)
+        if self.rows_decoded < count:
+            raise ValueError("Truncated PNG image data")
+        return self.image.crop((0, 0, self.width, count))
+
+    def close(self):
+
+        if getattr(self, '_decoder', None) is not None:
+            self._decoder.cleanup()
+            self._decoder = None
+        self.handle.close()
+
+    def __enter__(self) -> 'PNGRowReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
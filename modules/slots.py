@@ -0,0 +1,135 @@
+
+import struct
+import numpy as np
+from typing import Optional, Tuple
+
+from .payload import (PayloadHeader, KeyedPermutation, embed_bits, extract_bits, bits_to_bytes,
+                      bytes_to_bits, extract_header)
+
+DEFAULT_SLOTS = 8
+MAX_SLOTS = 255
+
+
+class SlotRegion:
+    """Carrier positions of one slot along its owner's key.
+
+    Drop-in for a KeyedPermutation in embed_payload / extract_header /
+    extract_body: size plus positions(start, stop) in O(stop - start).
+    """
+
+    def __init__(self, table: 'SlotTable', key: str, index: int):
+        self.index = index
+        self.size = table.region_size
+        self._base = index * table.region_size
+        self._table_bits = table.table_bits
+        self._inner = KeyedPermutation(key, table.region_size)
+        self._layout = table.layout
+
+    def positions(self, start: int, stop: int) -> np.ndarray:
+
+        local = self._inner.positions(start, stop) + self._base
+        return self._layout.permute(local) + self._table_bits
+
+
+class SlotTable:
+    """Several independently keyed payloads in one flat carrier.
+
+    The carrier starts with a small unkeyed table (magic, version, slot
+    count, occupancy bitmap) in plain sequential LSBs. The rest is split
+    into equal disjoint regions, shuffled across the carrier by a fixed
+    layout permutation; each payload is scattered within its region by
+    its own key and carries the usual MAC-protected header. A key probes
+    the occupied regions in a key-dependent order and recognises its own
+    by the header MAC, so finding and extracting one slot costs a few
+    headers plus the slot itself. The bitmap does reveal how many slots
+    are in use.
+    """
+
+    HEADER = struct.Struct('>2sBB')
+    MAGIC = b'SS'
+    VERSION = 1
+    LAYOUT_KEY = 'SG-slot-layout'
+
+    def __init__(self, carrier_size: int, slots: int = DEFAULT_SLOTS,
+                 bitmap: Optional[np.ndarray] = None):
+        if not 1 <= slots <= MAX_SLOTS:
+            raise ValueError(f"Slot count must be between 1 and {MAX_SLOTS}")
+        self.slots = slots
+        self.bitmap = np.zeros(-(-slots // 8), dtype=np.uint8) if bitmap is None else bitmap
+        self.table_bits = self.table_size(slots) * 8
+        self.region_size = (carrier_size - self.table_bits) // slots
+        if self.region_size < PayloadHeader.SIZE * 8:
+            raise ValueError(f"Carrier too small for {slots} slots")
+        self.layout = KeyedPermutation(self.LAYOUT_KEY, self.region_size * slots)
+
+    @classmethod
+    def table_size(cls, slots: int) -> int:
+        """Bytes of table (header + bitmap) for a slot count."""
+        return cls.HEADER.size + -(-slots // 8)
+
+    @classmethod
+    def read(cls, carrier: np.ndarray) -> Optional['SlotTable']:
+        """The table at the start of a carrier, or None if it has none."""
+        if carrier.size < cls.HEADER.size * 8:
+            return None
+        magic, version, slots = cls.HEADER.unpack(bits_to_bytes(extract_bits(carrier, cls.HEADER.size * 8)))
+        if magic != cls.MAGIC or version != cls.VERSION or not slots:
+            return None
+        table_bits = cls.table_size(slots) * 8
+        if carrier.size < table_bits:
+            return None
+        bitmap = np.frombuffer(bits_to_bytes(extract_bits(carrier, table_bits)),
+                               dtype=np.uint8)[cls.HEADER.size:].copy()
+        try:
+            return cls(carrier.size, slots, bitmap)
+        except ValueError:
+            return None
+
+    def write(self, carrier: np.ndarray):
+
+        table = self.HEADER.pack(self.MAGIC, self.VERSION, self.slots) + self.bitmap.tobytes()
+        embed_bits(carrier, bytes_to_bits(table))
+
+    @property
+    def occupied(self) -> np.ndarray:
+        """Boolean occupancy per slot."""
+        return np.unpackbits(self.bitmap, count=self.slots).astype(bool)
+
+    def is_occupied(self, index: int) -> bool:
+
+        return bool(self.bitmap[index >> 3] & (0x80 >> (index & 7)))
+
+    def occupy(self, index: int):
+
+        self.bitmap[index >> 3] |= 0x80 >> (index & 7)
+
+    def probe_order(self, key: str) -> np.ndarray:
+        """Slot indices in the order a key tries them."""
+        return KeyedPermutation(key, self.slots).positions(0, self.slots)
+
+    def region(self, key: str, index: int) -> SlotRegion:
+
+        return SlotRegion(self, key, index)
+
+    def find(self, carrier: np.ndarray, key: str) -> Optional[Tuple[SlotRegion, PayloadHeader]]:
+        """The region and header of the payload written with key, if any."""
+        occupied = self.occupied
+        for index in self.probe_order(key):
+            if occupied[index]:
+                region = self.region(key, int(index))
+                header = extract_header(carrier, key, region)
+                if header is not None:
+                    return region, header
+        return None
+
+    def allocate(self, carrier: np.ndarray, key: str) -> SlotRegion:
+        """The key's existing slot, else its first free one (marked occupied)."""
+        found = self.find(carrier, key)
+        if found is not None:
+            return found[0]
+        order = self.probe_order(key)
+        free = order[~self.occupied[order]]
+        if not len(free):
+            raise ValueError(f"All {self.slots} slots are occupied")
+        self.occupy(int(free[0]))
+        return self.region(key, int(free[0]))
@@ -0,0 +1,282 @@
+
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+import numpy as np
+from typing import Tuple, Optional, Iterator, BinaryIO
+
+from utils.helpers import CapacityCalculator
+from utils import progress
+from .payload import PayloadHeader, pack_message, unpack_message, bytes_to_bits, bits_to_bytes
+
+Y4M_MAGIC = b'YUV4MPEG2'
+FRAME_TAG = b'FRAME'
+MAX_HEADER_LINE = 4096
+
+# Chroma plane geometry per colorspace: (planes, width divisor, height divisor)
+CHROMA_LAYOUT = {
+    '420': (2, 2, 2),
+    '420jpeg': (2, 2, 2),
+    '420paldv': (2, 2, 2),
+    '420mpeg2': (2, 2, 2),
+    '411': (2, 4, 1),
+    '422': (2, 2, 1),
+    '444': (2, 1, 1),
+    '444alpha': (3, 1, 1),
+    'mono': (0, 1, 1),
+}
+
+
+class Y4MStream:
+    """Minimal YUV4MPEG2 reader that hands out one frame at a time."""
+
+    def __init__(self, handle: BinaryIO):
+        self.handle = handle
+        self.header = handle.readline(MAX_HEADER_LINE)
+        if not self.header.startswith(Y4M_MAGIC) or not self.header.endswith(b'\n'):
+            raise ValueError("Not a YUV4MPEG2 stream")
+
+        self.params = {}
+        for token in self.header[len(Y4M_MAGIC):].split():
+            token = token.decode('ascii')
+            self.params[token[0]] = token[1:]
+
+        self.width = int(self.params['W'])
+        self.height = int(self.params['H'])
+        self.colorspace, bit_depth = self._parse_colorspace(self.params.get('C', '420jpeg'))
+        self.sample_bytes = 1 if bit_depth <= 8 else 2
+        self.dtype = np.dtype(np.uint8) if self.sample_bytes == 1 else np.dtype('<u2')
+
+        planes, x_div, y_div = CHROMA_LAYOUT[self.colorspace]
+        chroma_samples = ((self.width + x_div - 1) // x_div) * ((self.height + y_div - 1) // y_div)
+        self.luma_samples = self.width * self.height
+        self.frame_size = (self.luma_samples + planes * chroma_samples) * self.sample_bytes
+        self.data_offset = handle.tell()
+
+    @staticmethod
+    def _parse_colorspace(value: str) -> Tuple[str, int]:
+
+        for suffix in ('p16', 'p14', 'p12', 'p10', 'p9'):
+            if value.endswith(suffix):
+                return value[:-len(suffix)], int(suffix[1:])
+        if value.startswith('mono') and value[4:].isdigit():
+            return 'mono', int(value[4:])
+        if value not in CHROMA_LAYOUT:
+            raise ValueError(f"Unsupported Y4M colorspace: {value}")
+        return value, 8
+
+    def _read_frame_header(self) -> Optional[bytes]:
+
+        line = self.handle.readline(MAX_HEADER_LINE)
+        if not line:
+            return None
+        if not line.startswith(FRAME_TAG) or not line.endswith(b'\n'):
+            raise ValueError("Corrupt Y4M stream: missing FRAME marker")
+        return line
+
+    def frames(self) -> Iterator[Tuple[bytes, bytearray]]:
+        """Yield (frame header, writable frame buffer) pairs in stream order."""
+        while True:
+            frame_header = self._read_frame_header()
+            if frame_header is None:
+                return
+            frame = bytearray(self.frame_size)
+            if self.handle.readinto(frame) != self.frame_size:
+                raise ValueError("Corrupt Y4M stream: truncated frame")
+            yield frame_header, frame
+
+    def count_frames(self) -> int:
+        """Count frames by seeking over frame data, then rewind to the first frame."""
+        count = 0
+        self.handle.seek(self.data_offset)
+        while self._read_frame_header() is not None:
+            self.handle.seek(self.frame_size, os.SEEK_CUR)
+            count += 1
+        self.handle.seek(self.data_offset)
+        return count
+
+
+def _embed_luma_bits(frame_header: bytes, frame: bytearray, bits: np.ndarray,
+                     dtype: np.dtype) -> Tuple[bytes, bytearray]:
+
+    luma = np.frombuffer(frame, dtype=dtype, count=len(bits))
+    luma &= ~dtype.type(1)
+    luma |= bits
+    return frame_header, frame
+
+
+def _extract_luma_bits(frame: bytearray, count: int, dtype: np.dtype) -> np.ndarray:
+
+    luma = np.frombuffer(frame, dtype=dtype, count=count)
+    return (luma & 1).astype(np.uint8)
+
+
+def _bounded_map(executor: ThreadPoolExecutor, fn, jobs, max_in_flight: int):
+    """Run fn over jobs on executor, yielding results in order with at most
+    max_in_flight frames held in memory at once."""
+    pending = deque()
+    for job in jobs:
+        pending.append(executor.submit(fn, *job))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class VideoSteganography:
+
+
+    def __init__(self, max_workers: Optional[int] = None, max_frames_in_flight: Optional[int] = None):
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.max_frames_in_flight = max_frames_in_flight or self.max_workers * 2
+
+    def _capacity(self, stream: Y4MStream, frame_count: int) -> int:
+
+        capacity = CapacityCalculator.video_capacity(
+            frame_count, stream.width, stream.height, 0, channels=1
+        )['frames_capacity_bytes']
+        return max(capacity - PayloadHeader.SIZE, 0)
+
+    def calculate_capacity(self, video_path: str) -> int:
+
+        try:
+            with open(video_path, 'rb') as src:
+                stream = Y4MStream(src)
+                return self._capacity(stream, stream.count_frames())
+        except Exception as e:
+            return 0
+
+    def encode_video(self, cover_video_path: str, secret_message: str,
+                     output_path: str, compression: Optional[str] = None,
+                     password: Optional[str] = None) -> Tuple[bool, str]:
+
+        try:
+            with open(cover_video_path, 'rb') as src:
+                stream = Y4MStream(src)
+                frame_count = stream.count_frames()
+
+                max_capacity = self._capacity(stream, frame_count)
+                payload = pack_message(secret_message, compression, password)
+                message_size = len(payload) - PayloadHeader.SIZE
+
+                if message_size > max_capacity:
+                    return False, f"Message too long! Max capacity: {max_capacity} bytes, Message: {message_size} bytes"
+
+                bits = bytes_to_bits(payload)
+                luma = stream.luma_samples
+                frames_needed = -(-len(bits) // luma)
+
+                jobs = (
+                    (frame_header, frame, bits[index * luma:(index + 1) * luma])
+                    for index, (frame_header, frame) in enumerate(islice(stream.frames(), frames_needed))
+                )
+                embed = partial(_embed_luma_bits, dtype=stream.dtype)
+
+                with open(output_path, 'wb') as dst, ThreadPoolExecutor(self.max_workers) as pool:
+                    dst.write(stream.header)
+                    for frame_header, frame in _bounded_map(pool, embed, jobs, self.max_frames_in_flight):
+                        progress.check()
+                        dst.write(frame_header)
+                        dst.write(frame)
+
+                    # Frames past the payload are copied through untouched.
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+
+            return True, f"Message encoded successfully! Stego-video saved to {output_path} ({frames_needed} of {frame_count} frames modified)"
+
+        except progress.Cancelled as e:
+            return False, f"Encoding stopped: {e}"
+        except Exception as e:
+            return False, f"Error encoding video: {str(e)}"
+
+    def decode_video(self, stego_video_path: str, password: Optional[str] = None) -> Tuple[bool, str]:
+
+        try:
+            with open(stego_video_path, 'rb') as src:
+                stream = Y4MStream(src)
+                extract = partial(_extract_luma_bits, count=stream.luma_samples, dtype=stream.dtype)
+                jobs = ((frame,) for _, frame in stream.frames())
+
+                header_bits = PayloadHeader.SIZE * 8
+                header = None
+                chunks = []
+                collected = 0
+                needed = None
+
+                with ThreadPoolExecutor(self.max_workers) as pool:
+                    for bits in _bounded_map(pool, extract, jobs, self.max_frames_in_flight):
+                        progress.check()
+                        chunks.append(bits)
+                        collected += len(bits)
+
+                        if header is None and collected >= header_bits:
+                            available = bits_to_bytes(np.concatenate(chunks)[:collected // 8 * 8])
+                            size = PayloadHeader.header_size(available)
+                            if size is None:
+                                return False, "No hidden message found in video"
+                            header_bits = size * 8
+                            header = PayloadHeader.unpack(available)
+                            if header is None:
+                                # Header extension continues in the next frame
+                                continue
+                            needed = header_bits + header.length * 8
+
+                        if needed is not None and collected >= needed:
+                            break
+
+            if needed is None or collected < needed:
+                return False, "No hidden message found or video is truncated"
+
+            body = bits_to_bytes(np.concatenate(chunks)[header_bits:needed])
+            return True, unpack_message(header, body, password)
+
+        except progress.Cancelled as e:
+            return False, f"Decoding stopped: {e}"
+        except Exception as e:
+            return False, f"Error decoding video: {str(e)}"
+
+    def get_video_info(self, video_path: str) -> dict:
+
+        try:
+            with open(video_path, 'rb') as src:
+                stream = Y4MStream(src)
+                frame_count = stream.count_frames()
+                num, _, den = stream.params.get('F', '25:1').partition(':')
+                fps = int(num) / int(den or 1) if int(num) else 0.0
+                return {
+                    'width': stream.width,
+                    'height': stream.height,
+                    'colorspace': stream.colorspace,
+                    'sample_bytes': stream.sample_bytes,
+                    'frame_rate': fps,
+                    'n_frames': frame_count,
+                    'duration_seconds': frame_count / fps if fps else 0.0
+                }
+        except Exception as e:
+            return {'error': str(e)}
+
+
+def encode_video(cover_video_path: str, secret_message: str,
+                 output_path: str, compression: Optional[str] = None,
+                 password: Optional[str] = None) -> Tuple[bool, str]:
+
+    steg = VideoSteganography()
+    return steg.encode_video(cover_video_path, secret_message, output_path, compression, password)
+
+def decode_video(stego_video_path: str, password: Optional[str] = None) -> Tuple[bool, str]:
+
+    steg = VideoSteganography()
+    return steg.decode_video(stego_video_path, password)
+
+def get_video_capacity(video_path: str) -> int:
+
+    steg = VideoSteganography()
+    return steg.calculate_capacity(video_path)
+
+if __name__ == "__main__":
+
+    print("Video Steganography Module")
+    print("=" * 50)
@@ -10,7 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import wave
 import numpy as np
-from modules.audio_steg import AudioSteganography
+from modules.audio_steg import AudioSteganography, decode_audio
 
 def create_test_audio(filename="test_cover.wav", duration=2, sample_rate=44100):
     """Create a simple test audio file (sine wave)."""
@@ -101,6 +101,8 @@ def test_audio_steganography():
         print(f"   [FAIL] {msg}")
         return False
     
+    comparison_key_modified = steg.compare_audio(cover_audio, stego_audio_key)['modified_samples']
+    
     print("\n Decoding with correct key...")
     success, decoded_message = steg.decode_audio(stego_audio_key, key=embedding_key)
     
@@ -126,6 +128,142 @@ def test_audio_steganography():
     else:
         print("   [OK] Correctly failed with wrong key")
     
+    print("\n" + "-" * 60)
+    print("TEST 3: Key-Based Embedding with AES-GCM Encryption")
+    print("-" * 60)
+    
+    stego_audio_enc = "test_stego_encrypted.wav"
+    success, msg = steg.encode_audio(cover_audio, secret_message, stego_audio_enc,
+                                     key=embedding_key, password="audio-pass")
+    assert success, msg
+    
+    success, decoded_message = steg.decode_audio(stego_audio_enc, key=embedding_key, password="audio-pass")
+    assert success and decoded_message == secret_message
+    print("   [OK] Encrypted message decoded")
+    
+    success, decoded_message = steg.decode_audio(stego_audio_enc, key=embedding_key, password="nope")
+    assert not success
+    print(f"   [OK] Wrong password rejected: {decoded_message}")
+    
+    success, decoded_message = steg.decode_audio(stego_audio_enc, key=embedding_key)
+    assert not success
+    print(f"   [OK] Missing password rejected: {decoded_message}")
+    
+    print("\n" + "-" * 60)
+    print("TEST 4: Wrong-Key Rejection and Legacy Keyed Files")
+    print("-" * 60)
+    
+    # A wrong key is rejected from the header alone, without the legacy permutation
+    generate_positions = steg._generate_positions
+    steg._generate_positions = lambda *args: (_ for _ in ()).throw(AssertionError("legacy permutation built"))
+    try:
+        success, decoded_message = steg.decode_audio(stego_audio_key, key="wrong_key")
+        assert not success
+    finally:
+        steg._generate_positions = generate_positions
+    success, decoded_message = steg.decode_audio(stego_audio_key, key="wrong_key", legacy_keyed=True)
+    assert not success
+    success, decoded_message = steg.decode_audio(stego_audio_key)
+    assert not success
+    print("   [OK] Keyed header does not parse without the key")
+    
+    # Keyed stego-audio from before the header MAC: delimiter format over np.random positions
+    with wave.open(cover_audio, 'rb') as audio:
+        params = audio.getparams()
+        legacy_audio = np.frombuffer(audio.readframes(params.nframes), dtype=np.int16).copy()
+    legacy_bits = np.unpackbits(np.frombuffer((secret_message + steg.delimiter).encode(), dtype=np.uint8))
+    positions = steg._generate_positions(embedding_key, len(legacy_audio), len(legacy_bits))
+    legacy_audio[positions] = (legacy_audio[positions] & ~1) | legacy_bits
+    stego_audio_legacy = "test_stego_legacy_keyed.wav"
+    with wave.open(stego_audio_legacy, 'wb') as audio:
+        audio.setparams(params)
+        audio.writeframes(legacy_audio.tobytes())
+    
+    success, decoded_message = steg.decode_audio(stego_audio_legacy, key=embedding_key, legacy_keyed=True)
+    assert success and decoded_message == secret_message
+    success, decoded_message = decode_audio(stego_audio_legacy, key=embedding_key, legacy_keyed=True)
+    assert success and decoded_message == secret_message
+    success, decoded_message = steg.decode_audio(stego_audio_legacy, key=embedding_key)
+    assert not success
+    success, decoded_message = steg.decode_audio(stego_audio_legacy, key="wrong_key", legacy_keyed=True)
+    assert not success
+    print("   [OK] Legacy keyed file decodes with legacy_keyed=True, and not by default")
+    
+    print("\n" + "-" * 60)
+    print("TEST 5: Matrix Embedding")
+    print("-" * 60)
+    
+    stego_audio_matrix = "test_stego_matrix.wav"
+    for key in (None, embedding_key):
+        success, msg = steg.encode_audio(cover_audio, secret_message, stego_audio_matrix, key=key, matrix_k=4)
+        assert success, msg
+        success, decoded_message = steg.decode_audio(stego_audio_matrix, key=key)
+        assert success and decoded_message == secret_message
+        comparison = steg.compare_audio(cover_audio, stego_audio_matrix)
+        print(f"   [OK] k=4, key={key!r}: {comparison['modified_samples']} samples modified")
+    
+    print("\n" + "-" * 60)
+    print("TEST 6: Reed-Solomon ECC over a Noisy Channel")
+    print("-" * 60)
+    
+    stego_audio_ecc = "test_stego_ecc.wav"
+    success, msg = steg.encode_audio(cover_audio, secret_message, stego_audio_ecc, ecc_symbols=16)
+    assert success, msg
+    
+    # Flip a few LSBs in the payload body, and one in each of the embedded copies of
+    # three header bytes (magic, flags, length), which the copies outvote
+    with wave.open(stego_audio_ecc, 'rb') as audio:
+        params = audio.getparams()
+        noisy = np.frombuffer(audio.readframes(params.nframes), dtype=np.int16).copy()
+    noisy[np.random.default_rng(3).choice(np.arange(300, 255 * 8), 6, replace=False)] ^= 1
+    noisy[[5, 9 * 8 + 2, 16 * 8 + 6]] ^= 1
+    with wave.open(stego_audio_ecc, 'wb') as audio:
+        audio.setparams(params)
+        audio.writeframes(noisy.tobytes())
+    
+    success, decoded_message = steg.decode_audio(stego_audio_ecc)
+    assert success and decoded_message == secret_message, decoded_message
+    print("   [OK] Message recovered after 6 flipped body LSBs and 3 flipped header LSBs")
+    
+    print("\n" + "-" * 60)
+    print("TEST 7: In-Place Payload Update")
+    print("-" * 60)
+    
+    size_before = os.path.getsize(stego_audio_key)
+    new_message = secret_message.replace("LSB", "lsb")
+    success, msg = steg.update_payload(stego_audio_key, new_message, key=embedding_key)
+    assert success, msg
+    print(f"   [OK] {msg}")
+    assert os.path.getsize(stego_audio_key) == size_before
+    
+    success, decoded_message = steg.decode_audio(stego_audio_key, key=embedding_key)
+    assert success and decoded_message == new_message
+    # Only the LSBs of the three changed characters can differ
+    assert steg.compare_audio(cover_audio, stego_audio_key)['modified_samples'] <= comparison_key_modified + 24
+    
+    success, msg = steg.update_payload(stego_audio_key, new_message, key="wrong_key")
+    assert not success
+    print(f"   [OK] Wrong key refused: {msg}")
+    
+    print("\n" + "-" * 60)
+    print("TEST 8: Keyed Slots for Several Recipients")
+    print("-" * 60)
+    
+    stego_audio_slots = "test_stego_slots.wav"
+    slot_messages = {"alice-key": secret_message, "bob-key": new_message}
+    source = cover_audio
+    for slot_key, message in slot_messages.items():
+        success, msg = steg.encode_slot(source, message, stego_audio_slots, slot_key, slots=4, matrix_k=3)
+        assert success, msg
+        source = stego_audio_slots
+    
+    for slot_key, message in slot_messages.items():
+        success, decoded_message = steg.decode_slot(stego_audio_slots, slot_key)
+        assert success and decoded_message == message
+    success, msg = steg.decode_slot(stego_audio_slots, embedding_key)
+    assert not success
+    print(f"   [OK] Each key decodes only its own slot; others refused: {msg}")
+    
     return True
 
 if __name__ == "__main__":
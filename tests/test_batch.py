@@ -0,0 +1,82 @@
+"""
+Test script for batch processing
+Encodes a folder of covers in a process pool, decodes the results and
+exports them as CSV.
+"""
+
+import sys
+import os
+import csv
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from modules.batch import load_message_map, plan_encode, plan_decode, run_batch, summarize, write_csv
+from test_image import create_test_image
+from test_audio import create_test_audio
+
+def test_batch():
+    """Test batch planning, pooled processing and CSV export."""
+    print("\n" + "=" * 60)
+    print("BATCH TEST")
+    print("=" * 60)
+
+    workdir = tempfile.mkdtemp(prefix="batch_")
+    try:
+        covers, stego = os.path.join(workdir, "covers"), os.path.join(workdir, "stego")
+        os.makedirs(covers)
+        os.makedirs(stego)
+        create_test_image(os.path.join(covers, "a.png"), size=(60, 40))
+        create_test_image(os.path.join(covers, "b.png"), size=(60, 40))
+        create_test_audio(os.path.join(covers, "c.wav"), duration=0.25, sample_rate=8000)
+        with open(os.path.join(covers, "notes.txt"), "w") as handle:
+            handle.write("for c.wav")
+        map_path = os.path.join(workdir, "messages.csv")
+        with open(map_path, "w", newline="") as handle:
+            csv.writer(handle).writerows([("file", "message", "message_file"),
+                                          ("a.png", "message for a", ""),
+                                          ("c.wav", "", "covers/notes.txt")])
+
+        messages = load_message_map(map_path)
+        assert messages == {"a.png": "message for a", "c.wav": "for c.wav"}
+        items = plan_encode(covers, stego, messages=messages)
+        assert [os.path.basename(item.path) for item in items] == ["a.png", "c.wav"]
+        items = plan_encode(covers, stego, "default", messages)
+        assert [item.message for item in items] == ["message for a", "default", "for c.wav"]
+        print("   [OK] Message map and default message applied")
+
+        finished = list(run_batch(items, key="batch", workers=2))
+        assert len(finished) == 3 and all(item.status == "ok" for item in items), [i.detail for i in items]
+
+        decodes = plan_decode(stego)
+        list(run_batch(decodes, key="batch", workers=2))
+        assert [item.detail for item in decodes] == ["message for a", "default", "for c.wav"]
+        summary = summarize(items + decodes, 1.0)
+        assert summary["ok"] == 6 and summary["files_per_second"] == 6.0
+        print(f"   [OK] Round trip through the pool: {summary['ok']} files")
+
+        csv_path = os.path.join(workdir, "results.csv")
+        write_csv(decodes, csv_path)
+        with open(csv_path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        assert [row["file"] for row in rows] == ["stego_a.png", "stego_b.png", "stego_c.wav"]
+        assert rows[0]["status"] == "ok" and rows[0]["detail"] == "message for a"
+        print("   [OK] CSV export")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return True
+
+if __name__ == "__main__":
+    try:
+        success = test_batch()
+        print("\n" + "=" * 60)
+        if success:
+            print("[OK] ALL TESTS PASSED")
+        else:
+            print("[FAIL] TESTS FAILED")
+        print("=" * 60 + "\n")
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {str(e)}\n")
+        import traceback
+        traceback.print_exc()
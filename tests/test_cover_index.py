@@ -0,0 +1,86 @@
+"""
+Test script for the cover library index
+Indexes a small folder of covers and queries it by required capacity.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+from PIL import Image
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from modules.cover_index import CoverIndex
+from modules import get_image_capacity, get_audio_capacity
+from test_image import create_test_image
+from test_audio import create_test_audio
+
+def test_cover_index():
+    """Test scanning, incremental rescans and capacity queries."""
+    print("\n" + "=" * 60)
+    print("COVER INDEX TEST")
+    print("=" * 60)
+
+    library = tempfile.mkdtemp(prefix="covers_")
+    try:
+        small = create_test_image(os.path.join(library, "small.png"), size=(40, 30))
+        large = create_test_image(os.path.join(library, "large.png"), size=(120, 90))
+        audio = create_test_audio(os.path.join(library, "clip.wav"), duration=0.25, sample_rate=8000)
+
+        with CoverIndex(os.path.join(library, "index.db")) as index:
+            stats = index.scan(library)
+            print(f"\n First scan: {stats}")
+            assert stats['added'] == 3
+
+            stats = index.scan(library)
+            print(f" Rescan: {stats}")
+            assert stats['added'] == 0 and stats['unchanged'] == 3
+
+            # Stored capacity agrees with the carrier modules
+            assert index.get(small)['slots'] == 40 * 30 * 3
+            assert index.find_covers(0, kind='image')[0]['capacity_bytes'] == get_image_capacity(small)
+            assert index.find_covers(get_audio_capacity(audio), kind='audio')[0]['path'] == os.path.abspath(audio)
+
+            gray = os.path.join(library, "gray.png")
+            Image.new('L', (100, 100)).save(gray)
+            index.scan(library)
+            assert index.get(gray)['channels'] == 1
+            assert index.get(gray)['slots'] == 100 * 100
+            capacities = [cover['capacity_bytes'] for cover in index.find_covers(0, kind='image', limit=5)]
+            assert get_image_capacity(gray) in capacities
+            os.remove(gray)
+            index.scan(library)
+            print("   [OK] Grayscale covers indexed at their native channel count")
+
+            best = index.find_covers(get_image_capacity(small) + 1, kind='image')
+            assert [cover['path'] for cover in best] == [os.path.abspath(large)]
+            print("   [OK] Smallest fitting cover selected")
+
+            combined = get_image_capacity(large) + get_image_capacity(small)
+            chosen = index.select_covers(combined - 5)
+            assert sum(cover['capacity_bytes'] for cover in chosen) >= combined - 5
+            assert index.select_covers(10 ** 9) == []
+            print("   [OK] Multi-cover selection")
+
+            os.remove(small)
+            stats = index.scan(library)
+            assert stats['removed'] == 1 and index.get(small) is None
+            print("   [OK] Deleted covers dropped on rescan")
+    finally:
+        shutil.rmtree(library, ignore_errors=True)
+
+    return True
+
+if __name__ == "__main__":
+    try:
+        success = test_cover_index()
+        print("\n" + "=" * 60)
+        if success:
+            print("[OK] ALL TESTS PASSED")
+        else:
+            print("[FAIL] TESTS FAILED")
+        print("=" * 60 + "\n")
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {str(e)}\n")
+        import traceback
+        traceback.print_exc()
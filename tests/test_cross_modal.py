@@ -0,0 +1,76 @@
+"""
+Test script for cross-modal payload sharding
+Spreads one payload over an image and an audio carrier and reassembles it.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from modules.cross_modal import CrossModalEncoder
+from modules.payload import PayloadHeader
+from test_image import create_test_image
+from test_audio import create_test_audio
+
+def test_cross_modal_sharding():
+    """Test encoding a payload larger than either cover."""
+    print("\n" + "=" * 60)
+    print("CROSS-MODAL SHARDING TEST")
+    print("=" * 60)
+
+    encoder = CrossModalEncoder(max_workers=2)
+
+    cover_image = create_test_image("test_xm_cover.png", size=(60, 40))
+    cover_audio = create_test_audio("test_xm_cover.wav", duration=0.5, sample_rate=8000)
+
+    capacities = [encoder.carrier_capacity(cover_image), encoder.carrier_capacity(cover_audio)]
+    print(f"\n Capacities: image={capacities[0]} bytes, audio={capacities[1]} bytes")
+
+    secret_message = ("Cross-modal payload ✓ " * 60)[:max(capacities) + 200]
+    assert len(secret_message.encode('utf-8')) > max(capacities)
+
+    outputs = ["test_xm_stego.png", "test_xm_stego.wav"]
+    success, manifest = encoder.encode([cover_image, cover_audio], secret_message, outputs, key="xm-key")
+    assert success, manifest
+    print(f" Shards: {[shard['shard_bytes'] for shard in manifest['shards']]}")
+    assert sum(shard['shard_bytes'] for shard in manifest['shards']) == manifest['payload_bytes']
+
+    # Order of stego files does not matter
+    success, decoded = encoder.decode(list(reversed(outputs)), key="xm-key")
+    assert success, decoded
+    assert decoded == secret_message
+    print("   [OK] Payload reassembled")
+
+    success, decoded = encoder.decode(outputs[:1], key="xm-key")
+    assert not success
+    print(f"   [OK] Missing shard detected: {decoded}")
+
+    # Shards filled to exactly the planned capacity still fit with a key
+    overhead = encoder._manifest_size(2) + PayloadHeader.MAC_SIZE
+    full_message = "x" * sum(capacity - overhead for capacity in capacities)
+    success, manifest = encoder.encode([cover_image, cover_audio], full_message, outputs, key="xm-key")
+    assert success, manifest
+    assert [shard['shard_bytes'] for shard in manifest['shards']] == [c - overhead for c in capacities]
+    success, decoded = encoder.decode(outputs, key="xm-key")
+    assert success and decoded == full_message
+    print("   [OK] Keyed shards filled to planned capacity")
+
+    success, manifest = encoder.encode([cover_image, cover_audio], full_message + "x", outputs, key="xm-key")
+    assert not success
+    print(f"   [OK] One byte over rejected: {manifest}")
+
+    return True
+
+if __name__ == "__main__":
+    try:
+        success = test_cross_modal_sharding()
+        print("\n" + "=" * 60)
+        if success:
+            print("[OK] ALL TESTS PASSED")
+        else:
+            print("[FAIL] TESTS FAILED")
+        print("=" * 60 + "\n")
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {str(e)}\n")
+        import traceback
+        traceback.print_exc()
@@ -6,11 +6,14 @@ Creates a simple test image and performs encode/decode operations.
 
 import sys
 import os
+import types
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from PIL import Image
 import numpy as np
-from modules.image_steg import ImageSteganography
+from modules.image_steg import ImageSteganography, ImageOutput
+from modules import png_rows
+from modules.png_rows import PNGRowReader
 
 def create_test_image(filename="test_cover.png", size=(400, 300)):
     """Create a simple test image."""
@@ -83,6 +86,304 @@ def test_image_steganography():
         print(f"[FAIL] Decoding failed: {decoded_message}")
         return False
 
+def test_compressed_payload():
+    """Test that compressible payloads shrink and round-trip through the header."""
+    print("\n" + "=" * 60)
+    print("IMAGE COMPRESSED PAYLOAD TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    cover_image = create_test_image("test_cover_small.png", size=(80, 60))
+    capacity = steg.calculate_capacity(cover_image)
+    
+    secret_message = '{"event": "login", "user": "alice", "status": "ok"}\n' * 60
+    assert len(secret_message) > capacity
+    
+    success, msg = steg.encode_image(cover_image, secret_message, "test_stego_small.png")
+    assert not success
+    print(f"[OK] Uncompressed rejected: {msg}")
+    
+    for codec in ("auto", "zlib", "lzma", "bz2"):
+        success, msg = steg.encode_image(cover_image, secret_message, "test_stego_small.png", compression=codec)
+        assert success, msg
+        success, decoded_message = steg.decode_image("test_stego_small.png")
+        assert success and decoded_message == secret_message
+        print(f"[OK] {codec} round-trip")
+    
+    return True
+
+def test_keyed_scattering():
+    """Test that a key scatters the payload and is required to decode it."""
+    print("\n" + "=" * 60)
+    print("IMAGE KEYED SCATTERING TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    cover_image = create_test_image()
+    secret_message = "Scattered across the whole image"
+    stego_image = "test_stego_keyed.png"
+    
+    success, msg = steg.encode_image(cover_image, secret_message, stego_image, key="pixel-key")
+    assert success, msg
+    
+    success, decoded_message = steg.decode_image(stego_image, key="pixel-key")
+    assert success and decoded_message == secret_message
+    print("[OK] Decoded with the right key")
+    
+    for key in ("wrong-key", None):
+        success, decoded_message = steg.decode_image(stego_image, key=key)
+        assert not success
+    print("[OK] Wrong or missing key rejected")
+    
+    diff = np.array(Image.open(cover_image)) != np.array(Image.open(stego_image))
+    changed_rows = np.flatnonzero(diff.any(axis=(1, 2)))
+    assert changed_rows.max() > diff.shape[0] // 2
+    print(f"[OK] Changes span rows {changed_rows.min()}..{changed_rows.max()}")
+    
+    return True
+
+def test_update_payload():
+    """Test replacing a hidden message without re-encoding from the cover."""
+    print("\n" + "=" * 60)
+    print("IMAGE PAYLOAD UPDATE TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    cover_image = create_test_image()
+    stego_image = "test_stego_update.png"
+    
+    success, msg = steg.encode_image(cover_image, "status: pending", stego_image, key="k", matrix_k=3)
+    assert success, msg
+    
+    success, msg = steg.update_payload(stego_image, "status: pending", key="k")
+    assert success and "unchanged" in msg
+    print(f"[OK] {msg}")
+    
+    success, msg = steg.update_payload(stego_image, "status: approved", key="k")
+    assert success, msg
+    print(f"[OK] {msg}")
+    
+    success, decoded_message = steg.decode_image(stego_image, key="k")
+    assert success and decoded_message == "status: approved"
+    
+    success, msg = steg.update_payload(cover_image, "anything")
+    assert not success
+    print(f"[OK] Clean cover refused: {msg}")
+    
+    # A shorter message leaves nothing of the old one's tail
+    old_message = " ".join(f"line {i} of the old report" for i in range(40))
+    success, msg = steg.encode_image(cover_image, old_message, stego_image)
+    assert success, msg
+    success, msg = steg.update_payload(stego_image, "short")
+    assert success, msg
+    lsbs = np.packbits(np.asarray(Image.open(stego_image)).reshape(-1) & 1).tobytes()
+    assert b"old report" not in lsbs
+    assert steg.decode_image(stego_image) == (True, "short")
+    assert not os.path.exists(stego_image + ".part")
+    print("[OK] Old payload tail overwritten")
+    
+    return True
+
+def test_matrix_embedding():
+    """Test Hamming matrix embedding round-trips and changes fewer pixels."""
+    print("\n" + "=" * 60)
+    print("IMAGE MATRIX EMBEDDING TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    cover_image = create_test_image()
+    # Random bytes make plain LSB change about half the touched values
+    secret_message = os.urandom(1500)
+    
+    success, msg = steg.encode_image(cover_image, secret_message, "test_stego_plain.png")
+    assert success, msg
+    plain_changes = steg.compare_images(cover_image, "test_stego_plain.png")['modified_pixels']
+    
+    for k, key in ((3, None), (5, "matrix-key")):
+        stego_image = f"test_stego_matrix{k}.png"
+        success, msg = steg.encode_image(cover_image, secret_message, stego_image, key=key, matrix_k=k)
+        assert success, msg
+        success, decoded_message = steg.decode_image(stego_image, key=key)
+        assert success and decoded_message == secret_message
+        changes = steg.compare_images(cover_image, stego_image)['modified_pixels']
+        print(f"[OK] k={k}: {changes} values changed vs {plain_changes} with plain LSB")
+        assert changes < plain_changes
+    
+    success, msg = steg.encode_image(cover_image, secret_message * 20, "test_stego_matrix.png", matrix_k=8)
+    assert not success
+    print(f"[OK] Oversized matrix payload rejected: {msg}")
+    
+    return True
+
+def test_keyed_slots():
+    """Test several keyed payloads sharing one image, each decoded on its own."""
+    print("\n" + "=" * 60)
+    print("IMAGE KEYED SLOTS TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    cover_image = create_test_image()
+    stego_image = "test_stego_slots.png"
+    messages = {"alice-key": "For Alice only", "bob-key": "Bob's copy", "carol-key": "Carol " * 50}
+    
+    source = cover_image
+    for key, message in messages.items():
+        success, msg = steg.encode_slot(source, message, stego_image, key, slots=3)
+        assert success, msg
+        print(f"[OK] {msg}")
+        source = stego_image
+    
+    for key, message in messages.items():
+        success, decoded_message = steg.decode_slot(stego_image, key)
+        assert success and decoded_message == message
+    print("[OK] Every key decodes its own slot")
+    
+    success, msg = steg.decode_slot(stego_image, "mallory-key")
+    assert not success
+    success, msg = steg.encode_slot(stego_image, "No room", stego_image, "mallory-key")
+    assert not success
+    print(f"[OK] Unknown key rejected, full table refused: {msg}")
+    
+    success, msg = steg.encode_slot(stego_image, "For Alice, revised", stego_image, "alice-key")
+    assert success, msg
+    assert steg.decode_slot(stego_image, "alice-key") == (True, "For Alice, revised")
+    assert steg.decode_slot(stego_image, "bob-key") == (True, messages["bob-key"])
+    print("[OK] Re-encoding a key reuses its slot and keeps the others")
+    
+    return True
+
+def test_output_formats():
+    """Test PNG compression options and uncompressed/raw stego output."""
+    print("\n" + "=" * 60)
+    print("IMAGE OUTPUT FORMAT TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    cover_image = create_test_image()
+    secret_message = "Saved without the slow zlib pass"
+    outputs = [
+        ("test_stego_fast.png", ImageOutput(compress_level=1, png_strategy="rle")),
+        ("test_stego_auto.png", ImageOutput(compress_level="auto")),
+        ("test_stego_plain.bmp", None),
+        ("test_stego_plain.tiff", None),
+        ("test_stego_raw.bin", ImageOutput("raw")),
+    ]
+    
+    for stego_image, output in outputs:
+        success, msg = steg.encode_image(cover_image, secret_message, stego_image, key="out-key", output=output)
+        assert success, msg
+        success, decoded_message = steg.decode_image(stego_image, key="out-key")
+        assert success and decoded_message == secret_message
+        print(f"[OK] {stego_image}: {os.path.getsize(stego_image)} bytes")
+    
+    assert Image.open("test_stego_plain.bmp").format == "BMP"
+    success, msg = steg.update_payload("test_stego_raw.bin", "Updated raw", key="out-key")
+    assert success, msg
+    assert steg.decode_image("test_stego_raw.bin", key="out-key") == (True, "Updated raw")
+    print("[OK] Raw array output updates in place")
+    
+    for bad in ({"format": "jpeg"}, {"compress_level": 12}, {"png_strategy": "zstd"}):
+        try:
+            ImageOutput(**bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} accepted")
+    print("[OK] Invalid output options rejected")
+    
+    return True
+
+def test_partial_png_decode():
+    """Test that an unkeyed payload decodes from the top rows of a PNG only."""
+    print("\n" + "=" * 60)
+    print("IMAGE PARTIAL PNG DECODE TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    # Noise keeps the PNG from compressing into a single IDAT block
+    cover_image = "test_cover_tall.png"
+    Image.fromarray(np.random.default_rng(5).integers(0, 256, (1500, 200, 3), dtype=np.uint8)).save(cover_image)
+    stego_image = "test_stego_tall.png"
+    secret_message = "Only the first rows are inflated"
+    
+    for matrix_k in (0, 4):
+        success, msg = steg.encode_image(cover_image, secret_message, stego_image, matrix_k=matrix_k)
+        assert success, msg
+        assert steg.decode_image(stego_image) == (True, secret_message)
+    
+    with PNGRowReader(stego_image) as reader:
+        assert np.array_equal(np.asarray(reader.rows(3)), np.asarray(Image.open(stego_image))[:3])
+        print(f"[OK] {reader.rows_decoded} of {reader.height} rows inflated for 3 requested")
+        assert reader.rows_decoded < reader.height // 2
+    
+    # A Pillow whose decoder internals the row reader cannot drive falls back to a full decode
+    original_rows = PNGRowReader.rows
+    try:
+        png_rows.Image = types.SimpleNamespace(open=Image.open)  # no _getdecoder
+        assert steg.decode_image(stego_image) == (True, secret_message)
+        png_rows.Image = Image
+        PNGRowReader.rows = lambda self, count: (_ for _ in ()).throw(TypeError("decode() signature"))
+        assert steg.decode_image(stego_image) == (True, secret_message)
+    finally:
+        png_rows.Image = Image
+        PNGRowReader.rows = original_rows
+    print("[OK] Row reader failures fall back to a full decode")
+    
+    # Formats other than non-interlaced PNG fall back to a full decode
+    Image.open(stego_image).save("test_stego_tall.bmp")
+    assert steg.decode_image("test_stego_tall.bmp") == (True, secret_message)
+    print("[OK] Non-PNG stego-image still decodes")
+    
+    return True
+
+def test_native_modes():
+    """Test RGBA, L and 16-bit covers keep their mode, with alpha embedding on request."""
+    print("\n" + "=" * 60)
+    print("IMAGE NATIVE MODES TEST")
+    print("=" * 60)
+    
+    steg = ImageSteganography()
+    rng = np.random.default_rng(9)
+    secret_message = "Stored without an RGB round-trip"
+    covers = {
+        "RGBA": rng.integers(0, 256, (120, 90, 4), dtype=np.uint8),
+        "L": rng.integers(0, 256, (120, 90), dtype=np.uint8),
+        "I;16": rng.integers(0, 65536, (120, 90), dtype=np.uint16),
+    }
+    
+    for mode, pixels in covers.items():
+        cover_image = f"test_cover_{mode.replace(';', '')}.png"
+        stego_image = f"test_stego_{mode.replace(';', '')}.png"
+        Image.fromarray(pixels).save(cover_image)
+        for key in (None, "mode-key"):
+            success, msg = steg.encode_image(cover_image, secret_message, stego_image, key=key)
+            assert success, msg
+            assert steg.decode_image(stego_image, key=key) == (True, secret_message)
+        
+        stego = np.asarray(Image.open(stego_image))
+        assert Image.open(stego_image).mode == mode and stego.dtype == pixels.dtype
+        assert np.abs(stego.astype(int) - pixels).max() == 1
+        if mode == "RGBA":
+            assert np.array_equal(stego[..., 3], pixels[..., 3])
+        print(f"[OK] {mode} round-trip keeps its mode{' and alpha' if mode == 'RGBA' else ''}")
+    
+    success, msg = steg.encode_image("test_cover_RGBA.png", secret_message, "test_stego_alpha.png", use_alpha=True)
+    assert success, msg
+    assert steg.decode_image("test_stego_alpha.png") == (True, secret_message)
+    alpha_changed = np.asarray(Image.open("test_stego_alpha.png"))[..., 3] != covers["RGBA"][..., 3]
+    assert alpha_changed.any()
+    assert steg.calculate_capacity("test_cover_RGBA.png", use_alpha=True) > steg.calculate_capacity("test_cover_RGBA.png")
+    print("[OK] Alpha embedding decodes without being told")
+    
+    # BMP drops alpha, so an alpha payload could never be read back
+    success, msg = steg.encode_image("test_cover_RGBA.png", secret_message, "test_stego_alpha.bmp",
+                                     output=ImageOutput('bmp'), use_alpha=True)
+    assert not success and "alpha" in msg and not os.path.exists("test_stego_alpha.bmp")
+    success, msg = steg.encode_image("test_cover_RGBA.png", secret_message, "test_stego_alpha.tiff", use_alpha=True)
+    assert success and steg.decode_image("test_stego_alpha.tiff") == (True, secret_message)
+    print("[OK] use_alpha refused for outputs without alpha")
+    
+    return True
+
 if __name__ == "__main__":
     try:
         success = test_image_steganography()
@@ -3,16 +3,29 @@
 Test utilities and helper functions.
 """
 
+import base64
+import hashlib
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from utils.helpers import (
     EncryptionHelper,
+    CompressionHelper,
+    KDFParams,
+    DerivedKeyCache,
     BinaryConverter,
     FileHelper,
     CapacityCalculator
 )
+from utils.ecc import ReedSolomonCodec
+from utils import timing
+from utils.metrics import Registry
+from utils.admission import AdmissionController, AdmissionRejected
+from utils import progress
+from utils.jobs import Job
+from utils.uploads import UploadRejected, receive_upload
+import numpy as np
 
 def test_encryption():
     """Test encryption and decryption."""
@@ -50,6 +63,189 @@ def test_encryption():
     except Exception as e:
         print(f"   [OK] Correctly failed: {str(e)}")
     
+    # Text encrypted before the salted KDF still decrypts
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+    cipher = AES.new(hashlib.sha256(password.encode()).digest(), AES.MODE_CBC)
+    legacy = base64.b64encode(cipher.iv + cipher.encrypt(pad(message.encode(), 16))).decode()
+    assert enc.decrypt_message(legacy, password) == message
+    assert base64.b64decode(encrypted).startswith(EncryptionHelper.SALTED_MARKER)
+    print("   [OK] Legacy unsalted text decrypted")
+    
+    return True
+
+def test_binary_encryption():
+    """Test the binary AES-GCM path, including chunking and tamper detection."""
+    print("\n" + "=" * 60)
+    print("BINARY ENCRYPTION TEST")
+    print("=" * 60)
+    
+    enc = EncryptionHelper()
+    enc.STREAM_CHUNK_SIZE = 1000
+    
+    data = os.urandom(4500)
+    header = b"SG-header"
+    
+    encrypted = enc.encrypt_bytes(data, "pw", header)
+    print(f"\n Plain: {len(data)} bytes, Encrypted: {len(encrypted)} bytes")
+    assert len(encrypted) == len(data) + EncryptionHelper.GCM_OVERHEAD
+    assert enc.decrypt_bytes(encrypted, "pw", header) == data
+    print("   [OK] Chunked round-trip")
+    
+    tampered = bytearray(encrypted)
+    tampered[20] ^= 1
+    for args in ((bytes(tampered), "pw", header), (encrypted, "wrong", header), (encrypted, "pw", b"other")):
+        try:
+            enc.decrypt_bytes(*args)
+            print("   [FAIL] Tampering not detected")
+            return False
+        except Exception as e:
+            assert "Decryption failed" in str(e)
+    print("   [OK] Tampered ciphertext, wrong password and wrong header rejected")
+    
+    return True
+
+def test_key_derivation_cache():
+    """Test salted KDFs and the derived-key cache."""
+    print("\n" + "=" * 60)
+    print("KEY DERIVATION CACHE TEST")
+    print("=" * 60)
+    
+    import threading
+    import time
+    
+    cache = DerivedKeyCache(max_entries=2, ttl_seconds=60)
+    enc = EncryptionHelper(key_cache=cache)
+    params = KDFParams(KDFParams.SCRYPT, cost=12)
+    
+    key = enc.derive_key("pw", params)
+    assert len(key) == 32 and key != enc.derive_key("pw")
+    assert enc.derive_key("pw", KDFParams(KDFParams.SCRYPT, 12, params.salt)) == key
+    assert enc.derive_key("pw", KDFParams(KDFParams.SCRYPT, 12)) != key
+    assert enc.derive_key("pw", KDFParams(KDFParams.PBKDF2_SHA256, 12, params.salt)) != key
+    print(f"   [OK] Salted derivation (hits={cache.hits}, misses={cache.misses})")
+    
+    # Costs from an untrusted header are capped per KDF
+    for kdf, cost in ((KDFParams.SCRYPT, 18), (KDFParams.PBKDF2_SHA256, 24), (KDFParams.SCRYPT, 9)):
+        try:
+            KDFParams.unpack(KDFParams.FORMAT.pack(kdf, cost, params.salt))
+            assert False, f"cost {cost} accepted"
+        except ValueError:
+            pass
+        try:
+            KDFParams(kdf, cost)
+            assert False, f"cost {cost} accepted"
+        except ValueError:
+            pass
+    assert KDFParams.unpack(KDFParams(KDFParams.PBKDF2_SHA256, 21).pack()).cost == 21
+    print("   [OK] Implausible KDF costs rejected")
+    assert cache.hits == 1 and len(cache) == 2
+    
+    # Concurrent lookups of a new entry derive it once
+    cache.clear()
+    misses = cache.misses
+    threads = [threading.Thread(target=enc.derive_key, args=("pw", params)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.misses == misses + 1
+    print("   [OK] Concurrent misses derive once")
+    
+    cache.ttl_seconds = 0.01
+    cache.clear()
+    enc.derive_key("pw", params)
+    time.sleep(0.02)
+    misses = cache.misses
+    enc.derive_key("pw", params)
+    assert cache.misses == misses + 1
+    print("   [OK] Expired entries are re-derived")
+    
+    return True
+
+def test_compression():
+    """Test compression codecs and compress-before-encrypt."""
+    print("\n" + "=" * 60)
+    print("COMPRESSION TEST")
+    print("=" * 60)
+    
+    data = b"timestamp=2024-01-01 level=INFO msg=heartbeat ok\n" * 100
+    
+    for codec in ("zlib", "lzma", "bz2", "auto"):
+        codec_id, compressed = CompressionHelper.compress(data, codec)
+        print(f"   {codec}: {len(data)} -> {len(compressed)} bytes (codec id {codec_id})")
+        assert codec_id != 0 and len(compressed) < len(data)
+        assert CompressionHelper.decompress(codec_id, compressed) == data
+    
+    # Incompressible input stays uncompressed under 'auto'
+    codec_id, compressed = CompressionHelper.compress(os.urandom(64), "auto")
+    assert codec_id == 0
+    
+    # A bomb small enough for any carrier is refused, not expanded
+    from modules.payload import PayloadHeader, unpack_message
+    import zlib
+    bomb = zlib.compress(bytes(CompressionHelper.MAX_DECOMPRESSED_SIZE + 1), 9)
+    for check in (lambda: CompressionHelper.decompress(1, bomb),
+                  lambda: unpack_message(PayloadHeader(len(bomb), codec=1), bomb)):
+        try:
+            check()
+            assert False, "decompression bomb was expanded"
+        except ValueError as e:
+            assert "bomb" in str(e)
+    assert CompressionHelper.decompress(1, zlib.compress(data), max_size=len(data)) == data
+    print(f"   [OK] {len(bomb)}-byte decompression bomb refused")
+    
+    enc = EncryptionHelper()
+    message = data.decode()
+    encrypted = enc.encrypt_message(message, "pw", compression="auto")
+    plain_encrypted = enc.encrypt_message(message, "pw")
+    print(f"   Encrypted size: {len(encrypted)} (compressed) vs {len(plain_encrypted)} (plain)")
+    assert len(encrypted) < len(plain_encrypted)
+    assert enc.decrypt_message(encrypted, "pw") == message
+    print("   [OK] Compress-then-encrypt round-trip")
+    
+    return True
+
+def test_reed_solomon():
+    """Test Reed-Solomon encode/decode, error correction and interleaving."""
+    print("\n" + "=" * 60)
+    print("REED-SOLOMON ECC TEST")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(7)
+    data = os.urandom(5000)
+    
+    for nsym in (4, 32):
+        codec = ReedSolomonCodec(nsym)
+        encoded = codec.encode(data)
+        assert len(encoded) == codec.encoded_size(len(data))
+        assert codec.decode(encoded) == (data, 0)
+        
+        # nsym // 2 corrupted bytes in every codeword are corrected
+        rows = len(encoded) // 255
+        corrupted = np.frombuffer(encoded, dtype=np.uint8).copy().reshape(255, rows)
+        for row in range(rows):
+            positions = rng.choice(255, nsym // 2, replace=False)
+            corrupted[positions, row] ^= rng.integers(1, 256, nsym // 2, dtype=np.uint8)
+        decoded, fixed = codec.decode(corrupted.tobytes())
+        assert decoded == data and fixed == rows * (nsym // 2)
+        print(f"   [OK] RS(255,{255 - nsym}): corrected {fixed} bytes")
+    
+    # Interleaving spreads a contiguous burst over many codewords
+    codec = ReedSolomonCodec(8)
+    burst = np.frombuffer(codec.encode(data), dtype=np.uint8).copy()
+    burst[100:180] ^= 0xFF
+    assert codec.decode(burst.tobytes())[0] == data
+    print("   [OK] 80-byte burst corrected via interleaving")
+    
+    beyond = np.frombuffer(codec.encode(b"short"), dtype=np.uint8).copy()
+    beyond[:10] ^= 0x55
+    try:
+        codec.decode(beyond.tobytes())
+        assert False, "uncorrectable codeword accepted"
+    except ValueError as e:
+        print(f"   [OK] Uncorrectable data rejected: {e}")
+    
     return True
 
 def test_binary_conversion():
@@ -151,6 +347,348 @@ def test_file_helper():
     
     return all_passed
 
+def test_timing():
+    """Test per-stage timing spans."""
+    print("\n" + "=" * 60)
+    print("TIMING TEST")
+    print("=" * 60)
+    
+    import json
+    import tempfile
+    from modules.payload import pack_message, read_header, unpack_message
+    
+    # Disabled: every span is the shared no-op
+    assert timing.current() is None and timing.span('embed') is timing.NULL_SPAN
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        log = os.path.join(workdir, "timings.jsonl")
+        message = b"timing " * 200
+        with timing.collect("pack", log) as timings:
+            assert timing.current() is timings
+            payload = pack_message(message, password="pw")
+            with timing.span('total', len(payload)) as stage:
+                stage.add_bytes(1)
+        assert timing.current() is None
+        
+        totals = timings.totals()
+        assert {'kdf', 'compress', 'encrypt', 'total'} <= set(totals)
+        assert totals['compress'][1] == len(message) and totals['total'][1] == len(payload) + 1
+        assert 'total;dur=' in timings.server_timing()
+        assert f'desc="{len(message)} bytes"' in timings.server_timing()
+        print(f"   [OK] Server-Timing: {timings.server_timing()}")
+        
+        with open(log) as handle:
+            record = json.loads(handle.read())
+        assert record['label'] == "pack" and len(record['spans']) == len(timings.spans)
+        print("   [OK] JSON-lines record written")
+        
+        from PIL import Image
+        from modules.image_steg import ImageSteganography
+        cover, stego = os.path.join(workdir, "cover.png"), os.path.join(workdir, "stego.png")
+        Image.new('RGB', (64, 64), (90, 120, 200)).save(cover)
+        steg = ImageSteganography()
+        with timing.collect() as timings:
+            assert steg.encode_image(cover, "timed", stego)[0]
+            assert steg.decode_image(stego) == (True, "timed")
+        names = [s.name for s in timings.spans]
+        assert names[:4] == ['load', 'pack', 'compress', 'embed'] and 'save' in names
+        assert timings.totals()['save'][1] == os.path.getsize(stego)
+        print(f"   [OK] Image stages: {', '.join(timings.totals())}")
+    
+    with timing.collect() as timings:
+        header = read_header(lambda n: payload[:n])
+        assert unpack_message(header, payload[len(header.pack()):], "pw") == message
+    assert [s.name for s in timings.spans][-2:] == ['decrypt', 'decompress']
+    print("   [OK] Decode stages recorded")
+    
+    return True
+
+def test_metrics():
+    """Test the Prometheus text-format metrics."""
+    print("\n" + "=" * 60)
+    print("METRICS TEST")
+    print("=" * 60)
+    
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("endpoint",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    latency = registry.histogram("latency_seconds", "Latency", ("endpoint",), (0.1, 1.0))
+    
+    requests.inc(endpoint='/a')
+    requests.inc(2, endpoint='say "hi"\n')
+    in_flight.inc()
+    in_flight.dec()
+    in_flight.inc(3)
+    for value in (0.05, 0.1, 0.5, 7.5):
+        latency.observe(value, endpoint='/a')
+    
+    try:
+        requests.inc(-1, endpoint='/a')
+        assert False, "counters must not decrease"
+    except ValueError:
+        pass
+    try:
+        requests.inc(status='200')
+        assert False, "wrong label names must be rejected"
+    except ValueError:
+        pass
+    
+    lines = registry.render().splitlines()
+    expected = [
+        '# TYPE requests_total counter',
+        'requests_total{endpoint="/a"} 1',
+        'requests_total{endpoint="say \\"hi\\"\\n"} 2',
+        'in_flight 3',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{endpoint="/a",le="0.1"} 2',
+        'latency_seconds_bucket{endpoint="/a",le="1"} 3',
+        'latency_seconds_bucket{endpoint="/a",le="+Inf"} 4',
+        'latency_seconds_sum{endpoint="/a"} 8.15',
+        'latency_seconds_count{endpoint="/a"} 4',
+    ]
+    for line in expected:
+        assert line in lines, line
+        print(f"   [OK] {line}")
+    assert latency.count(endpoint='/a') == 4 and requests.value(endpoint='/a') == 1
+    
+    return True
+
+def test_admission():
+    """Test carrier cost estimates and admission budgets."""
+    print("\n" + "=" * 60)
+    print("ADMISSION CONTROL TEST")
+    print("=" * 60)
+    
+    import asyncio
+    import tempfile
+    import wave
+    from PIL import Image
+    from modules.cost import estimate_cost
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        image_path, audio_path = os.path.join(workdir, "cover.png"), os.path.join(workdir, "cover.wav")
+        Image.new('RGBA', (300, 200)).save(image_path)
+        with wave.open(audio_path, 'wb') as audio:
+            audio.setnchannels(2)
+            audio.setsampwidth(2)
+            audio.setframerate(44100)
+            audio.writeframes(bytes(44100 * 4))
+        
+        image_cost = estimate_cost(image_path, 'image', 'encode')
+        assert image_cost.values == 300 * 200 * 3 and image_cost.memory_bytes == int(300 * 200 * 4 * 2.5)
+        audio_cost = estimate_cost(audio_path, 'audio', 'encode')
+        assert audio_cost.values == 88200 and audio_cost.memory_bytes == int(88200 * 2 * 1.2)
+        assert estimate_cost(image_path, 'image', 'capacity').memory_bytes == 0
+        keyed = estimate_cost(image_path, 'image', 'decode', kdf=True)
+        unkeyed = estimate_cost(image_path, 'image', 'decode')
+        assert keyed.memory_bytes - unkeyed.memory_bytes == 128 * 8 * 2 ** 17
+        assert keyed.cpu_seconds > unkeyed.cpu_seconds
+        print(f"   [OK] {image_cost}")
+        print(f"   [OK] {audio_cost}")
+        try:
+            estimate_cost(audio_path, 'image', 'encode')
+            assert False, "a WAV is not an image"
+        except ValueError:
+            print("   [OK] Unreadable header rejected")
+    
+    async def scenario():
+        controller = AdmissionController(memory_budget=100, request_memory_limit=80, request_cpu_limit=10,
+                                         small_job_bytes=10, max_queued=1, queue_timeout=0.2)
+        statuses = []
+        
+        async def job(memory, hold=0.05, cpu=0.0):
+            try:
+                async with controller.admit(memory, cpu):
+                    await asyncio.sleep(hold)
+                return 200
+            except AdmissionRejected as e:
+                return e.status
+        
+        # Over the per-request limits
+        statuses += [await job(81), await job(5, cpu=11)]
+        # 60 runs, a second 60 queues until it finishes, a third finds the queue full;
+        # small jobs bypass the budget entirely
+        statuses += await asyncio.gather(job(60), job(60), job(60), job(5))
+        assert controller.reserved == 0 and controller.queued == 0
+        # A job that cannot fit before the timeout
+        statuses += await asyncio.gather(job(80, hold=0.5), job(80))
+        return statuses
+    
+    statuses = asyncio.run(scenario())
+    assert statuses == [413, 413, 200, 200, 429, 200, 200, 429], statuses
+    print(f"   [OK] Budgets and queueing: {statuses}")
+    
+    return True
+
+def test_progress():
+    """Test progress trackers, cancellation and background jobs."""
+    print("\n" + "=" * 60)
+    print("PROGRESS TEST")
+    print("=" * 60)
+    
+    import asyncio
+    import tempfile
+    import time
+    import wave
+    from modules.audio_steg import AudioSteganography, AUDIO_CHUNK_FRAMES
+    
+    calls = []
+    tracker = progress.Tracker(lambda *args: calls.append(args), {'a': 1, 'b': 3}, min_step=0.1)
+    for done in range(1, 101):
+        tracker.update('a', done, 100)
+    tracker.update('b', 0, 10)
+    tracker.update('b', 5, 10)
+    assert tracker.overall == 0.25 + 0.75 * 0.5
+    # Throttled to every tenth of overall progress, plus stage changes and completions
+    assert 3 <= len(calls) <= 6 and calls[-1] == ('b', 0.5, tracker.overall), calls
+    print(f"   [OK] Weighted and throttled: {len(calls)} callbacks for 102 reports")
+    
+    progress.report('a', 1, 2)  # no tracker: ignored
+    tracker.cancel()
+    try:
+        tracker.update('b', 6, 10)
+        assert False, "a cancelled tracker must raise"
+    except progress.Cancelled:
+        print("   [OK] Cancelled tracker stops the next report")
+    
+    steg = AudioSteganography()
+    with tempfile.TemporaryDirectory() as workdir:
+        cover, stego = os.path.join(workdir, "cover.wav"), os.path.join(workdir, "stego.wav")
+        with wave.open(cover, 'wb') as audio:
+            audio.setnchannels(1)
+            audio.setsampwidth(2)
+            audio.setframerate(44100)
+            audio.writeframes(np.random.randint(-1000, 1000, AUDIO_CHUNK_FRAMES * 4, dtype=np.int16).tobytes())
+        
+        stages = []
+        tracker = progress.Tracker(lambda stage, fraction, overall: stages.append(stage), steg.ENCODE_STAGES)
+        with progress.track(tracker):
+            success, _ = steg.encode_audio(cover, "progress", stego)
+        assert success and tracker.overall == 1.0
+        assert [s for i, s in enumerate(stages) if s not in stages[:i]] == ['load', 'pack', 'embed', 'save']
+        assert steg.decode_audio(stego) == (True, "progress")
+        print(f"   [OK] Audio encode reported {len(stages)} times")
+        
+        tracker = progress.Tracker(lambda stage, fraction, overall: stage == 'load' and tracker.cancel())
+        with progress.track(tracker):
+            success, message = steg.encode_audio(cover, "progress", stego)
+        assert not success and "Cancelled" in message and tracker.stage == 'load'
+        print("   [OK] Encode stopped after its first chunk")
+        
+        # Stopped while saving over an existing file: that file is left as it was
+        def stop_saving(stage, fraction, overall):
+            if stage == 'save':
+                tracker.cancel()
+        
+        tracker = progress.Tracker(stop_saving)
+        with progress.track(tracker):
+            success, _ = steg.encode_audio(cover, "replaced", stego)
+        assert not success and sorted(os.listdir(workdir)) == ["cover.wav", "stego.wav"]
+        assert steg.decode_audio(stego) == (True, "progress")
+        
+        tracker = progress.Tracker(timeout=1e-6)
+        time.sleep(0.001)
+        with progress.track(tracker):
+            success, message = steg.decode_audio(stego)
+        assert not success and "Deadline exceeded" in message and tracker.timed_out
+        print("   [OK] Partial output discarded; deadline stops decode")
+    
+    async def scenario():
+        async def work():
+            for step in range(1, 5):
+                progress.report('step', step, 4)
+                await asyncio.sleep(0.01)
+            return "result"
+        
+        job = Job('audio', 'encode', {'step': 1}).start(work)
+        snapshots = [snapshot async for snapshot in job.events()]
+        
+        async def waiting():
+            await asyncio.sleep(10)
+        
+        queued = Job('audio', 'encode').start(waiting)
+        await asyncio.sleep(0)
+        assert queued.cancel()
+        await queued.wait()
+        
+        slow = Job('audio', 'encode', timeout=0.02).start(work)
+        await slow.wait()
+        return job, snapshots, queued, slow
+    
+    job, snapshots, queued, slow = asyncio.run(scenario())
+    assert job.result == "result" and snapshots[-1]['status'] == 'done' and snapshots[-1]['progress'] == 1.0
+    assert queued.status == 'cancelled' and not queued.cancel()
+    assert slow.status == 'timed_out' and isinstance(slow.error, progress.DeadlineExceeded)
+    print(f"   [OK] Job streamed {len(snapshots)} snapshots; queued job cancelled, slow one timed out")
+    
+    return True
+
+
+def test_uploads():
+    """Test streaming multipart upload parsing and its size limit."""
+    print("\n" + "=" * 60)
+    print("STREAMING UPLOAD TEST")
+    print("=" * 60)
+    
+    import asyncio
+    import hashlib
+    import tempfile
+    
+    content = os.urandom(300000)
+    body = (b'--XyZ\r\nContent-Disposition: form-data; name="message"\r\n\r\nhello \xe2\x9c\x93\r\n'
+            b'--XyZ\r\nContent-Disposition: form-data; name="file"; filename="cover.png"\r\n'
+            b'Content-Type: image/png\r\n\r\n' + content + b'\r\n--XyZ--\r\n')
+    content_type = 'multipart/form-data; boundary=XyZ'
+    
+    async def chunks(data, size=7000):
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+    
+    heads = []
+    
+    async def on_head(upload):
+        # The head is on disk before any more of the body is read
+        with open(upload.path, 'rb') as handle:
+            heads.append((upload.filename, upload.size, handle.read() == content[:upload.size]))
+    
+    async def receive(data, max_bytes, content_type=content_type, on_head=on_head):
+        try:
+            return await receive_upload(chunks(data), content_type, workdir, max_bytes, chunk_bytes=1 << 16,
+                                        head_bytes=20000, on_head=on_head)
+        except UploadRejected as e:
+            return e.status
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        upload = asyncio.run(receive(body, 1 << 20))
+        with open(upload.path, 'rb') as handle:
+            assert handle.read() == content
+        assert upload.filename == "cover.png" and upload.fields == {'message': "hello \u2713"}
+        assert upload.size == len(content) and upload.sha256 == hashlib.sha256(content).hexdigest()
+        assert len(heads) == 1 and heads[0][0] == "cover.png" and 20000 <= heads[0][1] < 30000 and heads[0][2]
+        asyncio.run(upload.discard())
+        print(f"   [OK] {upload.size} bytes streamed to disk, head of {heads[0][1]} bytes seen first, "
+              f"fields {upload.fields}")
+        
+        statuses = [asyncio.run(receive(body, 100000)),
+                    asyncio.run(receive(b'not multipart', 1 << 20)),
+                    asyncio.run(receive(body, 1 << 20, 'text/plain')),
+                    asyncio.run(receive(body[:60] + b'\r\n--XyZ--\r\n', 1 << 20))]
+        assert statuses == [413, 400, 400, 422], statuses
+        assert os.listdir(workdir) == []
+        print(f"   [OK] Refused mid-stream or malformed, no partial files left: {statuses}")
+        
+        # What the head callback acquired is released when the body is refused later on
+        released = []
+        
+        async def hold(upload):
+            upload.resources.callback(released.append, upload.size)
+        
+        assert asyncio.run(receive(body, 100000, on_head=hold)) == 413
+        assert len(released) == 1 and os.listdir(workdir) == []
+        print("   [OK] Resources taken at the head released on a later refusal")
+    
+    return True
+
 def run_all_tests():
     """Run all utility tests."""
     print("\n" + "=" * 60)
@@ -159,9 +697,18 @@ def run_all_tests():
     
     tests = [
         ("Encryption", test_encryption),
+        ("Binary Encryption", test_binary_encryption),
+        ("Key Derivation Cache", test_key_derivation_cache),
+        ("Compression", test_compression),
+        ("Reed-Solomon ECC", test_reed_solomon),
         ("Binary Conversion", test_binary_conversion),
         ("Capacity Calculator", test_capacity_calculator),
         ("File Helper", test_file_helper),
+        ("Timing", test_timing),
+        ("Metrics", test_metrics),
+        ("Admission Control", test_admission),
+        ("Progress", test_progress),
+        ("Streaming Uploads", test_uploads),
     ]
     
     results = []
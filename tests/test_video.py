@@ -0,0 +1,84 @@
+"""
+Test script for Video Steganography
+Creates a small synthetic Y4M clip and performs encode/decode operations.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from modules.video_steg import VideoSteganography
+from modules.payload import PayloadHeader
+
+def create_test_video(filename="test_cover.y4m", size=(64, 48), frames=12):
+    """Create a simple 4:2:0 test clip with a moving gradient."""
+
+    width, height = size
+    chroma = np.full(((width + 1) // 2) * ((height + 1) // 2) * 2, 128, dtype=np.uint8)
+
+    with open(filename, 'wb') as f:
+        f.write(f"YUV4MPEG2 W{width} H{height} F25:1 Ip A1:1 C420jpeg\n".encode())
+        for n in range(frames):
+            luma = (np.add.outer(np.arange(height), np.arange(width)) * 2 + n * 7) % 256
+            f.write(b"FRAME\n")
+            f.write(luma.astype(np.uint8).tobytes())
+            f.write(chroma.tobytes())
+
+    print(f"[OK] Test video created: {filename} ({width}x{height}, {frames} frames)")
+    return filename
+
+def test_video_steganography():
+    """Test Y4M video steganography encoding and decoding."""
+    print("\n" + "=" * 60)
+    print("VIDEO STEGANOGRAPHY TEST")
+    print("=" * 60)
+
+    steg = VideoSteganography(max_workers=2, max_frames_in_flight=3)
+
+    cover_video = create_test_video()
+    info = steg.get_video_info(cover_video)
+    print(f"\n Video Info: {info['width']}x{info['height']}, {info['n_frames']} frames")
+    assert info['n_frames'] == 12
+
+    capacity = steg.calculate_capacity(cover_video)
+    print(f" Video Capacity: {capacity} bytes")
+    assert capacity == 64 * 48 // 8 * 12 - PayloadHeader.SIZE
+
+    # Long enough to span several frames
+    secret_message = "Frame-spanning secret ✓ " * 40
+
+    stego_video = "test_stego.y4m"
+    success, msg = steg.encode_video(cover_video, secret_message, stego_video)
+    print(f"\n Encode: {msg}")
+    assert success, msg
+    assert os.path.getsize(stego_video) == os.path.getsize(cover_video)
+
+    success, decoded_message = steg.decode_video(stego_video)
+    assert success, decoded_message
+    assert decoded_message == secret_message
+    print("   [OK] Messages match perfectly!")
+
+    success, msg = steg.encode_video(cover_video, "x" * (capacity + 1), stego_video)
+    assert not success
+    print("   [OK] Oversized message rejected")
+
+    success, msg = steg.decode_video(cover_video)
+    assert not success
+    print("   [OK] Clean cover reports no message")
+
+    return True
+
+if __name__ == "__main__":
+    try:
+        success = test_video_steganography()
+        print("\n" + "=" * 60)
+        if success:
+            print("[OK] ALL TESTS PASSED")
+        else:
+            print("[FAIL] TESTS FAILED")
+        print("=" * 60 + "\n")
+    except Exception as e:
+        print(f"\n[FAIL] ERROR: {str(e)}\n")
+        import traceback
+        traceback.print_exc()
@@ -2,26 +2,63 @@
 
 from .helpers import (
     EncryptionHelper,
+    CompressionHelper,
+    KDFParams,
+    DerivedKeyCache,
     BinaryConverter,
     FileHelper,
     CapacityCalculator,
     validate_message_size,
     create_output_filename,
     encryption_helper,
+    derived_key_cache,
     binary_converter,
     file_helper,
     capacity_calculator
 )
+from .ecc import ReedSolomonCodec, reed_solomon
+from .timing import Timings, collect, span
+from .metrics import Counter, Gauge, Histogram, Registry
+from .admission import AdmissionController, AdmissionRejected
+from .progress import Tracker, Cancelled, DeadlineExceeded, track, report, check
+from .jobs import Job, JobRegistry
+from .uploads import Upload, UploadRejected, receive_upload
 
 __all__ = [
     'EncryptionHelper',
+    'CompressionHelper',
+    'KDFParams',
+    'DerivedKeyCache',
     'BinaryConverter',
     'FileHelper',
     'CapacityCalculator',
     'validate_message_size',
     'create_output_filename',
     'encryption_helper',
+    'derived_key_cache',
     'binary_converter',
     'file_helper',
-    'capacity_calculator'
+    'capacity_calculator',
+    'ReedSolomonCodec',
+    'reed_solomon',
+    'Timings',
+    'collect',
+    'span',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'Registry',
+    'AdmissionController',
+    'AdmissionRejected',
+    'Tracker',
+    'Cancelled',
+    'DeadlineExceeded',
+    'track',
+    'report',
+    'check',
+    'Job',
+    'JobRegistry',
+    'Upload',
+    'UploadRejected',
+    'receive_upload'
 ]
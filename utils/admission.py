@@ -0,0 +1,91 @@
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class AdmissionRejected(Exception):
+    """A request refused by admission control; status is the HTTP status
+    to answer with (413 too large for any budget, 429 busy right now)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AdmissionController:
+    """Memory and CPU budgets for carrier jobs.
+
+    A job estimated above the per-request limits is rejected outright.
+    Small jobs run immediately; larger ones reserve their memory estimate
+    from a global budget, waiting in FIFO order while it is exhausted.
+    Once max_queued jobs are waiting, or a job has waited queue_timeout
+    seconds, further jobs are turned away as busy.
+    """
+
+    def __init__(self, memory_budget: int, request_memory_limit: int, request_cpu_limit: float,
+                 small_job_bytes: int, max_queued: int = 32, queue_timeout: float = 30.0):
+        if request_memory_limit > memory_budget:
+            raise ValueError("The per-request memory limit cannot exceed the global budget")
+        self.memory_budget = memory_budget
+        self.request_memory_limit = request_memory_limit
+        self.request_cpu_limit = request_cpu_limit
+        self.small_job_bytes = small_job_bytes
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.reserved = 0
+        self._waiters = deque()
+        self._changed = None
+
+    @property
+    def queued(self) -> int:
+
+        return len(self._waiters)
+
+    def check(self, memory_bytes: int, cpu_seconds: float):
+        """Raise AdmissionRejected(413) if a job exceeds the per-request limits."""
+        if memory_bytes > self.request_memory_limit:
+            raise AdmissionRejected(413, f"Carrier too large: needs about {memory_bytes / 2 ** 20:.0f} MB, "
+                                         f"limit is {self.request_memory_limit / 2 ** 20:.0f} MB")
+        if cpu_seconds > self.request_cpu_limit:
+            raise AdmissionRejected(413, f"Carrier too large: needs about {cpu_seconds:.0f} s of processing, "
+                                         f"limit is {self.request_cpu_limit:.0f} s")
+
+    def _fits(self, ticket: object, memory_bytes: int) -> bool:
+
+        return self._waiters[0] is ticket and self.reserved + memory_bytes <= self.memory_budget
+
+    @asynccontextmanager
+    async def admit(self, memory_bytes: int, cpu_seconds: float = 0.0) -> AsyncIterator[None]:
+        """Hold a job's share of the budget for the duration of the block."""
+        self.check(memory_bytes, cpu_seconds)
+        if memory_bytes <= self.small_job_bytes:
+            yield
+            return
+
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        if not self._waiters and self.reserved + memory_bytes <= self.memory_budget:
+            self.reserved += memory_bytes
+        else:
+            if len(self._waiters) >= self.max_queued:
+                raise AdmissionRejected(429, f"Server busy: {len(self._waiters)} jobs already queued")
+            ticket = object()
+            async with self._changed:
+                self._waiters.append(ticket)
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: self._fits(ticket, memory_bytes)),
+                                           self.queue_timeout)
+                except asyncio.TimeoutError:
+                    raise AdmissionRejected(429, f"Server busy: no capacity within {self.queue_timeout:.0f} s")
+                finally:
+                    self._waiters.remove(ticket)
+                    self._changed.notify_all()
+                self.reserved += memory_bytes
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self.reserved -= memory_bytes
+                self._changed.notify_all()
@@ -0,0 +1,223 @@
+
+import struct
+from functools import lru_cache
+import numpy as np
+from typing import Tuple
+
+# GF(2^8) with the primitive polynomial x^8 + x^4 + x^3 + x^2 + 1, generator alpha = 2
+GF_PRIMITIVE = 0x11d
+BLOCK_SIZE = 255
+
+
+def _build_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    exp = np.zeros(512, dtype=np.uint8)
+    log = np.zeros(256, dtype=np.int32)
+    x = 1
+    for power in range(255):
+        exp[power] = x
+        log[x] = power
+        x <<= 1
+        if x & 0x100:
+            x ^= GF_PRIMITIVE
+    exp[255:510] = exp[:255]
+
+    # Full 256 x 256 product table; row/column 0 stay zero
+    mul = np.zeros((256, 256), dtype=np.uint8)
+    mul[1:, 1:] = exp[log[1:, None] + log[None, 1:]]
+    return exp, log, mul
+
+GF_EXP, GF_LOG, GF_MUL = _build_tables()
+
+
+def _gf_div(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Elementwise a / b over GF(256); b must be non-zero."""
+    quotient = GF_EXP[(GF_LOG[a] - GF_LOG[b]) % 255]
+    return np.where(a == 0, 0, quotient).astype(np.uint8)
+
+def _poly_eval(polys: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Evaluate lowest-degree-first polynomials, one per row, at x (one per row)."""
+    result = np.zeros(len(polys), dtype=np.uint8)
+    for column in range(polys.shape[1] - 1, -1, -1):
+        result = GF_MUL[result, x] ^ polys[:, column]
+    return result
+
+
+class ReedSolomonCodec:
+    """Systematic RS(255, 255 - nsym) code over GF(256) with block interleaving.
+
+    Data is prefixed with its length, cut into 255 - nsym byte messages and
+    encoded as a matrix of codewords, one per row, all rows at once. The
+    matrix is serialised column by column so neighbouring carrier bytes
+    belong to different codewords and a burst of errors is spread thin.
+    Each codeword corrects up to nsym // 2 corrupted bytes.
+    """
+
+    LENGTH = struct.Struct('>I')
+    # Rows per parity batch; keeps the accumulator and gathers cache-resident
+    CHUNK_ROWS = 4096
+
+    def __init__(self, nsym: int = 32):
+        if not 2 <= nsym <= 128:
+            raise ValueError("ECC parity symbols must be between 2 and 128")
+        self.nsym = nsym
+        self.k = BLOCK_SIZE - nsym
+
+        generator = np.array([1], dtype=np.uint8)  # highest degree first
+        for power in range(nsym):
+            shifted = np.append(generator, 0)
+            shifted[1:] ^= GF_MUL[generator, GF_EXP[power]]
+            generator = shifted
+        # Parity is linear in the message: parity(m) = XOR_i parity(m_i * e_i).
+        # Tabulate parity(b * e_i) for every position i and byte b, widened to
+        # whole uint64 words so each position costs one gather and one XOR.
+        unit_parity = self._divide(np.eye(self.k, dtype=np.uint8), generator)
+        words = -(-nsym // 8)
+        tables = np.zeros((self.k, 256, words * 8), dtype=np.uint8)
+        tables[:, :, :nsym] = GF_MUL[:, unit_parity].transpose(1, 0, 2)
+        self._parity_tables = tables.view(np.uint64)
+
+        # Syndrome j of a codeword is XOR_p c_p * alpha^(j * degree(p)), linear
+        # in the codeword the same way, so it is tabulated the same way
+        degrees = np.arange(BLOCK_SIZE - 1, -1, -1)
+        syndrome_powers = GF_EXP[(np.arange(nsym)[:, None] * degrees[None, :]) % 255]
+        tables = np.zeros((BLOCK_SIZE, 256, words * 8), dtype=np.uint8)
+        tables[:, :, :nsym] = GF_MUL[:, syndrome_powers.T].transpose(1, 0, 2)
+        self._syndrome_tables = tables.view(np.uint64)
+        # Chien search: alpha^(-degree * i) for every codeword degree and locator term i
+        self._chien_powers = GF_EXP[(-np.arange(BLOCK_SIZE)[:, None] * np.arange(nsym + 1)[None, :]) % 255]
+
+    @property
+    def rate(self) -> float:
+
+        return self.k / BLOCK_SIZE
+
+    def encoded_size(self, length: int) -> int:
+
+        return -(-(length + self.LENGTH.size) // self.k) * BLOCK_SIZE
+
+    def _divide(self, messages: np.ndarray, generator: np.ndarray) -> np.ndarray:
+        """Remainders of messages(x) * x^nsym mod g(x), by synthetic division on all rows."""
+        products = GF_MUL[:, generator[1:]]
+        work = np.zeros((len(messages), BLOCK_SIZE), dtype=np.uint8)
+        work[:, :self.k] = messages
+        for i in range(self.k):
+            work[:, i + 1:i + 1 + self.nsym] ^= products[work[:, i]]
+        return work[:, self.k:]
+
+    def _accumulate(self, rows: np.ndarray, tables: np.ndarray) -> np.ndarray:
+        """XOR of tables[i][rows[:, i]] over every column i, in batches of
+        CHUNK_ROWS rows; the linear maps behind parity and syndromes."""
+        result = np.empty((len(rows), self.nsym), dtype=np.uint8)
+        for start in range(0, len(rows), self.CHUNK_ROWS):
+            columns = np.ascontiguousarray(rows[start:start + self.CHUNK_ROWS].T)
+            acc = np.zeros((columns.shape[1], tables.shape[2]), dtype=np.uint64)
+            gathered = np.empty_like(acc)
+            for i in range(len(columns)):
+                np.take(tables[i], columns[i], axis=0, out=gathered)
+                acc ^= gathered
+            result[start:start + self.CHUNK_ROWS] = acc.view(np.uint8)[:, :self.nsym]
+        return result
+
+    def _parity(self, messages: np.ndarray) -> np.ndarray:
+
+        return self._accumulate(messages, self._parity_tables)
+
+    def _syndromes(self, codewords: np.ndarray) -> np.ndarray:
+
+        return self._accumulate(codewords, self._syndrome_tables)
+
+    def encode(self, data: bytes) -> bytes:
+
+        framed = self.LENGTH.pack(len(data)) + data
+        rows = -(-len(framed) // self.k)
+        messages = np.zeros(rows * self.k, dtype=np.uint8)
+        messages[:len(framed)] = np.frombuffer(framed, dtype=np.uint8)
+        messages = messages.reshape(rows, self.k)
+        codewords = np.concatenate([messages, self._parity(messages)], axis=1)
+        return codewords.T.tobytes()
+
+    def decode(self, data: bytes) -> Tuple[bytes, int]:
+        """Return (data, corrected byte count); raises ValueError when a
+        codeword has more errors than the code can correct."""
+        if not data or len(data) % BLOCK_SIZE:
+            raise ValueError("ECC data is not a whole number of codewords")
+        rows = len(data) // BLOCK_SIZE
+        codewords = np.frombuffer(data, dtype=np.uint8).reshape(BLOCK_SIZE, rows).T.copy()
+
+        # Re-encoding is as cheap as encoding and clears the common error-free rows
+        damaged = np.flatnonzero((self._parity(codewords[:, :self.k]) != codewords[:, self.k:]).any(axis=1))
+        corrected = self._correct(codewords, damaged) if len(damaged) else 0
+
+        messages = codewords[:, :self.k].tobytes()
+        length = self.LENGTH.unpack_from(messages)[0]
+        if length > len(messages) - self.LENGTH.size:
+            raise ValueError("ECC length prefix is corrupt")
+        return messages[self.LENGTH.size:self.LENGTH.size + length], corrected
+
+    def _correct(self, codewords: np.ndarray, damaged: np.ndarray) -> int:
+        """Fix the damaged rows of codewords in place (Berlekamp-Massey, Chien
+        search, Forney), each step run on all of them at once. Returns the
+        number of bytes corrected."""
+        block = codewords[damaged]
+        syndromes = self._syndromes(block)
+        count = len(block)
+        nsym = self.nsym
+
+        # Berlekamp-Massey; polynomials are rows, lowest degree first. stretched
+        # holds x^shift * B(x), so every row moves up one degree per step. A
+        # locator only grows, and rows it takes past nsym // 2 are rejected
+        # below, so terms beyond degree nsym // 2 + 1 are never needed.
+        terms = nsym // 2 + 2
+        locator = np.zeros((count, terms + 1), dtype=np.uint8)
+        locator[:, 0] = 1
+        stretched = np.zeros_like(locator)
+        stretched[:, 1] = 1
+        errors = np.zeros(count, dtype=np.int64)
+        last_discrepancy = np.ones(count, dtype=np.uint8)
+        for n in range(nsym):
+            width = min(n + 2, terms)
+            used = min(n + 1, terms)
+            discrepancy = np.bitwise_xor.reduce(GF_MUL[locator[:, :used], syndromes[:, n::-1][:, :used]], axis=1)
+            grow = (discrepancy != 0) & (2 * errors <= n)
+            kept = np.where(grow[:, None], locator[:, :width], stretched[:, :width])
+            locator[:, :width] ^= GF_MUL[_gf_div(discrepancy, last_discrepancy)[:, None], stretched[:, :width]]
+            stretched[:, 1:width + 1] = kept
+            errors = np.where(grow, n + 1 - errors, errors)
+            last_discrepancy = np.where(grow, discrepancy, last_discrepancy)
+
+        if ((errors == 0) | (errors > nsym // 2)).any():
+            raise ValueError("Too many errors to correct")
+
+        # Chien search: degree d is in error when locator(alpha^-d) == 0
+        values = np.zeros((count, BLOCK_SIZE), dtype=np.uint8)
+        for i in range(int(errors.max()) + 1):
+            values ^= GF_MUL[locator[:, i, None], self._chien_powers[None, :, i]]
+        roots = values == 0
+        if (roots.sum(axis=1) != errors).any():
+            raise ValueError("Too many errors to correct")
+
+        # Forney with first consecutive root alpha^0: e = X * omega(X^-1) / locator'(X^-1)
+        evaluator = np.zeros((count, nsym), dtype=np.uint8)
+        for i in range(int(errors.max()) + 1):
+            evaluator[:, i:] ^= GF_MUL[locator[:, i, None], syndromes[:, :nsym - i]]
+        derivative = locator[:, 1::2]  # odd-degree terms, as polynomials in x^2
+        rows, degrees = np.nonzero(roots)
+        x = GF_EXP[degrees]
+        x_inv = GF_EXP[(255 - degrees) % 255]
+        denominator = _poly_eval(derivative[rows], GF_MUL[x_inv, x_inv])
+        if not denominator.all():
+            raise ValueError("Too many errors to correct")
+        magnitude = _gf_div(GF_MUL[x, _poly_eval(evaluator[rows], x_inv)], denominator)
+        block[rows, BLOCK_SIZE - 1 - degrees] ^= magnitude
+
+        if self._syndromes(block).any():
+            raise ValueError("Too many errors to correct")
+        codewords[damaged] = block
+        return int(errors.sum())
+
+
+@lru_cache(maxsize=8)
+def reed_solomon(nsym: int) -> ReedSolomonCodec:
+    """Shared codec per parity size; building the parity tables takes a few ms."""
+    return ReedSolomonCodec(nsym)
@@ -1,32 +1,264 @@
 
 import os
+import hmac
+import struct
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import PBKDF2, scrypt
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
 import hashlib
 import base64
+import zlib
+import lzma
+import bz2
+
+from .timing import span
+
+class CompressionHelper:
+
+    CODECS = {'none': 0, 'zlib': 1, 'lzma': 2, 'bz2': 3}
+    CODEC_NAMES = {v: k for k, v in CODECS.items()}
+
+    # 'auto' only tries the slower codecs on payloads up to this size
+    AUTO_SEARCH_LIMIT = 256 * 1024
+    # Decompressed payloads are refused beyond this size, so a small
+    # carrier cannot hold a decompression bomb; larger data is stored as is
+    MAX_DECOMPRESSED_SIZE = 64 * 1024 * 1024
+    LZMA_FILTERS = [{'id': lzma.FILTER_LZMA2, 'preset': 6}]
+
+    @staticmethod
+    def _compress_with(codec_id: int, data: bytes) -> bytes:
+
+        if codec_id == 1:
+            return zlib.compress(data, 9)
+        if codec_id == 2:
+            return lzma.compress(data, format=lzma.FORMAT_RAW, filters=CompressionHelper.LZMA_FILTERS)
+        if codec_id == 3:
+            return bz2.compress(data, 9)
+        return data
+
+    @staticmethod
+    def compress(data: bytes, codec: Optional[str] = 'auto') -> tuple:
+
+        if not codec or codec == 'none':
+            return 0, data
+
+        if len(data) > CompressionHelper.MAX_DECOMPRESSED_SIZE:
+            if codec == 'auto':
+                return 0, data
+            raise ValueError(f"Payloads over {CompressionHelper.MAX_DECOMPRESSED_SIZE // 2 ** 20} MB "
+                             f"cannot be compressed")
+        if codec == 'auto':
+            candidates = [1, 2, 3] if len(data) <= CompressionHelper.AUTO_SEARCH_LIMIT else [1]
+        elif codec in CompressionHelper.CODECS:
+            candidates = [CompressionHelper.CODECS[codec]]
+        else:
+            raise ValueError(f"Unknown compression codec: {codec}")
+
+        best_id, best = 0, data
+        for codec_id in candidates:
+            compressed = CompressionHelper._compress_with(codec_id, data)
+            if len(compressed) < len(best):
+                best_id, best = codec_id, compressed
+        return best_id, best
+
+    @staticmethod
+    def decompress(codec_id: int, data: bytes, max_size: Optional[int] = None) -> bytes:
+        """Decompress data, refusing (ValueError) output beyond max_size,
+        MAX_DECOMPRESSED_SIZE by default, without ever producing more."""
+        if codec_id == 0:
+            return data
+        if codec_id == 1:
+            decompressor = zlib.decompressobj()
+        elif codec_id == 2:
+            decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=CompressionHelper.LZMA_FILTERS)
+        elif codec_id == 3:
+            decompressor = bz2.BZ2Decompressor()
+        else:
+            raise ValueError(f"Unknown compression codec id: {codec_id}")
+
+        limit = CompressionHelper.MAX_DECOMPRESSED_SIZE if max_size is None else max_size
+        output = decompressor.decompress(data, limit + 1)
+        if len(output) > limit:
+            raise ValueError(f"Compressed payload expands beyond {limit} bytes (decompression bomb?)")
+        if not decompressor.eof:
+            raise ValueError("Truncated compressed payload")
+        return output
+
+class KDFParams:
+    """Salted key-derivation settings, stored in the payload header.
+
+    cost is log2 of scrypt's N or of the PBKDF2 iteration count. Headers
+    come from untrusted carriers, so costs are capped per KDF a little
+    above the defaults: scrypt at 2**17 (128 MiB), PBKDF2 at 2**21.
+    """
+
+    PBKDF2_SHA256 = 1
+    SCRYPT = 2
+    NAMES = {'pbkdf2': PBKDF2_SHA256, 'scrypt': SCRYPT}
+    DEFAULT_COST = {PBKDF2_SHA256: 19, SCRYPT: 15}
+    MIN_COST = 10
+    MAX_COST = {PBKDF2_SHA256: 21, SCRYPT: 17}
+    SCRYPT_R = 8
+
+    SALT_SIZE = 16
+    FORMAT = struct.Struct('>BB16s')
+    SIZE = FORMAT.size
+
+    def __init__(self, kdf: int = SCRYPT, cost: Optional[int] = None, salt: Optional[bytes] = None):
+        if kdf not in self.DEFAULT_COST:
+            raise ValueError(f"Unknown KDF id: {kdf}")
+        self.kdf = kdf
+        self.cost = cost if cost is not None else self.DEFAULT_COST[kdf]
+        if not self.MIN_COST <= self.cost <= self.MAX_COST[kdf]:
+            raise ValueError(f"KDF cost must be between {self.MIN_COST} and {self.MAX_COST[kdf]}")
+        self.salt = salt if salt is not None else get_random_bytes(self.SALT_SIZE)
+
+    @classmethod
+    def from_name(cls, name: str, cost: Optional[int] = None) -> 'KDFParams':
+
+        if name not in cls.NAMES:
+            raise ValueError(f"Unknown KDF: {name}")
+        return cls(cls.NAMES[name], cost)
+
+    def pack(self) -> bytes:
+
+        return self.FORMAT.pack(self.kdf, self.cost, self.salt)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'KDFParams':
+
+        kdf, cost, salt = cls.FORMAT.unpack_from(data)
+        if kdf in cls.MAX_COST and not cls.MIN_COST <= cost <= cls.MAX_COST[kdf]:
+            raise ValueError(f"Implausible KDF cost: {cost}")
+        return cls(kdf, cost, salt)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Working memory of one derivation (scrypt's 128 * r * N bytes)."""
+        return 128 * self.SCRYPT_R * 2 ** self.cost if self.kdf == self.SCRYPT else 0
+
+    def derive(self, password: str, key_len: int = 32) -> bytes:
+
+        if self.kdf == self.SCRYPT:
+            return scrypt(password.encode(), self.salt, key_len, N=2 ** self.cost, r=self.SCRYPT_R, p=1)
+        return PBKDF2(password.encode(), self.salt, key_len, count=2 ** self.cost,
+                      hmac_hash_module=SHA256)
+
+class DerivedKeyCache:
+    """Thread-safe LRU cache of derived keys with a TTL.
+
+    Entries are keyed by a keyed hash of the password plus the KDF
+    parameters, so plaintext passwords are never stored. Concurrent
+    misses on the same entry wait for a single derivation.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._secret = get_random_bytes(32)
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_key(self, password: str, params: KDFParams) -> tuple:
+
+        password_hash = hmac.new(self._secret, password.encode(), hashlib.sha256).digest()
+        return password_hash, params.salt, params.kdf, params.cost
+
+    def get_or_derive(self, password: str, params: KDFParams) -> bytes:
+
+        cache_key = self._cache_key(password, params)
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(cache_key)
+                if entry is not None and entry[1] > time.monotonic():
+                    self._entries.move_to_end(cache_key)
+                    self.hits += 1
+                    return entry[0]
+                if entry is not None:
+                    del self._entries[cache_key]
+
+                pending = self._pending.get(cache_key)
+                if pending is None:
+                    pending = self._pending[cache_key] = threading.Event()
+                    self.misses += 1
+                    break
+            pending.wait()
+
+        try:
+            key = params.derive(password)
+            with self._lock:
+                self._entries[cache_key] = (key, time.monotonic() + self.ttl_seconds)
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return key
+        finally:
+            with self._lock:
+                del self._pending[cache_key]
+            pending.set()
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+derived_key_cache = DerivedKeyCache()
 
 class EncryptionHelper:
    
-    def __init__(self):
+    # Marks a plaintext that was compressed before encryption
+    COMPRESSED_MARKER = b'\x00SGZ'
+    # Leads encrypt_message output; older output is IV + AES-CBC under the unsalted key
+    SALTED_MARKER = b'SGK1'
+
+    GCM_NONCE_SIZE = 12
+    GCM_TAG_SIZE = 16
+    GCM_OVERHEAD = GCM_NONCE_SIZE + GCM_TAG_SIZE
+    STREAM_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, key_cache: Optional[DerivedKeyCache] = None):
         self.block_size = AES.block_size
+        self.key_cache = key_cache if key_cache is not None else derived_key_cache
     
     def _derive_key(self, password: str) -> bytes:
-        
+        """Legacy unsalted key; only for reading data written before KDFParams."""
         return hashlib.sha256(password.encode()).digest()
     
-    def encrypt_message(self, message: str, password: str) -> str:
-        
+    def derive_key(self, password: str, kdf_params: Optional[KDFParams] = None) -> bytes:
+        """Salted, cached key derivation; without params, the legacy unsalted hash."""
+        if kdf_params is None:
+            return self._derive_key(password)
+        with span('kdf'):
+            return self.key_cache.get_or_derive(password, kdf_params)
+    
+    def encrypt_message(self, message: str, password: str,
+                        compression: Optional[str] = None,
+                        kdf_params: Optional[KDFParams] = None) -> str:
+        """AES-GCM encrypt text under a salted KDF key, as base64 of the
+        marker, the KDF parameters and the encrypt_bytes output."""
         try:
-            key = self._derive_key(password)
-            cipher = AES.new(key, AES.MODE_CBC)
-            
-            padded_message = pad(message.encode(), self.block_size)
-            
-            ciphertext = cipher.encrypt(padded_message)
+            plaintext = message.encode()
+            codec_id, compressed = CompressionHelper.compress(plaintext, compression)
+            if codec_id and len(compressed) + len(self.COMPRESSED_MARKER) + 1 < len(plaintext):
+                plaintext = self.COMPRESSED_MARKER + bytes([codec_id]) + compressed
             
-            encrypted_data = cipher.iv + ciphertext
+            kdf_params = kdf_params or KDFParams()
+            header = self.SALTED_MARKER + kdf_params.pack()
+            encrypted_data = header + self.encrypt_bytes(plaintext, password, header, kdf_params)
             return base64.b64encode(encrypted_data).decode()
         
         except Exception as e:
@@ -35,21 +267,81 @@ class EncryptionHelper:
     def decrypt_message(self, encrypted_message: str, password: str) -> str:
        
         try:
-            key = self._derive_key(password)
-            
             encrypted_data = base64.b64decode(encrypted_message)
+            header_size = len(self.SALTED_MARKER) + KDFParams.SIZE
             
-            iv = encrypted_data[:self.block_size]
-            ciphertext = encrypted_data[self.block_size:]
-            
-            cipher = AES.new(key, AES.MODE_CBC, iv)
-            padded_message = cipher.decrypt(ciphertext)
+            if encrypted_data.startswith(self.SALTED_MARKER) and len(encrypted_data) >= header_size + self.GCM_OVERHEAD:
+                header = encrypted_data[:header_size]
+                kdf_params = KDFParams.unpack(header[len(self.SALTED_MARKER):])
+                message = self.decrypt_bytes(encrypted_data[header_size:], password, header, kdf_params)
+            else:
+                # Written before the salted KDF: IV + AES-CBC under the unsalted key
+                key = self._derive_key(password)
+                iv = encrypted_data[:self.block_size]
+                ciphertext = encrypted_data[self.block_size:]
+                cipher = AES.new(key, AES.MODE_CBC, iv)
+                message = unpad(cipher.decrypt(ciphertext), self.block_size)
             
-            message = unpad(padded_message, self.block_size)
+            if message.startswith(self.COMPRESSED_MARKER):
+                codec_id = message[len(self.COMPRESSED_MARKER)]
+                message = CompressionHelper.decompress(codec_id, message[len(self.COMPRESSED_MARKER) + 1:])
             return message.decode()
         
         except Exception as e:
             raise Exception(f"Decryption failed: {str(e)}")
+    
+    def encrypt_bytes(self, data: bytes, password: str, associated_data: bytes = b'',
+                      kdf_params: Optional[KDFParams] = None) -> bytes:
+        """AES-GCM encrypt raw bytes to nonce + ciphertext + tag, in fixed-size chunks."""
+        try:
+            key = self.derive_key(password, kdf_params)
+            nonce = get_random_bytes(self.GCM_NONCE_SIZE)
+            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce, mac_len=self.GCM_TAG_SIZE)
+            if associated_data:
+                cipher.update(associated_data)
+            
+            out = bytearray(self.GCM_NONCE_SIZE + len(data) + self.GCM_TAG_SIZE)
+            out[:self.GCM_NONCE_SIZE] = nonce
+            src = memoryview(data)
+            dst = memoryview(out)[self.GCM_NONCE_SIZE:self.GCM_NONCE_SIZE + len(data)]
+            
+            with span('encrypt', len(data)):
+                for start in range(0, len(data), self.STREAM_CHUNK_SIZE):
+                    end = start + self.STREAM_CHUNK_SIZE
+                    cipher.encrypt(src[start:end], output=dst[start:end])
+                out[-self.GCM_TAG_SIZE:] = cipher.digest()
+            return bytes(out)
+        
+        except Exception as e:
+            raise Exception(f"Encryption failed: {str(e)}")
+    
+    def decrypt_bytes(self, encrypted_data: bytes, password: str, associated_data: bytes = b'',
+                      kdf_params: Optional[KDFParams] = None) -> bytes:
+        """Decrypt and authenticate output of encrypt_bytes."""
+        try:
+            if len(encrypted_data) < self.GCM_OVERHEAD:
+                raise ValueError("ciphertext too short")
+            
+            key = self.derive_key(password, kdf_params)
+            nonce = encrypted_data[:self.GCM_NONCE_SIZE]
+            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce, mac_len=self.GCM_TAG_SIZE)
+            if associated_data:
+                cipher.update(associated_data)
+            
+            size = len(encrypted_data) - self.GCM_OVERHEAD
+            src = memoryview(encrypted_data)[self.GCM_NONCE_SIZE:self.GCM_NONCE_SIZE + size]
+            out = bytearray(size)
+            dst = memoryview(out)
+            
+            with span('decrypt', size):
+                for start in range(0, size, self.STREAM_CHUNK_SIZE):
+                    end = start + self.STREAM_CHUNK_SIZE
+                    cipher.decrypt(src[start:end], output=dst[start:end])
+                cipher.verify(encrypted_data[-self.GCM_TAG_SIZE:])
+            return bytes(out)
+        
+        except Exception as e:
+            raise Exception(f"Decryption failed: {str(e)}")
 
 class BinaryConverter:
   
@@ -113,7 +405,7 @@ class FileHelper:
     @staticmethod
     def validate_video_file(file_path: str) -> bool:
        
-        valid_extensions = ['.mp4', '.avi', '.mov', '.mkv']
+        valid_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.y4m']
         return FileHelper.get_file_extension(file_path) in valid_extensions
     
     @staticmethod
@@ -142,9 +434,9 @@ class CapacityCalculator:
     
     @staticmethod
     def video_capacity(frame_count: int, frame_width: int, frame_height: int,
-                      audio_samples: int) -> dict:
+                      audio_samples: int, channels: int = 3) -> dict:
         
-        frame_capacity = CapacityCalculator.image_capacity(frame_width, frame_height)
+        frame_capacity = CapacityCalculator.image_capacity(frame_width, frame_height, channels)
         total_frame_capacity = frame_capacity * frame_count
         audio_capacity = CapacityCalculator.audio_capacity(audio_samples)
         
@@ -0,0 +1,161 @@
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from .progress import Tracker, track
+
+FINISHED = ('done', 'failed', 'cancelled', 'timed_out')
+
+
+class Job:
+    """Work started as a background task, observable while it runs.
+
+    status goes queued -> running (at the first progress report) -> done,
+    failed, cancelled or timed_out (still running timeout seconds after
+    the job was created); result holds the work's return value and error
+    the exception it raised.
+    """
+
+    def __init__(self, carrier: str, operation: str, weights: Optional[Dict[str, float]] = None,
+                 timeout: Optional[float] = None):
+        self.id = uuid.uuid4().hex
+        self.carrier = carrier
+        self.operation = operation
+        self.status = 'queued'
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+        self.tracker = Tracker(self._progress, weights, timeout=timeout)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers = set()
+
+    def snapshot(self) -> dict:
+
+        snapshot = {
+            'job_id': self.id,
+            'carrier': self.carrier,
+            'operation': self.operation,
+            'status': self.status,
+            'stage': self.tracker.stage,
+            'stage_progress': round(self.tracker.fraction, 4),
+            'progress': 1.0 if self.status == 'done' else round(self.tracker.overall, 4),
+        }
+        if self.status == 'failed':
+            snapshot['error'] = str(getattr(self.error, 'detail', self.error))
+        return snapshot
+
+    def _progress(self, stage: str, fraction: float, overall: float):
+        # Called from the worker thread doing the work
+        if self.status == 'queued':
+            self.status = 'running'
+        self._loop.call_soon_threadsafe(self._publish)
+
+    def _publish(self):
+
+        snapshot = self.snapshot()
+        for queue in self._subscribers:
+            queue.put_nowait(snapshot)
+
+    def start(self, work: Callable[[], Awaitable]) -> 'Job':
+        """Run work() as a task whose progress reports go to this job."""
+        self._loop = asyncio.get_running_loop()
+        with track(self.tracker):
+            self._task = asyncio.create_task(self._run(work))
+        return self
+
+    async def _run(self, work: Callable[[], Awaitable]):
+
+        try:
+            self.result = await work()
+            self.status = 'done'
+        except asyncio.CancelledError:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.error = e
+            if self.tracker.timed_out:
+                self.status = 'timed_out'
+            else:
+                self.status = 'cancelled' if self.tracker.cancelled else 'failed'
+        finally:
+            self.finished_at = time.monotonic()
+            self._publish()
+
+    async def wait(self):
+        """Wait for the job to finish, without cancelling it if the waiter
+        is cancelled."""
+        await asyncio.wait({self._task})
+
+    def cancel(self) -> bool:
+        """Stop the job: at its next progress report once running, at once
+        while it still waits to start. False if it already finished."""
+        if self.status in FINISHED:
+            return False
+        self.tracker.cancel()
+        if self.status == 'queued' and self._task is not None:
+            self._task.cancel()
+        return True
+
+    async def events(self, keepalive: float = 15.0) -> AsyncIterator[Optional[dict]]:
+        """Snapshots as the job changes, starting with the current one and
+        ending with the finished one; None after keepalive idle seconds."""
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            snapshot = self.snapshot()
+            yield snapshot
+            while snapshot['status'] not in FINISHED:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield snapshot
+        finally:
+            self._subscribers.discard(queue)
+
+
+class JobRegistry:
+    """Jobs by id. Finished jobs whose result is never collected are
+    dropped ttl seconds after finishing, with on_discard(job) called so
+    their output can be cleaned up."""
+
+    def __init__(self, ttl: float = 600.0, on_discard: Optional[Callable[[Job], None]] = None):
+        self.ttl = ttl
+        self.on_discard = on_discard
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def add(self, job: Job) -> Job:
+
+        self.expire()
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+
+        self.expire()
+        return self._jobs.get(job_id)
+
+    def pop(self, job_id: str) -> Optional[Job]:
+        """Remove a job whose result has been handed out."""
+        return self._jobs.pop(job_id, None)
+
+    def discard(self, job_id: str):
+        """Remove a finished job without handing out its result."""
+        job = self._jobs.pop(job_id, None)
+        if job is not None and self.on_discard is not None:
+            self.on_discard(job)
+
+    def expire(self):
+
+        now = time.monotonic()
+        expired = [job.id for job in self._jobs.values()
+                   if job.finished_at is not None and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            self.discard(job_id)
@@ -0,0 +1,106 @@
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+
+class Cancelled(Exception):
+    """Raised by report() or check() in work whose tracker has been cancelled."""
+
+
+class DeadlineExceeded(Cancelled):
+    """Raised by report() or check() in work whose tracker's deadline passed."""
+
+
+class Tracker:
+    """Chunk-level progress from instrumented code, while active (see track).
+
+    weights gives each stage's share of the overall fraction; stages it
+    does not list add nothing. callback(stage, fraction, overall) is called
+    from whichever thread does the work, on stage changes and otherwise at
+    most once per min_step of overall progress. Once cancel() is called,
+    or timeout seconds after the tracker was created, the next report or
+    check raises Cancelled (DeadlineExceeded), so the work stops at a chunk
+    boundary; cancel() may be called from any thread.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float, float], None]] = None,
+                 weights: Optional[Dict[str, float]] = None, min_step: float = 0.01,
+                 timeout: Optional[float] = None):
+        self.callback = callback
+        self.weights = dict(weights or {})
+        self.min_step = min_step
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.stage = None
+        self.fraction = 0.0
+        self.overall = 0.0
+        self.cancelled = False
+        self.timed_out = False
+        self._finished = set()
+        self._reported = -1.0
+
+    def cancel(self):
+
+        self.cancelled = True
+
+    def check(self):
+        """Raise Cancelled if the work should stop."""
+        if self.deadline is not None and not self.cancelled and time.monotonic() > self.deadline:
+            self.cancelled = self.timed_out = True
+        if self.cancelled:
+            raise DeadlineExceeded("Deadline exceeded") if self.timed_out else Cancelled("Cancelled")
+
+    def update(self, stage: str, done: float, total: float):
+
+        self.check()
+        fraction = min(done / total, 1.0) if total else 1.0
+        changed = stage != self.stage
+        if changed and self.stage is not None:
+            self._finished.add(self.stage)
+        self.stage, self.fraction = stage, fraction
+
+        weight_total = sum(self.weights.values()) or 1.0
+        finished = sum(self.weights.get(s, 0.0) for s in self._finished if s != stage)
+        overall = (finished + self.weights.get(stage, 0.0) * fraction) / weight_total
+        self.overall = max(self.overall, min(overall, 1.0))
+
+        if self.callback is not None and (changed or fraction == 1.0
+                                          or self.overall - self._reported >= self.min_step):
+            self._reported = self.overall
+            self.callback(stage, fraction, self.overall)
+
+
+_current: ContextVar[Optional[Tracker]] = ContextVar('steg_progress', default=None)
+
+
+def report(stage: str, done: float, total: float):
+    """Report done of total units of a stage to the active tracker; a
+    context variable lookup and nothing else when there is none."""
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.update(stage, done, total)
+
+
+def check():
+    """Raise Cancelled if the active tracker has been cancelled or timed
+    out; for loops with no natural progress to report."""
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.check()
+
+
+def active() -> bool:
+
+    return _current.get() is not None
+
+
+@contextmanager
+def track(tracker: Tracker) -> Iterator[Tracker]:
+    """Send reports from this context (and tasks or worker threads started
+    in it) to tracker."""
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
@@ -0,0 +1,122 @@
+
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+
+class Span:
+    """One timed stage; bytes is how much data it processed, if known."""
+
+    __slots__ = ('name', 'bytes', 'start', 'duration')
+
+    def __init__(self, name: str, nbytes: int = 0):
+        self.name = name
+        self.bytes = nbytes
+        self.start = 0.0
+        self.duration = 0.0
+
+    def add_bytes(self, nbytes: int):
+
+        self.bytes += nbytes
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self.start
+
+
+class _NullSpan:
+    """Stand-in returned while no collector is active; does nothing."""
+
+    __slots__ = ()
+
+    def add_bytes(self, nbytes: int):
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+
+class Timings:
+    """Spans recorded while this collector is active (see collect)."""
+
+    def __init__(self, label: str = ''):
+        self.label = label
+        self.spans: List[Span] = []
+
+    def span(self, name: str, nbytes: int = 0) -> Span:
+
+        span = Span(name, nbytes)
+        self.spans.append(span)
+        return span
+
+    def totals(self) -> dict:
+        """{stage: (seconds, bytes)} summed over repeated spans, in first-seen order."""
+        totals = {}
+        for span in self.spans:
+            seconds, nbytes = totals.get(span.name, (0.0, 0))
+            totals[span.name] = (seconds + span.duration, nbytes + span.bytes)
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. 'embed;dur=1.234;desc="65545 bytes"'."""
+        entries = []
+        for name, (seconds, nbytes) in self.totals().items():
+            entry = f"{name};dur={seconds * 1e3:.3f}"
+            if nbytes:
+                entry += f';desc="{nbytes} bytes"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict:
+
+        return {
+            'label': self.label,
+            'timestamp': time.time(),
+            'spans': [{'name': s.name, 'ms': s.duration * 1e3, 'bytes': s.bytes} for s in self.spans],
+        }
+
+    def dump(self, path: str):
+        """Append this collector as one JSON line."""
+        with open(path, 'a') as handle:
+            handle.write(json.dumps(self.to_dict()) + "\n")
+
+
+_current: ContextVar[Optional[Timings]] = ContextVar('steg_timings', default=None)
+
+
+def span(name: str, nbytes: int = 0):
+    """Time a stage in the active collector; a shared no-op span otherwise,
+    so instrumented code costs one context variable lookup when disabled."""
+    timings = _current.get()
+    if timings is None:
+        return NULL_SPAN
+    return timings.span(name, nbytes)
+
+
+def current() -> Optional[Timings]:
+
+    return _current.get()
+
+
+@contextmanager
+def collect(label: str = '', jsonl_path: Optional[str] = None) -> Iterator[Timings]:
+    """Record spans from this context (and tasks started in it) into a new
+    Timings, optionally appended to jsonl_path as a JSON line on exit."""
+    timings = Timings(label)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+        if jsonl_path:
+            timings.dump(jsonl_path)
@@ -0,0 +1,201 @@
+
+import codecs
+import hashlib
+import os
+import uuid
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import aiofiles
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+class UploadRejected(Exception):
+    """A request body refused while it streamed in; status is the HTTP
+    status to answer with (400 malformed, 413 too large, 422 no file)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Upload:
+    """A multipart/form-data body whose one file part was streamed to path.
+
+    fields holds the other parts as text, size and sha256 the length and
+    hex digest of the file; while it streams in, size counts the bytes on
+    disk so far and fields those parts already read. resources holds
+    whatever was acquired for the upload as it arrived, such as its share
+    of a memory budget, until discard().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.filename: Optional[str] = None
+        self.size = 0
+        self.sha256 = ''
+        self.fields: Dict[str, str] = {}
+        self.resources = AsyncExitStack()
+
+    async def discard(self):
+        """Remove the file, if it is still there, and release resources."""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        finally:
+            await self.resources.aclose()
+
+
+class _Parts:
+    """MultipartParser callbacks; file data piles up in file_data until
+    the caller writes it out between parser writes."""
+
+    def __init__(self, charset: str):
+        self.charset = charset
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.file_data = bytearray()
+        self.file_ended = False
+        self._header_name = b''
+        self._header_value = b''
+        self._disposition = b''
+        self._name = ''
+        self._in_file = False
+        self._text = bytearray()
+
+    def callbacks(self) -> dict:
+
+        return {
+            'on_part_begin': self.on_part_begin,
+            'on_part_data': self.on_part_data,
+            'on_part_end': self.on_part_end,
+            'on_header_field': self.on_header_field,
+            'on_header_value': self.on_header_value,
+            'on_header_end': self.on_header_end,
+            'on_headers_finished': self.on_headers_finished,
+        }
+
+    def _decode(self, data: bytes) -> str:
+
+        return bytes(data).decode(self.charset, errors='replace')
+
+    def on_part_begin(self):
+
+        self._disposition = b''
+        self._in_file = False
+        self._text = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+
+        if self._header_name.lower() == b'content-disposition':
+            self._disposition = self._header_value
+        self._header_name = self._header_value = b''
+
+    def on_headers_finished(self):
+
+        _, options = parse_options_header(self._disposition)
+        if b'name' not in options:
+            raise UploadRejected(400, 'Multipart part without a Content-Disposition name')
+        self._name = self._decode(options[b'name'])
+        if b'filename' in options:
+            if self.filename is not None:
+                raise UploadRejected(400, 'Only one file may be uploaded')
+            self.filename = self._decode(options[b'filename'])
+            self._in_file = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+
+        (self.file_data if self._in_file else self._text).extend(data[start:end])
+
+    def on_part_end(self):
+
+        if self._in_file:
+            self.file_ended = True
+        else:
+            self.fields[self._name] = self._decode(self._text)
+
+
+async def receive_upload(chunks: AsyncIterator[bytes], content_type: str, directory: str,
+                         max_bytes: int, chunk_bytes: int = 1 << 20, head_bytes: int = 1 << 16,
+                         on_head: Optional[Callable[[Upload], Awaitable]] = None) -> Upload:
+    """Stream a multipart/form-data body with a single file part into a
+    new file in directory.
+
+    The body is counted as it arrives and refused (413) as soon as it
+    passes max_bytes, whether or not it declared a Content-Length. File
+    data is hashed and written chunk_bytes at a time as it arrives, so a
+    request holds at most about one chunk and one network read in memory.
+    Once the first head_bytes of the file (or all of a smaller one) are on
+    disk, on_head(upload) is awaited before any more of the body is read,
+    so the caller can price the upload from its header and refuse it or
+    hold it back. The partial file is removed and resources released if
+    the body is refused or fails to arrive.
+    """
+    _, params = parse_options_header(content_type)
+    if b'boundary' not in params:
+        raise UploadRejected(400, 'Expected a multipart/form-data body')
+    charset = params.get(b'charset', b'utf-8')
+    try:
+        charset = codecs.lookup(charset.decode('latin-1')).name
+    except LookupError:
+        charset = 'latin-1'
+
+    upload = Upload(os.path.join(directory, f"{uuid.uuid4().hex}.upload"))
+    parts = _Parts(charset)
+    parser = MultipartParser(params[b'boundary'], parts.callbacks())
+    digest = hashlib.sha256()
+    received = 0
+    try:
+        async with aiofiles.open(upload.path, 'wb') as handle:
+
+            async def write_file_data():
+                digest.update(parts.file_data)
+                upload.size += len(parts.file_data)
+                await handle.write(parts.file_data)
+                parts.file_data.clear()
+
+            async for chunk in chunks:
+                received += len(chunk)
+                if received > max_bytes:
+                    raise UploadRejected(413, f"Upload too large: limit is {max_bytes // 2 ** 20} MB")
+                try:
+                    parser.write(chunk)
+                except FormParserError as e:
+                    raise UploadRejected(400, f"Malformed multipart body: {e}")
+                at_head = on_head is not None and upload.size + len(parts.file_data) >= head_bytes
+                if len(parts.file_data) >= chunk_bytes or parts.file_ended and parts.file_data or at_head:
+                    await write_file_data()
+                if on_head is not None and (upload.size >= head_bytes or parts.file_ended):
+                    await handle.flush()
+                    upload.filename = parts.filename
+                    upload.fields = parts.fields
+                    await on_head(upload)
+                    on_head = None
+            parser.finalize()
+            if parts.file_data:
+                await write_file_data()
+    except BaseException:
+        await upload.discard()
+        raise
+    if parts.filename is None:
+        await upload.discard()
+        raise UploadRejected(422, 'No file uploaded')
+
+    upload.filename = parts.filename
+    upload.sha256 = digest.hexdigest()
+    upload.fields = parts.fields
+    return upload